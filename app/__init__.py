@@ -2,6 +2,7 @@
 
 import os
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,8 +13,10 @@ from starlette.middleware.sessions import SessionMiddleware
 from app.core.config import SECRET_KEY
 from app.exceptions.handlers import setup_exception_handlers
 from app.middleware.localization_middleware import LocalizationMiddleware
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
 from app.middleware.translation_manager import _
 from app.modules import route as api_routers
+from app.modules.products.cache.dimension_cache import DimensionCache
 
 def custom_openapi(app: FastAPI):
     """Create custom openapi schema"""
@@ -29,11 +32,18 @@ def custom_openapi(app: FastAPI):
     app.openapi_schema = openapi_schema
     return openapi_schema
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the per-worker caches before serving requests"""
+    await DimensionCache().warm()
+    yield
+
 def create_app():
     """Create main app"""
     app = FastAPI(
         docs_url=None,  # Disable default docs
-        redoc_url=None  # Disable default redoc
+        redoc_url=None,  # Disable default redoc
+        lifespan=lifespan,
     )
 
     # Register middlewares in correct order (from outermost to innermost)
@@ -55,6 +65,9 @@ def create_app():
 
     app.add_middleware(LocalizationMiddleware)
 
+    # Per-request SQL statistics (debug headers, slow-query log)
+    app.add_middleware(QueryStatsMiddleware)
+
     # Add OAuth debug middleware in development
     @app.middleware('http')
     async def debug_oauth_middleware(request, call_next):
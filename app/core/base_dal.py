@@ -1,14 +1,111 @@
 """Base DAL"""
 
-from contextlib import contextmanager
-from typing import Generic, Type, TypeVar
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, Generic, Iterable, Iterator, Sequence, Type, TypeVar
 
+from sqlalchemy import Insert, Select, asc, bindparam, desc, func, insert, select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.base_model import Pagination
+from app.core.config import get_settings
+from app.enums.base_enums import CountStrategy
 from app.exceptions.exception import CustomHTTPException
+from app.utils.cursor_utils import decode_cursor, encode_cursor, keyset_condition, row_value, sort_signature
+from app.utils.ttl_cache import TTLCache
 
 T = TypeVar('T')  # Kiểu dữ liệu chung cho model
 
+_count_cache: TTLCache | None = None
+
+
+def trigger_after_commit(session, event_name: str, **kwargs) -> None:
+	"""Phát EventHooks event `event_name` khi transaction hiện tại của session commit
+
+	Gọi trước khi commit; nếu transaction rollback thì event bị hủy.
+	"""
+	sync_session = getattr(session, 'sync_session', session)
+	sync_session.info.setdefault('pending_events', []).append((event_name, kwargs))
+	if not sync_session.info.get('pending_events_listener'):
+		sa_event.listen(sync_session, 'after_commit', _trigger_pending_events)
+		sa_event.listen(sync_session, 'after_soft_rollback', _discard_pending_events)
+		sync_session.info['pending_events_listener'] = True
+
+
+def _trigger_pending_events(sync_session) -> None:
+	from app.core.events import EventHooks
+
+	pending, sync_session.info['pending_events'] = sync_session.info.get('pending_events', []), []
+	for event_name, kwargs in pending:
+		EventHooks().trigger(event_name, **kwargs)
+
+
+def _discard_pending_events(sync_session, previous_transaction) -> None:
+	if previous_transaction.parent is None:
+		sync_session.info['pending_events'] = []
+
+
+@lru_cache(maxsize=None)
+def by_id_statement(model) -> Select:
+	"""SELECT model WHERE id = :item_id, dựng một lần cho mỗi model
+
+	Câu lệnh dựng sẵn với bindparam được SQLAlchemy ghi nhớ cache key và bản
+	compile, mỗi lần gọi chỉ truyền giá trị tham số.
+	"""
+	return select(model).where(model.id == bindparam('item_id'))
+
+
+def get_count_cache() -> TTLCache:
+	"""Cache tổng số bản ghi của count_strategy=cached (riêng cho từng process)"""
+	global _count_cache
+	if _count_cache is None:
+		settings = get_settings()
+		_count_cache = TTLCache(maxsize=settings.DB_COUNT_CACHE_SIZE, ttl=settings.DB_COUNT_CACHE_TTL)
+	return _count_cache
+
+
+def _chunked(rows: Sequence[dict], chunk_size: int | None) -> Iterator[Sequence[dict]]:
+	"""Chia danh sách rows thành từng lô chunk_size phần tử"""
+	chunk_size = chunk_size or get_settings().DB_BULK_CHUNK_SIZE
+	for start in range(0, len(rows), chunk_size):
+		yield rows[start : start + chunk_size]
+
+
+# Dialect có câu upsert một lệnh (upsert_many)
+UPSERT_DIALECTS = ('mysql', 'postgresql', 'sqlite')
+
+
+def _build_upsert(model, dialect_name: str, update_columns: Iterable[str], conflict_columns: Iterable[str]) -> Insert:
+	"""INSERT ... ON DUPLICATE KEY UPDATE (MySQL) / ON CONFLICT DO UPDATE (PostgreSQL, SQLite)"""
+	table = model.__table__
+	if dialect_name == 'mysql':
+		from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+		stmt = mysql_insert(table)
+		return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+	if dialect_name in ('postgresql', 'sqlite'):
+		if dialect_name == 'postgresql':
+			from sqlalchemy.dialects.postgresql import insert as dialect_insert
+		else:
+			from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+		stmt = dialect_insert(table)
+		return stmt.on_conflict_do_update(
+			index_elements=list(conflict_columns),
+			set_={column: stmt.excluded[column] for column in update_columns},
+		)
+	raise ValueError(f'upsert_many supports the {", ".join(UPSERT_DIALECTS)} dialects, not {dialect_name}')
+
+
+def _upsert_update_columns(rows: Sequence[dict], update_columns: Iterable[str] | None, conflict_columns: Iterable[str]) -> list[str]:
+	"""Mặc định cập nhật mọi cột có trong rows trừ khóa"""
+	if update_columns is not None:
+		return list(update_columns)
+	keys = set(conflict_columns) | {'id'}
+	return [column for column in rows[0] if column not in keys]
+
 
 class BaseDAL(Generic[T]):
 	"""BaseDAL"""
@@ -17,9 +114,17 @@ class BaseDAL(Generic[T]):
 		self.db = db
 		self.model = model
 
+	def _in_managed_transaction(self) -> bool:
+		"""Đang ở trong `with transaction()` hay không
+
+		Không dùng db.in_transaction(): Session 2.x tự mở transaction ở câu
+		lệnh đầu tiên nên sau một lần đọc nó luôn là True.
+		"""
+		return self.db.info.get('transaction_depth', 0) > 0
+
 	def get_by_id(self, item_id: int):
 		"""Lấy một bản ghi theo ID"""
-		return self.db.query(self.model).filter(self.model.id == item_id).first()
+		return self.db.execute(by_id_statement(self.model), {'item_id': item_id}).scalars().first()
 
 	def get_all(self):
 		"""Lấy tất cả bản ghi"""
@@ -29,7 +134,7 @@ class BaseDAL(Generic[T]):
 		"""Tạo một bản ghi mới"""
 		new_obj = self.model(**obj_data)
 		self.db.add(new_obj)
-		if not self.db.in_transaction():
+		if not self._in_managed_transaction():
 			self.db.commit()
 			self.db.refresh(new_obj)
 		return new_obj
@@ -41,7 +146,7 @@ class BaseDAL(Generic[T]):
 			return None
 		for key, value in update_data.items():
 			setattr(obj, key, value)
-		if not self.db.in_transaction():
+		if not self._in_managed_transaction():
 			self.db.commit()
 			self.db.refresh(obj)
 		return obj
@@ -50,12 +155,96 @@ class BaseDAL(Generic[T]):
 		"""Xóa một bản ghi"""
 		obj = self.get_by_id(item_id)
 		if obj:
-			if not self.db.in_transaction():
-				self.db.delete(obj)
+			self.db.delete(obj)
+			if not self._in_managed_transaction():
 				self.db.commit()
 			return True
 		return False
 
+	def create_many(self, rows: Sequence[dict], chunk_size: int | None = None, return_ids: bool = False) -> int | list[int]:
+		"""Tạo nhiều bản ghi bằng executemany theo từng lô
+
+		Không chạy @validates của model. Trả về số bản ghi, hoặc danh sách id
+		(cùng thứ tự với rows) nếu return_ids=True. Dialect không có
+		INSERT ... RETURNING nhiều dòng (MySQL) khi return_ids=True sẽ chèn từng
+		dòng một (mỗi dòng một round trip).
+		"""
+		if not rows:
+			return [] if return_ids else 0
+		autocommit = not self._in_managed_transaction()
+		dialect = self.db.get_bind().dialect
+		ids = []
+		try:
+			for chunk in _chunked(rows, chunk_size):
+				if not return_ids:
+					self.db.execute(insert(self.model), chunk)
+				elif dialect.insert_executemany_returning:
+					result = self.db.execute(insert(self.model).returning(self.model.id, sort_by_parameter_order=True), chunk)
+					ids.extend(result.scalars().all())
+				else:
+					# MySQL: không có RETURNING; id liên tiếp từ lastrowid là sai khi auto_increment_increment > 1,
+					# khi dòng có id sẵn hoặc với innodb_autoinc_lock_mode=2, nên chèn từng dòng và đọc id của nó
+					for row in chunk:
+						result = self.db.execute(insert(self.model.__table__).values(row))
+						ids.append(result.inserted_primary_key[0])
+			if autocommit:
+				self.db.commit()
+		except Exception:
+			if autocommit:
+				self.db.rollback()
+			raise
+		return ids if return_ids else len(rows)
+
+	def update_many(self, rows: Sequence[dict], chunk_size: int | None = None) -> int:
+		"""Cập nhật nhiều bản ghi theo id (mỗi dict phải có key 'id')"""
+		if not rows:
+			return 0
+		autocommit = not self._in_managed_transaction()
+		try:
+			for chunk in _chunked(rows, chunk_size):
+				self.db.execute(update(self.model), chunk)
+			if autocommit:
+				self.db.commit()
+		except Exception:
+			if autocommit:
+				self.db.rollback()
+			raise
+		return len(rows)
+
+	def upsert_many(
+		self,
+		rows: Sequence[dict],
+		update_columns: Iterable[str] | None = None,
+		conflict_columns: Iterable[str] = ('id',),
+		chunk_size: int | None = None,
+	) -> int:
+		"""INSERT ... ON DUPLICATE KEY UPDATE theo từng lô
+
+		update_columns: cột được ghi đè khi trùng khóa (mặc định mọi cột trừ khóa).
+		conflict_columns: unique key dùng cho SQLite; MySQL dùng mọi unique key.
+		Trả về tổng rowcount (MySQL: 1 cho mỗi dòng thêm mới, 2 cho mỗi dòng cập nhật).
+		"""
+		if not rows:
+			return 0
+		autocommit = not self._in_managed_transaction()
+		stmt = _build_upsert(
+			self.model,
+			self.db.get_bind().dialect.name,
+			_upsert_update_columns(rows, update_columns, conflict_columns),
+			conflict_columns,
+		)
+		affected = 0
+		try:
+			for chunk in _chunked(rows, chunk_size):
+				affected += self.db.execute(stmt, chunk).rowcount
+			if autocommit:
+				self.db.commit()
+		except Exception:
+			if autocommit:
+				self.db.rollback()
+			raise
+		return affected
+
 	def begin_transaction(self):
 		"""Bắt đầu transaction"""
 		self.db.begin()
@@ -74,19 +263,304 @@ class BaseDAL(Generic[T]):
 
 	@contextmanager
 	def transaction(self):
-		"""Context manager để quản lý transaction."""
+		"""Context manager để quản lý transaction.
+
+		Có thể lồng nhau: chỉ block ngoài cùng mới commit/rollback, các
+		create/update/delete và *_many bên trong sẽ không tự commit.
+		"""
+		depth = self.db.info.get('transaction_depth', 0)
+		self.db.info['transaction_depth'] = depth + 1
 		try:
 			# Nếu chưa có transaction nào, thì bắt đầu
-			if not self.db.in_transaction():
+			if depth == 0 and not self.db.in_transaction():
 				self.begin_transaction()
 
 			yield  # Chạy code trong `with transaction()`
 
 			# Commit nếu không có lỗi
-			self.commit()
+			if depth == 0:
+				self.commit()
 		except CustomHTTPException as ce:
-			self.rollback()
+			if depth == 0:
+				self.rollback()
 			raise ce
 		except Exception as e:
-			self.rollback()
+			if depth == 0:
+				self.rollback()
+			raise e
+		finally:
+			self.db.info['transaction_depth'] = depth
+
+
+class AsyncBaseDAL(Generic[T]):
+	"""AsyncBaseDAL - bản async của BaseDAL dùng cho API routes"""
+
+	def __init__(self, db: AsyncSession, model: Type[T]):
+		self.db = db
+		self.model = model
+
+	def trigger_after_commit(self, event_name: str, **kwargs) -> None:
+		"""Phát event sau khi transaction hiện tại commit (xem trigger_after_commit)"""
+		trigger_after_commit(self.db, event_name, **kwargs)
+
+	def _in_managed_transaction(self) -> bool:
+		"""Đang ở trong `async with transaction()` hay không"""
+		return self.db.info.get('transaction_depth', 0) > 0
+
+	async def get_by_id(self, item_id: int):
+		"""Lấy một bản ghi theo ID"""
+		result = await self.db.execute(by_id_statement(self.model), {'item_id': item_id})
+		return result.scalars().first()
+
+	async def get_all(self):
+		"""Lấy tất cả bản ghi"""
+		result = await self.db.execute(select(self.model))
+		return result.scalars().all()
+
+	async def create(self, obj_data: dict):
+		"""Tạo một bản ghi mới"""
+		new_obj = self.model(**obj_data)
+		self.db.add(new_obj)
+		if not self._in_managed_transaction():
+			await self.db.commit()
+			await self.db.refresh(new_obj)
+		return new_obj
+
+	async def update(self, item_id: int, update_data: dict):
+		"""Cập nhật một bản ghi"""
+		obj = await self.get_by_id(item_id)
+		if not obj:
+			return None
+		for key, value in update_data.items():
+			setattr(obj, key, value)
+		if not self._in_managed_transaction():
+			await self.db.commit()
+			await self.db.refresh(obj)
+		return obj
+
+	async def delete(self, item_id: int):
+		"""Xóa một bản ghi"""
+		obj = await self.get_by_id(item_id)
+		if obj:
+			await self.db.delete(obj)
+			if not self._in_managed_transaction():
+				await self.db.commit()
+			return True
+		return False
+
+	async def paginate(
+		self,
+		query: Select,
+		page: int,
+		page_size: int,
+		sort_keys: Sequence[tuple[Any, bool]] | None = None,
+		cursor: str | None = None,
+		count_strategy: CountStrategy | str | None = None,
+	) -> Pagination:
+		"""Lấy một trang dữ liệu của query kèm tổng số bản ghi
+
+		sort_keys: danh sách (cột, is_desc) dùng cho ORDER BY, cột cuối phải là khóa
+		duy nhất (thường là id) và mọi cột phải có trong select. Khi có sort_keys,
+		kết quả trả về next_cursor; truyền cursor để lấy trang kế tiếp bằng keyset
+		(WHERE (sort key) > cursor) thay cho OFFSET, khi đó page bị bỏ qua.
+
+		count_strategy (mặc định DB_COUNT_STRATEGY):
+		- exact: COUNT(*) OVER() trong cùng câu query lấy trang
+		- cached: COUNT riêng, ghi nhớ theo câu query + tham số trong DB_COUNT_CACHE_TTL giây
+		- none: không đếm, chỉ trả về has_more
+		"""
+		strategy = CountStrategy(count_strategy or get_settings().DB_COUNT_STRATEGY)
+		count_query = query
+
+		signature = None
+		if sort_keys:
+			signature = sort_signature(sort_keys)
+			query = query.order_by(*[desc(column) if is_desc else asc(column) for column, is_desc in sort_keys])
+			if cursor:
+				query = query.where(keyset_condition(sort_keys, decode_cursor(cursor, signature)))
+		if not (sort_keys and cursor):
+			query = query.offset((page - 1) * page_size)
+		# Lấy dư 1 bản ghi để biết còn trang kế tiếp hay không
+		query = query.limit(page_size + 1)
+		# select(Model) / select(Model.column) -> scalars, select nhiều cột -> rows
+		single_column = len(query.column_descriptions) == 1
+
+		total_count = None
+		if strategy == CountStrategy.EXACT and not cursor:
+			# Cột total_count được thêm vào cuối rồi bỏ đi, items giữ nguyên kiểu như khi không đếm
+			frozen = (await self.db.execute(query.add_columns(func.count().over().label('total_count')))).freeze()
+			rows = frozen().all()
+			result = frozen().columns(*range(len(query.column_descriptions)))
+			if rows:
+				total_count = rows[0][-1]
+			elif page > 1:
+				# Trang vượt quá cuối danh sách: không có dòng nào mang tổng số
+				total_count = await self._count(count_query)
+			else:
+				total_count = 0
+		else:
+			result = await self.db.execute(query)
+			if strategy == CountStrategy.EXACT:
+				# Với cursor, COUNT(*) OVER() chỉ đếm phần còn lại nên phải đếm riêng
+				total_count = await self._count(count_query)
+			elif strategy == CountStrategy.CACHED:
+				total_count = await self._cached_count(count_query)
+		items = result.scalars().all() if single_column else result.all()
+
+		has_more = len(items) > page_size
+		items = items[:page_size]
+		next_cursor = None
+		if sort_keys and has_more:
+			next_cursor = encode_cursor(signature, [row_value(items[-1], column) for column, is_desc in sort_keys])
+
+		return Pagination(
+			items=items,
+			total_count=total_count,
+			page=page,
+			page_size=page_size,
+			next_cursor=next_cursor,
+			has_more=has_more,
+			count_strategy=strategy.value,
+		)
+
+	async def _count(self, query: Select) -> int:
+		"""SELECT COUNT(*) FROM (query)"""
+		count_query = select(func.count()).select_from(query.order_by(None).subquery())
+		return (await self.db.execute(count_query)).scalar_one()
+
+	async def _cached_count(self, query: Select) -> int:
+		"""_count ghi nhớ theo câu SQL và tham số (cùng bộ lọc -> cùng khóa)"""
+		compiled = query.order_by(None).compile(dialect=self.db.get_bind().dialect)
+		key = (str(compiled), tuple(sorted((name, repr(value)) for name, value in compiled.params.items())))
+		cache = get_count_cache()
+		total_count = cache.get(key)
+		if total_count is None:
+			total_count = await self._count(query)
+			cache.set(key, total_count)
+		return total_count
+
+	async def create_many(self, rows: Sequence[dict], chunk_size: int | None = None, return_ids: bool = False) -> int | list[int]:
+		"""Tạo nhiều bản ghi bằng executemany theo từng lô
+
+		Không chạy @validates của model. Trả về số bản ghi, hoặc danh sách id
+		(cùng thứ tự với rows) nếu return_ids=True. Dialect không có
+		INSERT ... RETURNING nhiều dòng (MySQL) khi return_ids=True sẽ chèn từng
+		dòng một (mỗi dòng một round trip).
+		"""
+		if not rows:
+			return [] if return_ids else 0
+		autocommit = not self._in_managed_transaction()
+		dialect = self.db.get_bind().dialect
+		ids = []
+		try:
+			for chunk in _chunked(rows, chunk_size):
+				if not return_ids:
+					await self.db.execute(insert(self.model), chunk)
+				elif dialect.insert_executemany_returning:
+					result = await self.db.execute(insert(self.model).returning(self.model.id, sort_by_parameter_order=True), chunk)
+					ids.extend(result.scalars().all())
+				else:
+					# MySQL: không có RETURNING; id liên tiếp từ lastrowid là sai khi auto_increment_increment > 1,
+					# khi dòng có id sẵn hoặc với innodb_autoinc_lock_mode=2, nên chèn từng dòng và đọc id của nó
+					for row in chunk:
+						result = await self.db.execute(insert(self.model.__table__).values(row))
+						ids.append(result.inserted_primary_key[0])
+			if autocommit:
+				await self.db.commit()
+		except Exception:
+			if autocommit:
+				await self.db.rollback()
+			raise
+		return ids if return_ids else len(rows)
+
+	async def update_many(self, rows: Sequence[dict], chunk_size: int | None = None) -> int:
+		"""Cập nhật nhiều bản ghi theo id (mỗi dict phải có key 'id')"""
+		if not rows:
+			return 0
+		autocommit = not self._in_managed_transaction()
+		try:
+			for chunk in _chunked(rows, chunk_size):
+				await self.db.execute(update(self.model), chunk)
+			if autocommit:
+				await self.db.commit()
+		except Exception:
+			if autocommit:
+				await self.db.rollback()
+			raise
+		return len(rows)
+
+	async def upsert_many(
+		self,
+		rows: Sequence[dict],
+		update_columns: Iterable[str] | None = None,
+		conflict_columns: Iterable[str] = ('id',),
+		chunk_size: int | None = None,
+	) -> int:
+		"""INSERT ... ON DUPLICATE KEY UPDATE theo từng lô
+
+		update_columns: cột được ghi đè khi trùng khóa (mặc định mọi cột trừ khóa).
+		conflict_columns: unique key dùng cho SQLite; MySQL dùng mọi unique key.
+		Trả về tổng rowcount (MySQL: 1 cho mỗi dòng thêm mới, 2 cho mỗi dòng cập nhật).
+		"""
+		if not rows:
+			return 0
+		autocommit = not self._in_managed_transaction()
+		stmt = _build_upsert(
+			self.model,
+			self.db.get_bind().dialect.name,
+			_upsert_update_columns(rows, update_columns, conflict_columns),
+			conflict_columns,
+		)
+		affected = 0
+		try:
+			for chunk in _chunked(rows, chunk_size):
+				affected += (await self.db.execute(stmt, chunk)).rowcount
+			if autocommit:
+				await self.db.commit()
+		except Exception:
+			if autocommit:
+				await self.db.rollback()
+			raise
+		return affected
+
+	async def begin_transaction(self):
+		"""Bắt đầu transaction"""
+		if not self.db.in_transaction():
+			await self.db.begin()
+
+	async def commit(self):
+		"""Commit transaction"""
+		try:
+			await self.db.commit()
+		except Exception as e:
+			await self.rollback()
+			raise e
+
+	async def rollback(self):
+		"""Rollback transaction nếu có lỗi"""
+		await self.db.rollback()
+
+	@asynccontextmanager
+	async def transaction(self):
+		"""Context manager để quản lý transaction.
+
+		Có thể lồng nhau: chỉ block ngoài cùng mới commit/rollback, các
+		create/update/delete bên trong sẽ không tự commit.
+		"""
+		depth = self.db.info.get('transaction_depth', 0)
+		self.db.info['transaction_depth'] = depth + 1
+		try:
+			if depth == 0:
+				await self.begin_transaction()
+
+			yield  # Chạy code trong `async with transaction()`
+
+			# Commit nếu không có lỗi
+			if depth == 0:
+				await self.commit()
+		except Exception as e:
+			if depth == 0:
+				await self.rollback()
 			raise e
+		finally:
+			self.db.info['transaction_depth'] = depth
@@ -8,8 +8,12 @@ from typing import Any, Generic, List, TypeVar
 from fastapi import Body
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import Boolean, Column, DateTime, String, func, Integer
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 
 from app.core.database import Base
+from app.enums.base_enums import CountStrategy
 
 T = TypeVar('T')
 
@@ -66,6 +70,9 @@ class PagingInfo(BaseModel):
 	total_pages: int | None = Body(default=0, description='Tổng số trang', examples=[10])
 	page: int | None = Body(default=0, description='Trang hiện tại', examples=[1])
 	page_size: int | None = Body(default=0, description='Số lượng dữ liệu mỗi trang', examples=[10])
+	next_cursor: str | None = Body(default=None, description='Cursor của trang kế tiếp (None nếu là trang cuối)')
+	has_more: bool | None = Body(default=None, description='Còn dữ liệu ở trang kế tiếp hay không')
+	count_strategy: str | None = Body(default=None, description='Cách tính total: exact, cached (xấp xỉ) hoặc none (không có total)', examples=['exact'])
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -75,6 +82,36 @@ class PaginatedResponse(BaseModel, Generic[T]):
 	paging: PagingInfo | None = Body(default=PagingInfo(), description='Thông tin phân trang')
 
 
+class now_precise(FunctionElement):
+	"""CURRENT_TIMESTAMP with sub-second precision
+
+	For update_date columns used as row versions (ETags): two writes in the
+	same second must still give different values.
+	"""
+
+	type = DateTime()
+	inherit_cache = True
+
+
+@compiles(now_precise)
+def _now_precise_default(element, compiler, **kw):
+	return 'CURRENT_TIMESTAMP'
+
+
+@compiles(now_precise, 'mysql')
+def _now_precise_mysql(element, compiler, **kw):
+	return 'CURRENT_TIMESTAMP(6)'
+
+
+@compiles(now_precise, 'sqlite')
+def _now_precise_sqlite(element, compiler, **kw):
+	return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+# DATETIME(6) on MySQL, for columns written with now_precise()
+PreciseDateTime = DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
 class BaseEntity(Base):
 	"""Base model class containing common fields and methods"""
 
@@ -122,6 +159,8 @@ class FilterableRequestSchema(RequestSchema):
 
 	page: int | None = Field(default=1, ge=1, description='Page number')
 	page_size: int | None = Field(default=10, ge=1, description='Number of items per page')
+	cursor: str | None = Field(default=None, description='Cursor from paging.next_cursor of the previous page (keyset pagination, page is ignored)')
+	count_strategy: CountStrategy | None = Field(default=None, description='Total count strategy: exact, cached or none (default DB_COUNT_STRATEGY)')
 	filters: List[Filter] | None = Field(default=[], description='List of dynamic filters')
 
 	def model_dump(self, **kwargs):
@@ -138,12 +177,17 @@ class Pagination(BaseModel, Generic[T]):
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
 	items: List[T]
-	total_count: int
+	total_count: int | None
 	page: int
 	page_size: int
+	next_cursor: str | None = None
+	has_more: bool = False
+	count_strategy: str = 'exact'
 
 	@property
-	def total_pages(self) -> int:
+	def total_pages(self) -> int | None:
+		if self.total_count is None:
+			return None
 		return (self.total_count + self.page_size - 1) // self.page_size
 
 	@property
@@ -152,4 +196,4 @@ class Pagination(BaseModel, Generic[T]):
 
 	@property
 	def has_next(self) -> bool:
-		return self.page < self.total_pages
+		return self.has_more
@@ -20,7 +20,106 @@ DB_HOST = os.getenv('DB_HOST', 'localhost')
 
 DB_PORT = os.getenv('DB_PORT', '3306')
 DB_NAME = os.getenv('DB_NAME', 'bofitest3')
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{quote(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = os.getenv('DATABASE_URL', f"mysql+pymysql://{DB_USER}:{quote(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+# Async driver URL used by the API (e.g. sqlite+aiosqlite:///./test.db for local tests)
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', f"mysql+aiomysql://{DB_USER}:{quote(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+
+# Read replicas (comma separated sync URLs). Async URLs default to the same hosts with the aiomysql driver
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+ASYNC_DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('ASYNC_DATABASE_REPLICA_URLS', '').split(',') if url.strip()] or [
+	url.replace('mysql+pymysql://', 'mysql+aiomysql://', 1) for url in DATABASE_REPLICA_URLS
+]
+# After a write, the caller keeps reading from the primary for this many seconds (read-your-writes)
+DB_PRIMARY_STICKY_SECONDS = int(os.getenv('DB_PRIMARY_STICKY_SECONDS', '5'))
+
+# Connection pool settings (per engine, per process)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '5'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+# Must stay below MySQL wait_timeout so idle connections are replaced before the server drops them
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+DB_POOL_USE_LIFO = os.getenv('DB_POOL_USE_LIFO', 'true').lower() == 'true'
+# Global cap shared by every API worker and Celery process (0 = no cap), see app.core.db_pool
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '0'))
+DB_RESERVED_CONNECTIONS = int(os.getenv('DB_RESERVED_CONNECTIONS', '5'))
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '4'))
+CELERY_WORKER_CONCURRENCY = int(os.getenv('CELERY_WORKER_CONCURRENCY', '4'))
+# Rows per statement for BaseDAL.create_many / update_many / upsert_many
+DB_BULK_CHUNK_SIZE = int(os.getenv('DB_BULK_CHUNK_SIZE', '1000'))
+# Default total-count strategy of paginated lists: exact | cached | none
+DB_COUNT_STRATEGY = os.getenv('DB_COUNT_STRATEGY', 'exact')
+# Memoized totals of the `cached` strategy
+DB_COUNT_CACHE_TTL = int(os.getenv('DB_COUNT_CACHE_TTL', '60'))
+DB_COUNT_CACHE_SIZE = int(os.getenv('DB_COUNT_CACHE_SIZE', '1024'))
+# Largest page_size of interactive lists, whole-catalog reads go through the streaming export
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+# Rows fetched per round trip by the streaming catalog export (server-side cursor)
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+# Per-request SQL statistics
+# Opt-in: Server-Timing / X-DB-* response headers (statement counts and DB time of every request)
+DB_DEBUG_HEADERS = os.getenv('DB_DEBUG_HEADERS', 'false').lower() == 'true'
+# Opt-in: bound values in the slow-query log (otherwise only their count and types, values may be personal data)
+DB_LOG_QUERY_PARAMS = os.getenv('DB_LOG_QUERY_PARAMS', 'false').lower() == 'true'
+DB_SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', '5'))
+DB_QUERY_STATS_TOP = int(os.getenv('DB_QUERY_STATS_TOP', '5'))
+
+# In-process cache of product detail responses (per worker)
+PRODUCT_CACHE_SIZE = int(os.getenv('PRODUCT_CACHE_SIZE', '2048'))
+PRODUCT_CACHE_TTL = int(os.getenv('PRODUCT_CACHE_TTL', '60'))
+# In-process copy of the dimension tables (categories, sizes): checks the Redis version every
+# DIMENSION_CACHE_POLL_SECONDS, reloads from the DB at least every DIMENSION_CACHE_TTL seconds
+DIMENSION_CACHE_POLL_SECONDS = float(os.getenv('DIMENSION_CACHE_POLL_SECONDS', '5'))
+DIMENSION_CACHE_TTL = int(os.getenv('DIMENSION_CACHE_TTL', '300'))
+
+# Redis: Celery uses the broker DB, response caches use REDIS_CACHE_URL (broker host, DB 1 by default)
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL', CELERY_BROKER_URL.replace('/0', '/1'))
+# Cache calls give up after this many seconds; after a failure Redis is skipped for REDIS_RETRY_SECONDS
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '0.25'))
+REDIS_RETRY_SECONDS = int(os.getenv('REDIS_RETRY_SECONDS', '10'))
+
+# Redis cache of product search pages: fresh for SEARCH_CACHE_TTL seconds, then served stale
+# (and refreshed in the background) for up to SEARCH_CACHE_STALE_TTL more seconds
+SEARCH_CACHE_ENABLED = os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '30'))
+SEARCH_CACHE_STALE_TTL = int(os.getenv('SEARCH_CACHE_STALE_TTL', '300'))
+# Upper edges of the price facet buckets: <50, 50-100, ..., >=1000
+PRICE_FACET_BUCKETS = [float(edge) for edge in os.getenv('PRICE_FACET_BUCKETS', '50,100,200,500,1000').split(',') if edge.strip()]
+
+# "Customers also bought/wished" (GET /products/{id}/similar): neighbors kept per product, weight of a
+# wishlist row against a completed order (1.0), users with more products are left out (bots, resellers),
+# product columns per similarity block, Celery beat rebuild interval, per-worker cache of neighbor lists
+RECOMMENDATIONS_TOP_K = int(os.getenv('RECOMMENDATIONS_TOP_K', '20'))
+RECOMMENDATIONS_WISHLIST_WEIGHT = float(os.getenv('RECOMMENDATIONS_WISHLIST_WEIGHT', '0.5'))
+RECOMMENDATIONS_MAX_ITEMS_PER_USER = int(os.getenv('RECOMMENDATIONS_MAX_ITEMS_PER_USER', '500'))
+RECOMMENDATIONS_BLOCK_SIZE = int(os.getenv('RECOMMENDATIONS_BLOCK_SIZE', '2000'))
+RECOMMENDATIONS_REBUILD_SECONDS = int(os.getenv('RECOMMENDATIONS_REBUILD_SECONDS', str(6 * 60 * 60)))
+RECOMMENDATIONS_CACHE_SIZE = int(os.getenv('RECOMMENDATIONS_CACHE_SIZE', '4096'))
+RECOMMENDATIONS_CACHE_TTL = int(os.getenv('RECOMMENDATIONS_CACHE_TTL', '300'))
+
+# Best-seller / most-wishlisted leaderboards (Redis sorted sets): weight of a wishlist add in the
+# popularity score (a sold unit is 1), window copied to products.popularity (sort_by=popularity),
+# Celery beat intervals of the window rollup and of the reconciliation against MySQL
+LEADERBOARD_WISH_WEIGHT = float(os.getenv('LEADERBOARD_WISH_WEIGHT', '0.5'))
+LEADERBOARD_POPULARITY_WINDOW = os.getenv('LEADERBOARD_POPULARITY_WINDOW', '7d')
+LEADERBOARD_ROLLUP_SECONDS = int(os.getenv('LEADERBOARD_ROLLUP_SECONDS', '300'))
+LEADERBOARD_RECONCILE_SECONDS = int(os.getenv('LEADERBOARD_RECONCILE_SECONDS', '3600'))
+
+# Catalog import (Celery): rows validated and written per transaction, error rows kept on the job
+CATALOG_IMPORT_CHUNK_SIZE = int(os.getenv('CATALOG_IMPORT_CHUNK_SIZE', '2000'))
+CATALOG_IMPORT_MAX_ERRORS = int(os.getenv('CATALOG_IMPORT_MAX_ERRORS', '1000'))
+
+# MinIO object storage (app.utils.minio.minio_handler)
+MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'localhost:9000')
+MINIO_ACCESS_KEY = os.getenv('MINIO_ACCESS_KEY', 'minioadmin')
+MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY', 'minioadmin')
+MINIO_BUCKET_NAME = os.getenv('MINIO_BUCKET_NAME', 'meobeo-ai')
+MINIO_SECURE = os.getenv('MINIO_SECURE', 'false').lower() == 'true'
+
 SMTP_USERNAME = os.getenv('SMTP_USERNAME')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
 
@@ -54,7 +153,73 @@ class Settings(BaseModel):
 	API_V1_STR: str = API_V1_STR
 	API_V2_STR: str = API_V2_STR
 	DATABASE_URL: str = DATABASE_URL
+	ASYNC_DATABASE_URL: str = ASYNC_DATABASE_URL
 	SQLALCHEMY_DATABASE_URI: str = SQLALCHEMY_DATABASE_URI
+	DATABASE_REPLICA_URLS: list[str] = DATABASE_REPLICA_URLS
+	ASYNC_DATABASE_REPLICA_URLS: list[str] = ASYNC_DATABASE_REPLICA_URLS
+	DB_PRIMARY_STICKY_SECONDS: int = DB_PRIMARY_STICKY_SECONDS
+
+	# Connection pool
+	DB_POOL_SIZE: int = DB_POOL_SIZE
+	DB_MAX_OVERFLOW: int = DB_MAX_OVERFLOW
+	DB_POOL_TIMEOUT: int = DB_POOL_TIMEOUT
+	DB_POOL_RECYCLE: int = DB_POOL_RECYCLE
+	DB_POOL_PRE_PING: bool = DB_POOL_PRE_PING
+	DB_POOL_USE_LIFO: bool = DB_POOL_USE_LIFO
+	DB_MAX_CONNECTIONS: int = DB_MAX_CONNECTIONS
+	DB_RESERVED_CONNECTIONS: int = DB_RESERVED_CONNECTIONS
+	WORKER_CONCURRENCY: int = WORKER_CONCURRENCY
+	CELERY_WORKER_CONCURRENCY: int = CELERY_WORKER_CONCURRENCY
+	DB_BULK_CHUNK_SIZE: int = DB_BULK_CHUNK_SIZE
+	DB_COUNT_STRATEGY: str = DB_COUNT_STRATEGY
+	DB_COUNT_CACHE_TTL: int = DB_COUNT_CACHE_TTL
+	DB_COUNT_CACHE_SIZE: int = DB_COUNT_CACHE_SIZE
+	MAX_PAGE_SIZE: int = MAX_PAGE_SIZE
+	EXPORT_BATCH_SIZE: int = EXPORT_BATCH_SIZE
+
+	DB_DEBUG_HEADERS: bool = DB_DEBUG_HEADERS
+	DB_LOG_QUERY_PARAMS: bool = DB_LOG_QUERY_PARAMS
+	DB_SLOW_QUERY_MS: float = DB_SLOW_QUERY_MS
+	DB_N_PLUS_ONE_THRESHOLD: int = DB_N_PLUS_ONE_THRESHOLD
+	DB_QUERY_STATS_TOP: int = DB_QUERY_STATS_TOP
+
+	PRODUCT_CACHE_SIZE: int = PRODUCT_CACHE_SIZE
+	PRODUCT_CACHE_TTL: int = PRODUCT_CACHE_TTL
+	DIMENSION_CACHE_POLL_SECONDS: float = DIMENSION_CACHE_POLL_SECONDS
+	DIMENSION_CACHE_TTL: int = DIMENSION_CACHE_TTL
+
+	CELERY_BROKER_URL: str = CELERY_BROKER_URL
+	CELERY_RESULT_BACKEND: str = CELERY_RESULT_BACKEND
+	REDIS_CACHE_URL: str = REDIS_CACHE_URL
+	REDIS_SOCKET_TIMEOUT: float = REDIS_SOCKET_TIMEOUT
+	REDIS_RETRY_SECONDS: int = REDIS_RETRY_SECONDS
+
+	SEARCH_CACHE_ENABLED: bool = SEARCH_CACHE_ENABLED
+	SEARCH_CACHE_TTL: int = SEARCH_CACHE_TTL
+	SEARCH_CACHE_STALE_TTL: int = SEARCH_CACHE_STALE_TTL
+	PRICE_FACET_BUCKETS: list[float] = PRICE_FACET_BUCKETS
+
+	RECOMMENDATIONS_TOP_K: int = RECOMMENDATIONS_TOP_K
+	RECOMMENDATIONS_WISHLIST_WEIGHT: float = RECOMMENDATIONS_WISHLIST_WEIGHT
+	RECOMMENDATIONS_MAX_ITEMS_PER_USER: int = RECOMMENDATIONS_MAX_ITEMS_PER_USER
+	RECOMMENDATIONS_BLOCK_SIZE: int = RECOMMENDATIONS_BLOCK_SIZE
+	RECOMMENDATIONS_REBUILD_SECONDS: int = RECOMMENDATIONS_REBUILD_SECONDS
+	RECOMMENDATIONS_CACHE_SIZE: int = RECOMMENDATIONS_CACHE_SIZE
+	RECOMMENDATIONS_CACHE_TTL: int = RECOMMENDATIONS_CACHE_TTL
+
+	LEADERBOARD_WISH_WEIGHT: float = LEADERBOARD_WISH_WEIGHT
+	LEADERBOARD_POPULARITY_WINDOW: str = LEADERBOARD_POPULARITY_WINDOW
+	LEADERBOARD_ROLLUP_SECONDS: int = LEADERBOARD_ROLLUP_SECONDS
+	LEADERBOARD_RECONCILE_SECONDS: int = LEADERBOARD_RECONCILE_SECONDS
+
+	CATALOG_IMPORT_CHUNK_SIZE: int = CATALOG_IMPORT_CHUNK_SIZE
+	CATALOG_IMPORT_MAX_ERRORS: int = CATALOG_IMPORT_MAX_ERRORS
+
+	MINIO_ENDPOINT: str = MINIO_ENDPOINT
+	MINIO_ACCESS_KEY: str = MINIO_ACCESS_KEY
+	MINIO_SECRET_KEY: str = MINIO_SECRET_KEY
+	MINIO_BUCKET_NAME: str = MINIO_BUCKET_NAME
+	MINIO_SECURE: bool = MINIO_SECURE
 
 	# JWT Settings
 	SECRET_KEY: str = SECRET_KEY
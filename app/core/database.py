@@ -1,11 +1,20 @@
+import logging
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import DATABASE_URL
+from app.core.config import ASYNC_DATABASE_REPLICA_URLS, ASYNC_DATABASE_URL, DATABASE_URL
+from app.core.db_pool import build_engine_options, get_pool_stats
+from app.core.db_routing import PrimaryStickiness, make_routing_session_class
+from app.core.query_stats import install_query_instrumentation
+
+logger = logging.getLogger(__name__)
 
-# SQL Database setup
-engine = create_engine(DATABASE_URL)
+# SQL Database setup (sync - used by Celery tasks and scripts)
+engine = create_engine(DATABASE_URL, **build_engine_options(DATABASE_URL, 'primary'))
 
 SessionLocal = sessionmaker(
 	bind=engine,
@@ -13,8 +22,38 @@ SessionLocal = sessionmaker(
 	autoflush=False,
 )
 
+# Async SQL Database setup (used by API routes)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **build_engine_options(ASYNC_DATABASE_URL, 'primary_async', is_async=True))
+
+# Read replicas: SELECTs of API sessions go here, writes always go to async_engine
+async_replica_engines = [
+	create_async_engine(url, **build_engine_options(url, f'replica_{index}_async', is_async=True))
+	for index, url in enumerate(ASYNC_DATABASE_REPLICA_URLS, start=1)
+]
+
+AsyncSessionLocal = async_sessionmaker(
+	bind=async_engine,
+	class_=AsyncSession,
+	sync_session_class=make_routing_session_class([replica.sync_engine for replica in async_replica_engines]),
+	autocommit=False,
+	autoflush=False,
+	expire_on_commit=False,
+)
+
 Base = declarative_base()
 
+# Per-request statement count / timing (read by QueryStatsMiddleware)
+for _engine in [engine, async_engine.sync_engine, *[replica.sync_engine for replica in async_replica_engines]]:
+	install_query_instrumentation(_engine)
+
+
+def get_pool_status() -> list[dict]:
+	"""Connection pool statistics of every engine in this process"""
+	engines = {'primary': engine, 'primary_async': async_engine.sync_engine}
+	for index, replica in enumerate(async_replica_engines, start=1):
+		engines[f'replica_{index}_async'] = replica.sync_engine
+	return [get_pool_stats(name).snapshot(db_engine.pool) for name, db_engine in engines.items()]
+
 
 def get_db():
 	"""get_db"""
@@ -27,3 +66,23 @@ def get_db():
 		raise  # Quan trọng: Raise lại lỗi để FastAPI xử lý đúng
 	finally:
 		db.close()
+
+
+async def get_async_db(request: Request):
+	"""get_async_db
+
+	Callers that wrote recently (same credentials) read from the primary.
+	"""
+	db = AsyncSessionLocal()
+	sticky_key = PrimaryStickiness.make_key(request.headers.get('Authorization'))
+	db.info['sticky_key'] = sticky_key
+	if PrimaryStickiness().is_pinned(sticky_key):
+		db.info['use_primary'] = True
+	try:
+		yield db
+	except Exception as e:
+		await db.rollback()  # Rollback nếu có lỗi
+		logger.exception(f'Database session error: {e}')
+		raise  # Quan trọng: Raise lại lỗi để FastAPI xử lý đúng
+	finally:
+		await db.close()
@@ -0,0 +1,168 @@
+"""Connection pool configuration and statistics
+
+Pool sizing is derived from `Settings` so that every process (uvicorn workers +
+Celery workers) stays inside a global MySQL connection budget. Pools are created
+with instrumented classes that record how long callers wait for a connection,
+so the numbers can be read from an admin endpoint.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+	"""Thread-safe counters for the pools of one engine"""
+
+	def __init__(self, name: str):
+		self.name = name
+		self._lock = threading.Lock()
+		self.checkouts = 0
+		self.timeouts = 0
+		self.total_wait_ms = 0.0
+		self.max_wait_ms = 0.0
+		self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+	def record_checkout(self, wait_seconds: float, timed_out: bool = False) -> None:
+		"""Record one connection request and how long it waited"""
+		wait_ms = wait_seconds * 1000
+		bucket = len(WAIT_BUCKETS_MS)
+		for index, upper in enumerate(WAIT_BUCKETS_MS):
+			if wait_ms <= upper:
+				bucket = index
+				break
+
+		with self._lock:
+			if timed_out:
+				self.timeouts += 1
+			else:
+				self.checkouts += 1
+			self.total_wait_ms += wait_ms
+			self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+			self.wait_histogram[bucket] += 1
+
+	def reset(self) -> None:
+		"""Reset all counters"""
+		with self._lock:
+			self.checkouts = 0
+			self.timeouts = 0
+			self.total_wait_ms = 0.0
+			self.max_wait_ms = 0.0
+			self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+	def snapshot(self, pool=None) -> dict:
+		"""Return counters plus the live state of `pool` as a dict"""
+		with self._lock:
+			requests = self.checkouts + self.timeouts
+			histogram = {f'le_{upper}ms': count for upper, count in zip(WAIT_BUCKETS_MS, self.wait_histogram)}
+			histogram[f'gt_{WAIT_BUCKETS_MS[-1]}ms'] = self.wait_histogram[-1]
+			data = {
+				'name': self.name,
+				'checkouts': self.checkouts,
+				'timeouts': self.timeouts,
+				'avg_wait_ms': round(self.total_wait_ms / requests, 3) if requests else 0.0,
+				'max_wait_ms': round(self.max_wait_ms, 3),
+				'wait_histogram': histogram,
+			}
+
+		if isinstance(pool, QueuePool):
+			data.update(
+				{
+					'pool_size': pool.size(),
+					'checked_out': pool.checkedout(),
+					'checked_in': pool.checkedin(),
+					'overflow': max(0, pool.overflow()),
+					'max_overflow': pool._max_overflow,
+				}
+			)
+		return data
+
+
+_pool_stats: dict[str, PoolStats] = {}
+
+
+def get_pool_stats(name: str) -> PoolStats:
+	"""Get (or create) the stats collector of a named pool"""
+	stats = _pool_stats.get(name)
+	if stats is None:
+		stats = _pool_stats.setdefault(name, PoolStats(name))
+	return stats
+
+
+class _InstrumentedPoolMixin:
+	"""Time every `connect()` (queue wait + connect + pre-ping).
+
+	Stats are looked up by the pool logging name so they survive `recreate()`.
+	"""
+
+	def connect(self):
+		stats = get_pool_stats(self._orig_logging_name or 'default')
+		started = time.perf_counter()
+		try:
+			connection = super().connect()
+		except exc.TimeoutError:
+			stats.record_checkout(time.perf_counter() - started, timed_out=True)
+			logger.warning(f'Connection pool "{stats.name}" exhausted: {self.status()}')
+			raise
+		stats.record_checkout(time.perf_counter() - started)
+		return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+	"""QueuePool with checkout wait statistics"""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+	"""AsyncAdaptedQueuePool with checkout wait statistics"""
+
+
+def get_pool_budget(settings: Settings) -> tuple[int, int]:
+	"""Compute (pool_size, max_overflow) for one engine of one process
+
+	Without `DB_MAX_CONNECTIONS` the configured values are used as-is. With a cap,
+	the connections left after `DB_RESERVED_CONNECTIONS` are split evenly across
+	`WORKER_CONCURRENCY` uvicorn workers and `CELERY_WORKER_CONCURRENCY` Celery
+	processes, and pool_size + max_overflow is clamped to that share.
+	"""
+	pool_size = max(1, settings.DB_POOL_SIZE)
+	max_overflow = max(0, settings.DB_MAX_OVERFLOW)
+	if settings.DB_MAX_CONNECTIONS <= 0:
+		return pool_size, max_overflow
+
+	processes = max(1, settings.WORKER_CONCURRENCY + settings.CELERY_WORKER_CONCURRENCY)
+	budget = max(1, (settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS) // processes)
+	pool_size = min(pool_size, budget)
+	max_overflow = min(max_overflow, budget - pool_size)
+	return pool_size, max_overflow
+
+
+def build_engine_options(url: str, name: str, is_async: bool = False, settings: Settings | None = None) -> dict:
+	"""Keyword arguments for create_engine / create_async_engine"""
+	if make_url(url).get_backend_name() == 'sqlite':
+		# SQLite (tests) keeps SQLAlchemy's default pool
+		return {}
+
+	settings = settings or get_settings()
+	pool_size, max_overflow = get_pool_budget(settings)
+	logger.info(f'Engine "{name}": pool_size={pool_size}, max_overflow={max_overflow}, recycle={settings.DB_POOL_RECYCLE}s')
+	return {
+		'poolclass': InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+		'pool_size': pool_size,
+		'max_overflow': max_overflow,
+		'pool_timeout': settings.DB_POOL_TIMEOUT,
+		'pool_recycle': settings.DB_POOL_RECYCLE,
+		'pool_pre_ping': settings.DB_POOL_PRE_PING,
+		'pool_use_lifo': settings.DB_POOL_USE_LIFO,
+		'pool_logging_name': name,
+	}
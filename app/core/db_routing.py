@@ -0,0 +1,110 @@
+"""Read/write splitting for SQLAlchemy sessions
+
+`RoutingSession` sends plain SELECT statements to a read replica and everything
+else (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw SQL) to the
+primary. Once a session has written, it stays on the primary, and the caller
+that wrote is pinned to the primary for `DB_PRIMARY_STICKY_SECONDS` so the next
+requests never read stale data from a lagging replica.
+"""
+
+import hashlib
+import logging
+import random
+import time
+
+from sqlalchemy import CompoundSelect, Select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PrimaryStickiness:
+	"""Remember which callers wrote recently and must read from the primary
+
+	Pins live in the memory of the worker process, so a caller is only pinned on
+	the worker that handled the write. Keep the window short (a few seconds).
+	"""
+
+	_instance = None
+
+	def __new__(cls):
+		if cls._instance is None:
+			cls._instance = super(PrimaryStickiness, cls).__new__(cls)
+			cls._instance._pins = {}
+		return cls._instance
+
+	@staticmethod
+	def make_key(credentials: str | None) -> str | None:
+		"""Stable key for a caller, derived from its credentials (never stored raw)"""
+		if not credentials:
+			return None
+		return hashlib.sha1(credentials.encode('utf-8')).hexdigest()
+
+	def pin(self, key: str | None, seconds: int | None = None) -> None:
+		"""Pin `key` to the primary"""
+		if not key:
+			return
+		seconds = get_settings().DB_PRIMARY_STICKY_SECONDS if seconds is None else seconds
+		now = time.monotonic()
+		self._pins[key] = now + seconds
+		if len(self._pins) > 10000:
+			self._pins = {k: expires for k, expires in self._pins.items() if expires > now}
+
+	def is_pinned(self, key: str | None) -> bool:
+		"""Whether `key` wrote recently"""
+		if not key:
+			return False
+		expires = self._pins.get(key)
+		if expires is None:
+			return False
+		if expires <= time.monotonic():
+			self._pins.pop(key, None)
+			return False
+		return True
+
+
+def use_primary(session) -> None:
+	"""Send every remaining statement of `session` to the primary
+
+	Use before read-then-write flows (uniqueness checks, stock checks) so the
+	read sees the latest committed data. Works for Session and AsyncSession.
+	"""
+	session.info['use_primary'] = True
+
+
+class RoutingSession(Session):
+	"""Session that routes read-only statements to replicas
+
+	`replicas` is set on subclasses created by `make_routing_session_class`.
+	"""
+
+	replicas: list = []
+
+	def get_bind(self, mapper=None, clause=None, **kw):
+		if self.replicas:
+			if self._is_read_only(clause):
+				return random.choice(self.replicas)
+			self._mark_write(clause)
+		return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+	def _is_read_only(self, clause) -> bool:
+		if self._flushing or self.info.get('use_primary'):
+			return False
+		if isinstance(clause, Select):
+			return clause._for_update_arg is None
+		return isinstance(clause, CompoundSelect)
+
+	def _mark_write(self, clause) -> None:
+		# session.connection() / raw SQL are not necessarily writes, only pin on DML and flushes
+		if self._flushing or getattr(clause, 'is_dml', False):
+			self.info['use_primary'] = True
+			PrimaryStickiness().pin(self.info.get('sticky_key'))
+
+
+def make_routing_session_class(replica_engines: list) -> type[RoutingSession]:
+	"""Build a RoutingSession subclass bound to `replica_engines`"""
+	if replica_engines:
+		logger.info(f'Read/write splitting enabled with {len(replica_engines)} replica(s)')
+	return type('ReplicaRoutingSession', (RoutingSession,), {'replicas': list(replica_engines)})
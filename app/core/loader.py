@@ -0,0 +1,155 @@
+"""Request-scoped DataLoaders
+
+Loaders live in `session.info`, so they share the lifetime of the request's
+AsyncSession. Keys requested in the same event-loop tick (e.g. inside
+asyncio.gather) are fetched with one `IN (...)` query, and every key is
+memoized, so asking twice for the same product or user costs one query.
+
+Usage:
+    loaders = get_loaders(db)
+    product = await loaders.load(Product, product_id)
+    users = await loaders.load_many(User, user_ids)
+    sizes = await loaders.named('product_sizes', dal.get_product_sizes_batch).load(product_id)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+from sqlalchemy import event, select
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+BatchFn = Callable[[list], Awaitable[dict]]
+
+
+class DataLoader(Generic[K, V]):
+	"""Batch and memoize lookups of one kind of key
+
+	`batch_fn(keys)` must return a dict {key: value}; keys missing from it load as None.
+	`key_fn` normalizes keys before lookup (e.g. '1' -> 1), so they match the keys of that dict.
+	"""
+
+	def __init__(self, batch_fn: BatchFn, lock: asyncio.Lock | None = None, key_fn: Callable[[Any], K] | None = None):
+		self._batch_fn = batch_fn
+		self._key_fn = key_fn
+		# One AsyncSession cannot run two queries at once, loaders of a session share this lock
+		self._lock = lock or asyncio.Lock()
+		self._cache: dict[K, asyncio.Future] = {}
+		self._queue: list[tuple[K, asyncio.Future]] = []
+		# Running dispatches: the loop only holds weak references to tasks
+		self._tasks: set[asyncio.Task] = set()
+
+	async def load(self, key: K) -> V | None:
+		"""Value of `key`, batched with the other keys requested in the same tick"""
+		key = self._key(key)
+		future = self._cache.get(key)
+		if future is None:
+			future = asyncio.get_running_loop().create_future()
+			self._cache[key] = future
+			self._queue.append((key, future))
+			if len(self._queue) == 1:
+				asyncio.get_running_loop().call_soon(self._start_dispatch)
+		return await future
+
+	async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+		"""Values of `keys` (same order), fetched with one query"""
+		return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+	def prime(self, key: K, value: V) -> None:
+		"""Memoize a value loaded elsewhere (e.g. a page of search results)"""
+		key = self._key(key)
+		if key not in self._cache:
+			future = asyncio.get_running_loop().create_future()
+			future.set_result(value)
+			self._cache[key] = future
+
+	def clear(self, key: K | None = None) -> None:
+		"""Forget one key (after it was changed or deleted) or every key"""
+		if key is None:
+			self._cache.clear()
+		else:
+			self._cache.pop(self._key(key), None)
+
+	def _key(self, key) -> K:
+		return self._key_fn(key) if self._key_fn is not None and key is not None else key
+
+	def _start_dispatch(self) -> None:
+		# Keep a reference until done, a collected dispatch would leave its loads waiting forever
+		task = asyncio.ensure_future(self._dispatch())
+		self._tasks.add(task)
+		task.add_done_callback(self._tasks.discard)
+
+	async def _dispatch(self) -> None:
+		queue, self._queue = self._queue, []
+		keys = [key for key, _future in queue]
+		futures = [future for _key, future in queue]
+		try:
+			async with self._lock:
+				values = await self._batch_fn(keys)
+		except Exception as ex:
+			for key, future in zip(keys, futures):
+				# Failed keys are not memoized, the next load retries
+				if self._cache.get(key) is future:
+					del self._cache[key]
+				if not future.done():
+					future.set_exception(ex)
+			return
+		for key, future in zip(keys, futures):
+			if not future.done():
+				future.set_result(values.get(key))
+
+
+class LoaderRegistry:
+	"""DataLoaders of one session: one per model (by id) plus named custom loaders"""
+
+	def __init__(self, session):
+		self.session = session
+		self._lock = asyncio.Lock()
+		self._loaders: dict[Any, DataLoader] = {}
+		# Rollback expires the loaded objects, drop them instead of handing out stale instances
+		event.listen(getattr(session, 'sync_session', session), 'after_rollback', lambda _session: self.clear())
+
+	def entity(self, model) -> DataLoader:
+		"""Loader of `model` rows by id
+
+		Ids are coerced to the primary key's Python type: results are keyed by
+		row.id, an id given as '1' (e.g. from a JWT claim) must find row 1.
+		"""
+		loader = self._loaders.get(model)
+		if loader is None:
+
+			async def batch_fn(ids: list) -> dict:
+				result = await self.session.execute(select(model).where(model.id.in_(ids)))
+				return {row.id: row for row in result.scalars().all()}
+
+			loader = self._loaders[model] = DataLoader(batch_fn, self._lock, key_fn=model.id.type.python_type)
+		return loader
+
+	def named(self, name: str, batch_fn: BatchFn) -> DataLoader:
+		"""Custom loader registered under `name` (the first batch_fn wins)"""
+		loader = self._loaders.get(name)
+		if loader is None:
+			loader = self._loaders[name] = DataLoader(batch_fn, self._lock)
+		return loader
+
+	async def load(self, model, item_id):
+		"""Shortcut for entity(model).load(item_id)"""
+		return await self.entity(model).load(item_id)
+
+	async def load_many(self, model, item_ids: Iterable) -> list:
+		"""Shortcut for entity(model).load_many(item_ids)"""
+		return await self.entity(model).load_many(item_ids)
+
+	def clear(self) -> None:
+		"""Forget everything memoized (e.g. after a rollback)"""
+		for loader in self._loaders.values():
+			loader.clear()
+
+
+def get_loaders(session) -> LoaderRegistry:
+	"""LoaderRegistry of `session`, created on first use"""
+	registry = session.info.get('loaders')
+	if registry is None:
+		registry = session.info['loaders'] = LoaderRegistry(session)
+	return registry
@@ -0,0 +1,147 @@
+"""Per-request SQL statistics
+
+Engine events record every statement executed while a request is active (see
+QueryStatsMiddleware): statement count, total DB time, the slowest statements
+and how often each statement fingerprint repeats. A fingerprint executed many
+times in one request is reported as an N+1 suspect.
+
+Outside a request (Celery tasks, scripts) nothing is recorded.
+"""
+
+import hashlib
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+_current_stats: ContextVar['QueryStats | None'] = ContextVar('query_stats', default=None)
+
+# Collapse expanded IN lists, "(?, ?, ?)" / "(%s, %s)", so batches of any size share a fingerprint
+_IN_LIST_RE = re.compile(r'\(\s*(\?|%s|%\(\w+\)s)(\s*,\s*(\?|%s|%\(\w+\)s))*\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_statement(statement: str) -> str:
+	"""SQL text with whitespace and IN lists collapsed"""
+	statement = _WHITESPACE_RE.sub(' ', statement).strip()
+	return _IN_LIST_RE.sub('(?+)', statement)
+
+
+def fingerprint(statement: str) -> str:
+	"""Short stable id of a statement shape (bound values excluded)"""
+	return hashlib.sha1(normalize_statement(statement).encode('utf-8')).hexdigest()[:12]
+
+
+@dataclass
+class StatementRecord:
+	fingerprint: str
+	duration_ms: float
+	statement: str
+	parameters: str
+
+
+@dataclass
+class QueryStats:
+	"""Statements of one request"""
+
+	top_n: int = 5
+	count: int = 0
+	total_ms: float = 0.0
+	slowest: list[StatementRecord] = field(default_factory=list)
+	fingerprints: Counter = field(default_factory=Counter)
+	samples: dict[str, str] = field(default_factory=dict)
+
+	def record(self, statement: str, parameters, duration_ms: float) -> StatementRecord:
+		key = fingerprint(statement)
+		self.count += 1
+		self.total_ms += duration_ms
+		self.fingerprints[key] += 1
+		self.samples.setdefault(key, normalize_statement(statement))
+
+		record = StatementRecord(key, duration_ms, normalize_statement(statement), _format_parameters(parameters))
+		if len(self.slowest) < self.top_n or duration_ms > self.slowest[-1].duration_ms:
+			self.slowest.append(record)
+			self.slowest.sort(key=lambda item: item.duration_ms, reverse=True)
+			del self.slowest[self.top_n :]
+		return record
+
+	def n_plus_one_suspects(self, threshold: int | None = None) -> list[tuple[str, int, str]]:
+		"""[(fingerprint, executions, sql)] of statements repeated at least `threshold` times"""
+		threshold = threshold or get_settings().DB_N_PLUS_ONE_THRESHOLD
+		return [(key, count, self.samples[key]) for key, count in self.fingerprints.most_common() if count >= threshold]
+
+	def as_dict(self) -> dict:
+		return {
+			'queries': self.count,
+			'db_ms': round(self.total_ms, 2),
+			'slowest': [
+				{'fingerprint': item.fingerprint, 'ms': round(item.duration_ms, 2), 'sql': item.statement, 'params': item.parameters} for item in self.slowest
+			],
+			'n_plus_one': [{'fingerprint': key, 'executions': count, 'sql': sql} for key, count, sql in self.n_plus_one_suspects()],
+		}
+
+
+def _format_parameters(parameters, limit: int = 200) -> str:
+	"""Bound values, or only their count and types unless DB_LOG_QUERY_PARAMS (emails, hashes, search terms)"""
+	if not get_settings().DB_LOG_QUERY_PARAMS:
+		return _describe_parameters(parameters)
+	text = repr(parameters)
+	return text if len(text) <= limit else text[:limit] + '...'
+
+
+def _describe_parameters(parameters) -> str:
+	# executemany: a list of parameter sets, described by its first one
+	if isinstance(parameters, list) and parameters and isinstance(parameters[0], (dict, tuple, list)):
+		return f'{len(parameters)} rows of {_describe_parameters(parameters[0])}'
+	values = list(parameters.values()) if isinstance(parameters, dict) else list(parameters or ())
+	return f"{len(values)} params ({', '.join(type(value).__name__ for value in values)})"
+
+
+def start_request_stats() -> tuple[QueryStats, object]:
+	"""Start collecting for the current request; returns (stats, token for stop_request_stats)"""
+	stats = QueryStats(top_n=get_settings().DB_QUERY_STATS_TOP)
+	return stats, _current_stats.set(stats)
+
+
+def stop_request_stats(token) -> None:
+	_current_stats.reset(token)
+
+
+def get_request_stats() -> QueryStats | None:
+	"""Stats of the current request, None outside a request"""
+	return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+	if _current_stats.get() is not None:
+		conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+	stats = _current_stats.get()
+	started = conn.info.get('query_start_time')
+	if stats is None or not started:
+		return
+	stats.record(statement, parameters, (time.perf_counter() - started.pop()) * 1000)
+
+
+def _handle_error(exception_context):
+	# Failed statements never reach after_cursor_execute, drop their start time
+	connection = exception_context.connection
+	started = connection.info.get('query_start_time') if connection is not None else None
+	if started:
+		started.pop()
+
+
+def install_query_instrumentation(db_engine: Engine) -> None:
+	"""Record the statements of `db_engine` (sync Engine, use .sync_engine for async engines)"""
+	if not event.contains(db_engine, 'before_cursor_execute', _before_cursor_execute):
+		event.listen(db_engine, 'before_cursor_execute', _before_cursor_execute)
+		event.listen(db_engine, 'after_cursor_execute', _after_cursor_execute)
+		event.listen(db_engine, 'handle_error', _handle_error)
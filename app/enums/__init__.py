@@ -3,6 +3,9 @@
 # Base enums
 from .base_enums import BaseEnum, BaseErrorCode, BaseMetadataEnum, Constants
 
+# Catalog enums
+from .catalog_enums import CatalogImportStatusEnum
+
 # Meeting enums
 from .meeting_enums import MeetingStatusEnum, MeetingTypeEnum
 
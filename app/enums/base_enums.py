@@ -30,3 +30,11 @@ class Constants(BaseEnum):
 	"""Constants"""
 
 	PAGE_SIZE = 10
+
+
+class CountStrategy(BaseEnum):
+	"""How paginated lists compute their total count"""
+
+	EXACT = 'exact'  # COUNT(*) OVER() in the page query, one round trip
+	CACHED = 'cached'  # separate COUNT memoized per filter signature for DB_COUNT_CACHE_TTL seconds
+	NONE = 'none'  # no total, only has_more
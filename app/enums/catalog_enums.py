@@ -0,0 +1,13 @@
+"""Catalog enums"""
+
+from enum import Enum
+
+
+class CatalogImportStatusEnum(str, Enum):
+	"""Catalog import job status enumeration"""
+
+	PENDING = 'pending'  # uploaded, waiting for a Celery worker
+	RUNNING = 'running'
+	COMPLETED = 'completed'  # every row processed (error rows are listed on the job)
+	FAILED = 'failed'  # stopped on an unreadable file or a database error, rerun resumes it
+
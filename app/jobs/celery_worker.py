@@ -31,6 +31,23 @@ celery_app.conf.update(
 	# Task time limits to prevent hanging tasks
 	task_time_limit=24 * 60 * 60,  # 24 hours (comment corrected)
 	task_soft_time_limit=24 * 60 * 60,  # 24 hours (comment corrected)
+	# Periodic tasks (run `celery -A app.jobs.celery_worker beat` once per deployment)
+	beat_schedule={
+		'rebuild-similar-products': {
+			'task': 'recommendations.build_similar_products',
+			'schedule': settings.RECOMMENDATIONS_REBUILD_SECONDS,
+		},
+		'roll-up-leaderboards': {
+			'task': 'leaderboards.refresh_leaderboards',
+			'schedule': settings.LEADERBOARD_ROLLUP_SECONDS,
+			'args': (False,),
+		},
+		'reconcile-leaderboards': {
+			'task': 'leaderboards.refresh_leaderboards',
+			'schedule': settings.LEADERBOARD_RECONCILE_SECONDS,
+			'args': (True,),
+		},
+	},
 )
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
 import asyncio
+import io
 import json
 import logging
 import os
@@ -6,6 +7,7 @@ from datetime import datetime
 
 from celery import Task
 from pytz import timezone
+from sqlalchemy.exc import OperationalError
 
 from app.core.database import SessionLocal
 from app.enums.meeting_enums import TokenOperationTypeEnum
@@ -35,3 +37,54 @@ class CallbackTask(Task):
 		"""
 		logger.debug(f'Task {task_id} failed with exception: {exc}')
 		pass
+
+
+@celery_app.task(bind=True, base=CallbackTask, name='catalog.import_catalog', max_retries=3)
+def import_catalog(self, job_id: int) -> dict:
+	"""Import an uploaded catalog file (see CatalogImporter)
+
+	Progress is saved after every chunk: a retry, or a redelivery after the
+	worker died (task_acks_late), continues after the last committed chunk.
+	"""
+	from app.modules.products.repository.catalog_import_repo import CatalogImporter
+	from app.utils.minio import minio_handler
+
+	with SessionLocal() as db:
+		importer = CatalogImporter(db, job_id, on_progress=lambda progress: self.update_state(state='PROGRESS', meta=progress))
+		response = minio_handler.open_stream(importer.job.object_name)
+		try:
+			# newline='' keeps line breaks inside quoted CSV fields; utf-8-sig drops the BOM Excel writes
+			return importer.run(io.TextIOWrapper(response, encoding='utf-8-sig', newline=''))
+		except OperationalError as ex:
+			# Lost DB connection / lock wait timeout: retry from the last committed chunk
+			raise self.retry(exc=ex, countdown=60)
+		finally:
+			response.close()
+			response.release_conn()
+
+
+@celery_app.task(bind=True, base=CallbackTask, name='recommendations.build_similar_products')
+def build_similar_products(self, force: bool = False) -> dict:
+	"""Rebuild the "customers also bought/wished" neighbor lists (see SimilarProductsBuilder)
+
+	Scheduled every RECOMMENDATIONS_REBUILD_SECONDS by Celery beat; skipped when
+	no order or wishlist row changed since the last build, unless `force`.
+	"""
+	from app.modules.recommendations.repository.similarity_builder import SimilarProductsBuilder
+
+	with SessionLocal() as db:
+		return SimilarProductsBuilder(db).run(force=force)
+
+
+@celery_app.task(bind=True, base=CallbackTask, name='leaderboards.refresh_leaderboards')
+def refresh_leaderboards(self, reconcile: bool = False) -> dict:
+	"""Roll the leaderboard windows and sync products.popularity (see LeaderboardRefresher)
+
+	Scheduled every LEADERBOARD_ROLLUP_SECONDS, and every
+	LEADERBOARD_RECONCILE_SECONDS with `reconcile` to rebuild the day buckets
+	from MySQL.
+	"""
+	from app.modules.products.repository.leaderboard_repo import LeaderboardRefresher
+
+	with SessionLocal() as db:
+		return LeaderboardRefresher(db).run(reconcile=reconcile)
@@ -0,0 +1,61 @@
+import json
+import logging
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import get_settings
+from app.core.query_stats import start_request_stats, stop_request_stats
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('app.slow_query')
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+	"""Collect the SQL statements of each request
+
+	With DB_DEBUG_HEADERS the numbers go into `Server-Timing` / `X-DB-Queries`
+	response headers. Slow statements and N+1 suspects are logged as one JSON
+	object per line in every environment, bound values redacted unless
+	DB_LOG_QUERY_PARAMS is set.
+	"""
+
+	async def dispatch(self, request: Request, call_next):
+		settings = get_settings()
+		stats, token = start_request_stats()
+		try:
+			response = await call_next(request)
+		finally:
+			stop_request_stats(token)
+
+		if settings.DB_DEBUG_HEADERS:
+			response.headers['Server-Timing'] = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+			response.headers['X-DB-Queries'] = str(stats.count)
+			suspects = stats.n_plus_one_suspects()
+			if suspects:
+				response.headers['X-DB-N-Plus-One'] = ', '.join(f'{key}x{count}' for key, count, _sql in suspects)
+
+		for record in stats.slowest:
+			if record.duration_ms >= settings.DB_SLOW_QUERY_MS:
+				slow_query_logger.warning(
+					json.dumps(
+						{
+							'event': 'slow_query',
+							'method': request.method,
+							'path': request.url.path,
+							'duration_ms': round(record.duration_ms, 2),
+							'fingerprint': record.fingerprint,
+							'sql': record.statement,
+							'params': record.parameters,
+						},
+						ensure_ascii=False,
+					)
+				)
+		for key, count, sql in stats.n_plus_one_suspects():
+			slow_query_logger.warning(
+				json.dumps(
+					{'event': 'n_plus_one', 'method': request.method, 'path': request.url.path, 'fingerprint': key, 'executions': count, 'sql': sql},
+					ensure_ascii=False,
+				)
+			)
+		return response
@@ -0,0 +1,23 @@
+import logging
+from app.core.base_repo import BaseRepo
+from app.core.base_dal import get_count_cache
+from app.core.database import get_pool_status
+from app.modules.products.cache.product_cache import ProductCache
+from app.modules.products.cache.search_cache import ProductSearchCache
+
+logger = logging.getLogger(__name__)
+
+class AdminRepo(BaseRepo):
+    """Repository for operational/admin endpoints"""
+
+    def get_db_pool_stats(self) -> list[dict]:
+        """Connection pool statistics of the current worker process"""
+        return get_pool_status()
+
+    def get_cache_stats(self) -> dict:
+        """Hit/miss counters of the caches, as seen by the current worker process"""
+        return {
+            'product_detail': ProductCache().stats(),
+            'list_count': get_count_cache().stats(),
+            'product_search': ProductSearchCache().stats(),
+        }
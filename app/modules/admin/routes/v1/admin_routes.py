@@ -0,0 +1,95 @@
+import os
+from fastapi import APIRouter, Depends, File, UploadFile
+from app.core.base_model import APIResponse
+from app.enums.base_enums import BaseErrorCode
+from app.exceptions.handlers import handle_exceptions
+from app.middleware.auth_middleware import verify_admin
+from app.middleware.translation_manager import _
+from app.modules.admin.repository.admin_repo import AdminRepo
+from app.modules.products.repository.catalog_import_repo import CatalogImportRepo
+from app.modules.products.repository.order_repo import OrderRepo
+from app.modules.products.schemas.order_request import CompleteOrdersRequest
+
+route = APIRouter(prefix='/admin', tags=['Admin'], dependencies=[Depends(verify_admin)])
+
+
+@route.get('/db/pool', response_model=APIResponse)
+@handle_exceptions
+async def get_db_pool_stats(
+    repo: AdminRepo = Depends(),
+):
+    """Connection pool statistics (checked out, overflow, wait time histogram)
+
+    Numbers are per worker process; `pid` tells which worker answered.
+    """
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data={'pid': os.getpid(), 'engines': repo.get_db_pool_stats()},
+    )
+
+
+@route.get('/cache', response_model=APIResponse)
+@handle_exceptions
+async def get_cache_stats(
+    repo: AdminRepo = Depends(),
+):
+    """Hit/miss counters of the in-process caches (per worker process)"""
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data={'pid': os.getpid(), 'caches': repo.get_cache_stats()},
+    )
+
+
+@route.post('/catalog/imports', response_model=APIResponse)
+@handle_exceptions
+async def start_catalog_import(
+    file: UploadFile = File(..., description='Products as .csv (header row) or .ndjson, columns as in GET /products/export plus sku'),
+    repo: CatalogImportRepo = Depends(),
+):
+    """Import products from a supplier feed in the background
+
+    Rows are upserted by `sku`; `category` and `sizes` are names (created when
+    missing), `category_id` may be given instead of `category`. Returns the job,
+    poll GET /admin/catalog/imports/{job_id} for progress and rejected rows.
+    """
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=await repo.start_import(file),
+    )
+
+
+@route.get('/catalog/imports/{job_id}', response_model=APIResponse)
+@handle_exceptions
+async def get_catalog_import(
+    job_id: int,
+    repo: CatalogImportRepo = Depends(),
+):
+    """Progress of a catalog import job"""
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=await repo.get_job(job_id),
+    )
+
+
+@route.post('/orders/complete', response_model=APIResponse)
+@handle_exceptions
+async def complete_orders(
+    request: CompleteOrdersRequest,
+    repo: OrderRepo = Depends(),
+):
+    """Mark orders completed (delivered and paid)
+
+    Completed orders count as sold in the shopping history, the best-seller
+    leaderboards and the similar products.
+    Example body:
+    {"order_ids": [12, 13]}
+    """
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=await repo.complete_orders(request),
+    )
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, Enum, DateTime, Numeric, String
 from sqlalchemy.orm import validates, relationship
 
-from app.core.base_model import BaseEntity
+from app.core.base_model import BaseEntity, PreciseDateTime, now_precise
 
 
 class Category(BaseEntity):
@@ -10,6 +10,8 @@ class Category(BaseEntity):
     __tablename__ = 'categories'
 
     name_category = Column(String(100), nullable=False, unique=True)
+    # Row version: COUNT(*) + MAX(update_date) is the version of GET /categories/ (ETag)
+    update_date = Column(PreciseDateTime, nullable=False, server_default=now_precise(), onupdate=now_precise())
 
     @validates('name_category')
     def validate_name_category(self, key, name_category):
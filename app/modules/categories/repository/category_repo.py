@@ -1,8 +1,10 @@
+from datetime import datetime
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.modules.categories.dal.category_dal import CategoryDAL
 from app.modules.categories.schemas.category_response import CategoryResponse
+from app.modules.products.cache.dimension_cache import DimensionCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,17 +12,21 @@ logger = logging.getLogger(__name__)
 class CategoryRepo:
     """Repository for category-related operations"""
 
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
         self.db = db
         self.category_dal = CategoryDAL(db)
+        self.dimension_cache = DimensionCache()
 
-    def get_all_categories(self) -> list[CategoryResponse]:
-        """Retrieve all categories"""
+    async def get_all_categories(self) -> list[CategoryResponse]:
+        """Retrieve all categories, from the in-process DimensionCache (no query)"""
         try:
-            categories = self.category_dal.get_all_categories()
-            category_responses = [CategoryResponse.model_validate(category) for category in categories]
+            category_responses = (await self.dimension_cache.get()).categories
             logger.info(f"Returning {len(category_responses)} categories")
             return category_responses
         except Exception as ex:
             logger.exception(f"Error retrieving categories: {ex}")
-            raise
\ No newline at end of file
+            raise
+
+    async def get_categories_version(self) -> tuple[int, datetime | None]:
+        """Version of the category list, to answer conditional requests without loading it"""
+        return (await self.dimension_cache.get()).categories_version
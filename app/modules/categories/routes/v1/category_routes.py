@@ -1,19 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from app.core.base_model import APIResponse
 from app.enums.base_enums import BaseErrorCode
 from app.exceptions.handlers import handle_exceptions
 from app.middleware.translation_manager import _
 from app.modules.categories.repository.category_repo import CategoryRepo
+from app.utils.http_cache import CacheValidators
 
 route = APIRouter(prefix='/categories', tags=['Categories'])
 
 @route.get('/', response_model=APIResponse)
 @handle_exceptions
 async def get_all_categories(
+    http_request: Request,
+    response: Response,
     repo: CategoryRepo = Depends(),
 ):
-    """Get all categories with their IDs and names"""
-    categories = repo.get_all_categories()
+    """Get all categories with their IDs and names
+
+    Served from the in-process DimensionCache, without a query. Conditional:
+    answers 304 Not Modified when If-None-Match holds its ETag (or
+    If-Modified-Since is not older than it).
+    """
+    count, latest = await repo.get_categories_version()
+    # The language is part of the version: the message of the envelope is translated
+    validators = CacheValidators.for_version(
+        'categories', count, latest.isoformat() if latest else None, getattr(http_request.state, 'lang', None),
+        last_modified=latest)
+    if validators.is_fresh(http_request):
+        return validators.not_modified()
+    categories = await repo.get_all_categories()
+    validators.apply(response)
     return APIResponse(
         error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
         message=_('operation_successful'),
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, NamedTuple
+from sqlalchemy import select
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.db_routing import use_primary
+from app.modules.categories.dal.category_dal import CategoryDAL
+from app.modules.categories.schemas.category_response import CategoryResponse
+from app.modules.products.models.sizes import Size
+from app.utils.redis_client import get_sync_redis, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Bumped after commit by every write to a dimension table (catalog import, admin scripts)
+DIMENSIONS_VERSION_KEY = 'dimensions:version'
+# Unknown ids found in product rows reload the snapshot, at most this often
+MIN_RELOAD_SECONDS = 1.0
+
+
+def invalidate_dimensions_sync() -> bool:
+    """Bump the dimensions version from sync code, every worker reloads at its next poll"""
+    try:
+        get_sync_redis().incr(DIMENSIONS_VERSION_KEY)
+        return True
+    except Exception as ex:
+        # Workers still reload after DIMENSION_CACHE_TTL
+        logger.warning(f'Could not invalidate the dimension cache: {ex}')
+        return False
+
+
+class SizeEntry(NamedTuple):
+    id: int
+    name: str
+    sort_order: int
+
+
+@dataclass(frozen=True)
+class DimensionSnapshot:
+    """Categories and sizes as loaded at one point in time (shared, read-only)"""
+    categories: list[CategoryResponse]  # by id
+    sizes: dict[int, SizeEntry]
+    size_ids: dict[str, int]  # by case-folded name, like the ci collation of sizes.size_name
+    # (count, latest update_date) of the categories: version of GET /categories/
+    categories_version: tuple[int, datetime | None]
+    signal: str | None  # DIMENSIONS_VERSION_KEY when loaded
+    loaded_at: float
+
+    def size_ids_of(self, size_names: Iterable[str]) -> list[int]:
+        """Ids of the given size names, unknown names are skipped"""
+        found = (self.size_ids.get(str(size_name).casefold()) for size_name in size_names)
+        return list(dict.fromkeys(size_id for size_id in found if size_id is not None))
+
+    def size_names_of(self, size_ids: Iterable[int]) -> list[str]:
+        """Names of the given size ids in display order (sort_order, id), unknown ids are skipped"""
+        entries = sorted((self.sizes[size_id] for size_id in set(size_ids) if size_id in self.sizes), key=lambda size: (size.sort_order, size.id))
+        return [size.name for size in entries]
+
+
+class DimensionCache:
+    """Process-wide copy of the small, rarely changing dimension tables (categories, sizes)
+
+    Lets repositories translate size names to ids, size ids to ordered names,
+    and serve GET /categories/ without a query or a join. Loaded at startup
+    (see create_app) or on first use, then kept current by a version poll:
+    at most every DIMENSION_CACHE_POLL_SECONDS the DIMENSIONS_VERSION_KEY
+    counter is read from Redis (one GET, no DB) and the tables are reloaded
+    when it changed, or anyway once DIMENSION_CACHE_TTL seconds old (covers
+    writes that did not bump it and Redis outages).
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DimensionCache, cls).__new__(cls)
+            cls._instance._snapshot = None
+            cls._instance._next_check = 0.0
+            cls._instance._lock = None
+        return cls._instance
+
+    async def get(self) -> DimensionSnapshot:
+        """Current snapshot, checking the version when the poll interval elapsed"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        async with self._get_lock():
+            snapshot = self._snapshot
+            now = time.monotonic()
+            if snapshot is not None and now < self._next_check:
+                return snapshot
+            signal = await self._read_signal()
+            if snapshot is None or signal != snapshot.signal or now - snapshot.loaded_at >= get_settings().DIMENSION_CACHE_TTL:
+                snapshot = await self._load(signal)
+            self._next_check = time.monotonic() + get_settings().DIMENSION_CACHE_POLL_SECONDS
+            return snapshot
+
+    async def reload(self) -> DimensionSnapshot:
+        """Reload now (ids written after the snapshot), unless it was loaded less than MIN_RELOAD_SECONDS ago"""
+        async with self._get_lock():
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= MIN_RELOAD_SECONDS:
+                snapshot = await self._load(await self._read_signal())
+                self._next_check = time.monotonic() + get_settings().DIMENSION_CACHE_POLL_SECONDS
+            return snapshot
+
+    async def warm(self) -> None:
+        """Load at startup; a failure only defers the load to the first request"""
+        try:
+            await self.get()
+        except Exception as ex:
+            logger.warning(f'Could not preload the dimension cache: {ex}')
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Created on first use, inside the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @staticmethod
+    async def _read_signal() -> str | None:
+        values = await redis_client.get_raw_many([DIMENSIONS_VERSION_KEY])
+        return values[0] if values else None
+
+    async def _load(self, signal: str | None) -> DimensionSnapshot:
+        async with AsyncSessionLocal() as db:
+            # A replica behind the signal would pin old rows until DIMENSION_CACHE_TTL
+            use_primary(db)
+            categories = await CategoryDAL(db).get_all_categories()
+            size_rows = (await db.execute(select(Size.id, Size.size_name, Size.sort_order))).all()
+
+        sizes = {size_id: SizeEntry(size_id, size_name, sort_order) for size_id, size_name, sort_order in size_rows}
+        latest = max((category.update_date for category in categories if category.update_date is not None), default=None)
+        snapshot = DimensionSnapshot(
+            categories=[CategoryResponse.model_validate(category) for category in categories],
+            sizes=sizes,
+            size_ids={size.name.casefold(): size.id for size in sizes.values()},
+            categories_version=(len(categories), latest),
+            signal=signal,
+            loaded_at=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        logger.info(f'Dimension cache loaded: {len(categories)} categories, {len(sizes)} sizes (version {signal})')
+        return snapshot
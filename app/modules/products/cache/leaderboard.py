@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Iterable
+from app.core.config import get_settings
+from app.core.events import EventHooks
+from app.modules.products.schemas.product_request import LeaderboardMetric, LeaderboardWindow
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Events fired after commit. ORDERS_COMPLETED kwargs: lines=[(product_id, category_id, quantity, order day)];
+# WISHLIST_ITEM_ADDED kwargs: product_id, category_id
+ORDERS_COMPLETED = 'orders_completed'
+WISHLIST_ITEM_ADDED = 'wishlist_item_added'
+
+KEY_PREFIX = 'leaderboard'
+# Day buckets outlive the longest window by a little (reconciliation rewrites them anyway)
+DAY_BUCKET_TTL = (max(window.days for window in LeaderboardWindow) + 2) * 24 * 60 * 60
+
+
+def scope_name(category_id: int | None) -> str:
+    """'all' for the global leaderboard, 'c<id>' for a category"""
+    return 'all' if category_id is None else f'c{category_id}'
+
+
+def day_key(metric: LeaderboardMetric, scope: str, day: date) -> str:
+    """Sorted set of one day: member product id, score the day's amount"""
+    return f'{KEY_PREFIX}:{metric.value}:{scope}:d:{day:%Y%m%d}'
+
+
+def window_key(metric: LeaderboardMetric, scope: str, window: LeaderboardWindow) -> str:
+    """Sorted set of a rolling window: the sum of its day buckets"""
+    return f'{KEY_PREFIX}:{metric.value}:{scope}:w:{window.value}'
+
+
+def metric_amounts(sold: float = 0, wished: float = 0) -> dict[LeaderboardMetric, float]:
+    """Score added to each metric by `sold` units and `wished` wishlist adds"""
+    amounts = {
+        LeaderboardMetric.SALES: sold,
+        LeaderboardMetric.WISHES: wished,
+        LeaderboardMetric.POPULARITY: sold + wished * get_settings().LEADERBOARD_WISH_WEIGHT,
+    }
+    return {metric: amount for metric, amount in amounts.items() if amount}
+
+
+class LeaderboardCache:
+    """Best-seller / most-wishlisted / popularity leaderboards in Redis sorted sets
+
+    Every metric has one sorted set per day and per rolling window (1d, 7d,
+    30d), globally and per category. Completed orders and wishlist adds
+    increment the day bucket and the windows containing that day after commit
+    (ORDERS_COMPLETED, WISHLIST_ITEM_ADDED), so GET /products/top is one
+    ZREVRANGE, O(log n + limit). Windows only grow between events: the
+    LeaderboardRefresher job rebuilds them from the day buckets (dropping the
+    days that left the window) and, less often, the day buckets from MySQL.
+    When Redis is down the events are lost until that reconciliation.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(LeaderboardCache, cls).__new__(cls)
+            cls._instance._tasks = set()
+            event_hooks = EventHooks()
+            event_hooks.register(ORDERS_COMPLETED, cls._instance.record_orders)
+            event_hooks.register(WISHLIST_ITEM_ADDED, cls._instance.record_wish)
+        return cls._instance
+
+    async def top(self, metric: LeaderboardMetric, window: LeaderboardWindow, category_id: int | None, limit: int) -> list[tuple[int, float]] | None:
+        """(product id, score) of the leaders, highest first; None when Redis is unavailable"""
+        members = await redis_client.zrevrange_with_scores(window_key(metric, scope_name(category_id), window), 0, limit - 1)
+        if members is None:
+            return None
+        return [(int(member), score) for member, score in members]
+
+    def record_orders(self, lines: Iterable[tuple[int, int | None, int, date]], **kwargs) -> None:
+        """Add completed order lines (product_id, category_id, quantity, order day)"""
+        increments, expire = [], {}
+        for product_id, category_id, quantity, day in lines:
+            self._increments(increments, expire, product_id, category_id, day, metric_amounts(sold=quantity))
+        self._apply(increments, expire)
+
+    def record_wish(self, product_id: int, category_id: int | None, **kwargs) -> None:
+        """Add a wishlist add of today"""
+        increments, expire = [], {}
+        self._increments(increments, expire, product_id, category_id, date.today(), metric_amounts(wished=1))
+        self._apply(increments, expire)
+
+    @staticmethod
+    def _increments(increments: list, expire: dict, product_id: int, category_id: int | None, day: date, amounts: dict) -> None:
+        age = (date.today() - day).days
+        windows = [window for window in LeaderboardWindow if 0 <= age < window.days]
+        for scope in {scope_name(None), scope_name(category_id)}:
+            for metric, amount in amounts.items():
+                key = day_key(metric, scope, day)
+                increments.append((key, str(product_id), amount))
+                expire[key] = DAY_BUCKET_TTL
+                increments.extend((window_key(metric, scope, window), str(product_id), amount) for window in windows)
+
+    def _apply(self, increments: list, expire: dict) -> None:
+        if not increments:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sync context (scripts): the next reconciliation counts them
+            logger.debug(f'No event loop, {len(increments)} leaderboard increments left to the reconciliation')
+            return
+        # Keep a reference until done, the loop only holds weak references to tasks
+        task = loop.create_task(redis_client.zincrby_many(increments, expire))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def order_day(created_at: datetime | None) -> date:
+    """Leaderboard day of an order: the day it was placed"""
+    return created_at.date() if created_at else date.today()
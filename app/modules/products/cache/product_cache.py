@@ -0,0 +1,70 @@
+import logging
+from typing import Iterable
+from app.core.config import get_settings
+from app.core.events import EventHooks
+from app.modules.products.schemas.product_response import ProductResponse
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Events fired (after commit) by product write paths, kwargs: product_ids=[...] or None for "all products"
+PRODUCT_UPDATED = 'product_updated'
+PRODUCT_SIZES_CHANGED = 'product_sizes_changed'
+# Stock taken by orders: too frequent to invalidate cached searches, only product details are dropped
+PRODUCT_STOCK_CHANGED = 'product_stock_changed'
+
+
+class ProductCache:
+    """In-process LRU + TTL cache of fully built ProductResponse objects (product + sizes)
+
+    Every worker process has its own copy. Writes in this process invalidate
+    entries through EventHooks; writes from other processes become visible
+    after PRODUCT_CACHE_TTL seconds. Cached responses are shared, treat them
+    as read-only.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            settings = get_settings()
+            cls._instance = super(ProductCache, cls).__new__(cls)
+            cls._instance._cache = TTLCache(maxsize=settings.PRODUCT_CACHE_SIZE, ttl=settings.PRODUCT_CACHE_TTL)
+            event_hooks = EventHooks()
+            event_hooks.register(PRODUCT_UPDATED, cls._instance.invalidate)
+            event_hooks.register(PRODUCT_SIZES_CHANGED, cls._instance.invalidate)
+            event_hooks.register(PRODUCT_STOCK_CHANGED, cls._instance.invalidate)
+        return cls._instance
+
+    def get(self, product_id: int) -> ProductResponse | None:
+        """Cached response of a product, None on miss"""
+        return self._cache.get(product_id)
+
+    def get_many(self, product_ids: Iterable[int]) -> tuple[dict[int, ProductResponse], list[int]]:
+        """(cached responses by id, ids that missed)"""
+        found, missing = {}, []
+        for product_id in dict.fromkeys(product_ids):
+            response = self._cache.get(product_id)
+            if response is None:
+                missing.append(product_id)
+            else:
+                found[product_id] = response
+        return found, missing
+
+    def set_many(self, responses: Iterable[ProductResponse]) -> None:
+        """Store built responses"""
+        for response in responses:
+            self._cache.set(response.id, response)
+
+    def invalidate(self, product_ids: Iterable[int] | None = None, **kwargs) -> None:
+        """Drop the given products, or every product when product_ids is None"""
+        if product_ids is None:
+            self._cache.clear()
+            logger.debug('Product cache cleared')
+            return
+        for product_id in product_ids:
+            self._cache.pop(product_id)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and size"""
+        return self._cache.stats()
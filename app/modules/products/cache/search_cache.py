@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Iterable
+from pydantic import BaseModel, ValidationError
+from app.core.base_model import Pagination
+from app.core.config import get_settings
+from app.core.events import EventHooks
+from app.modules.products.cache.product_cache import PRODUCT_SIZES_CHANGED, PRODUCT_UPDATED
+from app.modules.products.schemas.product_request import SearchProductRequest
+from app.modules.products.schemas.product_response import ProductFacets, ProductResponse
+from app.utils.redis_client import get_sync_redis, redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'product_search'
+# Generation counters: bumped by every product change of unknown category / of a category / of any category
+GLOBAL_GENERATION_KEY = f'{KEY_PREFIX}:gen'
+ANY_CATEGORY_GENERATION_KEY = f'{KEY_PREFIX}:gen:any'
+# Parameters that do not change which products match (left out of facet keys)
+PAGING_FIELDS = {'page', 'page_size', 'sort_by', 'sort_order', 'cursor', 'count_strategy', 'fields', 'include'}
+# Only one worker recomputes a stale page, the others keep serving it
+REFRESH_LOCK_SECONDS = 10
+
+
+def category_generation_key(category_id: int) -> str:
+    return f'{GLOBAL_GENERATION_KEY}:{category_id}'
+
+
+def invalidate_all_searches_sync() -> bool:
+    """Bump the global generation from sync code (Celery tasks, where PRODUCT_UPDATED cannot reach Redis)"""
+    try:
+        get_sync_redis().incr(GLOBAL_GENERATION_KEY)
+        return True
+    except Exception as ex:
+        # Old entries still expire after SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL
+        logger.warning(f'Could not invalidate the search cache: {ex}')
+        return False
+
+
+class ProductSearchCache:
+    """Redis cache of product search pages (GET /products/) and their facet counts,
+    with stale-while-revalidate
+
+    Keys hold the current generation counters of the searched scope (a
+    category, or every category when item_type is not set) plus a hash of the
+    normalized request and language. A product change bumps the counters after
+    commit, so later searches build new keys and the old entries simply expire.
+
+    Entries are fresh for SEARCH_CACHE_TTL seconds. For SEARCH_CACHE_STALE_TTL
+    more seconds they are still served while one background task reloads them.
+    When Redis is down (or SEARCH_CACHE_ENABLED is off) every search goes to the DB.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProductSearchCache, cls).__new__(cls)
+            cls._instance._refreshing = set()
+            cls._instance._tasks = set()
+            cls._instance._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'bypassed': 0}
+            event_hooks = EventHooks()
+            event_hooks.register(PRODUCT_UPDATED, cls._instance.invalidate)
+            event_hooks.register(PRODUCT_SIZES_CHANGED, cls._instance.invalidate)
+        return cls._instance
+
+    @staticmethod
+    def request_hash(request: SearchProductRequest, lang: str | None, exclude: set[str] | None = None) -> str:
+        """Stable hash of the search parameters, defaults filled in so equivalent requests share it"""
+        params = request.model_dump(mode='json', exclude=exclude)
+        if 'count_strategy' in params:
+            params['count_strategy'] = params['count_strategy'] or get_settings().DB_COUNT_STRATEGY
+        if params.get('facets'):
+            params['facets'] = sorted({name.strip() for name in params['facets'].split(',')})
+        params['lang'] = lang or 'vi'
+        return hashlib.sha1(json.dumps(params, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+    async def get_or_load(
+        self,
+        request: SearchProductRequest,
+        lang: str | None,
+        load: Callable[[], Awaitable[Pagination[ProductResponse]]],
+        refresh: Callable[[], Awaitable[Pagination[ProductResponse]]],
+        item_model: type[BaseModel] = ProductResponse,
+    ) -> Pagination[ProductResponse]:
+        """Cached page of `request`
+
+        load: computes the page in the current request (miss).
+        refresh: computes the page outside the request, with its own DB session (stale hit).
+        item_model: model of the items (a sparse fieldset model for `fields=` requests).
+        """
+        # One category: its own generation; several or all: invalidated by a change in any category
+        category_ids = request.item_type or []
+        scope_key = category_generation_key(category_ids[0]) if len(category_ids) == 1 else ANY_CATEGORY_GENERATION_KEY
+        digest = self.request_hash(request, lang, exclude={'facets'})
+        return await self._get_or_load(scope_key, digest, Pagination[item_model], load, refresh)
+
+    async def get_or_load_facets(
+        self,
+        request: SearchProductRequest,
+        load: Callable[[], Awaitable[ProductFacets]],
+        refresh: Callable[[], Awaitable[ProductFacets]],
+    ) -> ProductFacets:
+        """Cached facet counts of `request`, keyed on its filters only (shared by every page and sort order)"""
+        # Category counts span every category, so any product change invalidates them
+        digest = self.request_hash(request, None, exclude=PAGING_FIELDS)
+        return await self._get_or_load(ANY_CATEGORY_GENERATION_KEY, f'facets:{digest}', ProductFacets, load, refresh)
+
+    async def _get_or_load(self, scope_key: str, digest: str, model: type[BaseModel], load, refresh):
+        key = await self._entry_key(scope_key, digest) if get_settings().SEARCH_CACHE_ENABLED else None
+        if key is None:
+            self._counters['bypassed'] += 1
+            return await load()
+
+        entry = await redis_client.get(key)
+        result = self._decode(key, entry, model)
+        if result is not None:
+            if entry['fresh_until'] > time.time():
+                self._counters['hits'] += 1
+            else:
+                self._counters['stale_hits'] += 1
+                self._schedule_refresh(key, refresh)
+            return result
+
+        self._counters['misses'] += 1
+        result = await load()
+        await self._store(key, result)
+        return result
+
+    def invalidate(self, product_ids: Iterable[int] | None = None, category_ids: Iterable[int] | None = None, **kwargs) -> None:
+        """Bump the generations of the changed categories (all searches when category_ids is None)"""
+        if category_ids is None:
+            keys = [GLOBAL_GENERATION_KEY]
+        else:
+            keys = [ANY_CATEGORY_GENERATION_KEY] + [
+                category_generation_key(category_id) for category_id in set(category_ids) if category_id is not None
+            ]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sync context (scripts): entries of the old generation expire on their own
+            logger.debug(f'No event loop, search cache generations not bumped: {keys}')
+            return
+        self._spawn(loop, redis_client.incr_many(keys))
+
+    def stats(self) -> dict:
+        """Hit/miss counters of this worker process"""
+        lookups = self._counters['hits'] + self._counters['stale_hits'] + self._counters['misses']
+        hit_ratio = (self._counters['hits'] + self._counters['stale_hits']) / lookups if lookups else 0.0
+        return {**self._counters, 'redis_available': redis_client.available, 'hit_ratio': round(hit_ratio, 4)}
+
+    async def _entry_key(self, scope_key: str, digest: str) -> str | None:
+        """Key of the current generation, None when Redis is unavailable"""
+        generations = await redis_client.get_raw_many([GLOBAL_GENERATION_KEY, scope_key])
+        if generations is None:
+            return None
+        global_generation, scope_generation = (int(generation or 0) for generation in generations)
+        return f'{KEY_PREFIX}:{global_generation}.{scope_generation}:{digest}'
+
+    def _decode(self, key: str, entry, model: type[BaseModel]):
+        if entry is None:
+            return None
+        try:
+            return model.model_validate(entry['data'])
+        except (KeyError, TypeError, ValidationError) as ex:
+            # Written by an older version of the schema, reload it
+            logger.warning(f'Discarding unreadable search cache entry {key}: {ex}')
+            return None
+
+    async def _store(self, key: str, result: BaseModel) -> None:
+        settings = get_settings()
+        entry = {'fresh_until': time.time() + settings.SEARCH_CACHE_TTL, 'data': result.model_dump(mode='json')}
+        await redis_client.set(key, entry, ttl=settings.SEARCH_CACHE_TTL + settings.SEARCH_CACHE_STALE_TTL)
+
+    def _schedule_refresh(self, key: str, refresh: Callable[[], Awaitable[BaseModel]]) -> None:
+        if key not in self._refreshing:
+            self._refreshing.add(key)
+            self._spawn(asyncio.get_running_loop(), self._refresh(key, refresh))
+
+    async def _refresh(self, key: str, refresh: Callable[[], Awaitable[BaseModel]]) -> None:
+        try:
+            if await redis_client.set_if_absent(f'{key}:refresh', 1, ttl=REFRESH_LOCK_SECONDS):
+                await self._store(key, await refresh())
+        except Exception as ex:
+            logger.exception(f'Error refreshing search cache entry {key}: {ex}')
+        finally:
+            self._refreshing.discard(key)
+
+    def _spawn(self, loop: asyncio.AbstractEventLoop, coroutine: Awaitable) -> None:
+        # Keep a reference until done, the loop only holds weak references to tasks
+        task = loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
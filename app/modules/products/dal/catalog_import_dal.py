@@ -0,0 +1,72 @@
+import logging
+from typing import Iterable
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.base_dal import AsyncBaseDAL, BaseDAL
+from app.modules.categories.models.categories import Category
+from app.modules.products.models.catalog_import_jobs import CatalogImportJob
+from app.modules.products.models.products import Product
+from app.modules.products.models.size_product import SizeProduct
+from app.modules.products.models.sizes import Size
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogImportJobDAL(AsyncBaseDAL[CatalogImportJob]):
+    """Catalog import jobs, API side (create a job, read its progress)"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, CatalogImportJob)
+
+
+class CatalogImportDAL(BaseDAL[CatalogImportJob]):
+    """Bulk reads and writes of the catalog import task (sync session, Celery)
+
+    Writes do not commit: CatalogImporter commits each chunk together with the
+    job progress through transaction().
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(db, CatalogImportJob)
+        self.product_dal = BaseDAL(db, Product)
+
+    def get_category_ids(self) -> dict[str, int]:
+        """Category id by case-folded name"""
+        rows = self.db.execute(select(Category.id, Category.name_category)).all()
+        return {name.casefold(): category_id for category_id, name in rows}
+
+    def get_sizes(self) -> dict[str, tuple[int, int, str]]:
+        """(id, sort_order, name) by case-folded size name"""
+        rows = self.db.execute(select(Size.id, Size.sort_order, Size.size_name)).all()
+        return {size_name.casefold(): (size_id, sort_order, size_name) for size_id, sort_order, size_name in rows}
+
+    def create_categories(self, names: Iterable[str]) -> None:
+        names = list(names)
+        if names:
+            logger.info(f"Creating {len(names)} categories: {names[:20]}")
+            self.db.execute(insert(Category), [{'name_category': name} for name in names])
+
+    def create_sizes(self, names: Iterable[str]) -> None:
+        names = list(names)
+        if names:
+            logger.info(f"Creating {len(names)} sizes: {names[:20]}")
+            self.db.execute(insert(Size), [{'size_name': name} for name in names])
+
+    def upsert_products(self, rows: list[dict]) -> int:
+        """Insert or update products by SKU (every column of the rows except sku)"""
+        return self.product_dal.upsert_many(rows, conflict_columns=('sku',))
+
+    def get_product_ids(self, skus: Iterable[str]) -> dict[str, int]:
+        """Product id by SKU"""
+        rows = self.db.execute(select(Product.sku, Product.id).where(Product.sku.in_(list(skus)))).all()
+        return {sku: product_id for sku, product_id in rows}
+
+    def replace_product_sizes(self, size_ids: dict[int, list[int]]) -> None:
+        """Replace the size_product rows of the given products"""
+        if not size_ids:
+            return
+        self.db.execute(delete(SizeProduct).where(SizeProduct.product_id.in_(list(size_ids))))
+        rows = [{'product_id': product_id, 'size_id': size_id} for product_id, ids in size_ids.items() for size_id in ids]
+        if rows:
+            self.db.execute(insert(SizeProduct), rows)
@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from app.core.base_dal import BaseDAL
+from app.modules.categories.models.categories import Category
+from app.modules.products.models.orders import Order
+from app.modules.products.models.products import Product
+from app.modules.products.models.wishlists import Wishlist
+
+logger = logging.getLogger(__name__)
+
+# Orders that count as sold (as in the shopping history)
+SOLD_STATUS = 'completed'
+
+
+class LeaderboardDAL(BaseDAL[Product]):
+    """Reads and writes of the leaderboard jobs (sync session, Celery)"""
+
+    def __init__(self, db: Session):
+        super().__init__(db, Product)
+
+    def get_daily_sales(self, since: datetime) -> list:
+        """(day, product_id, category_id, units) of the orders placed since `since` and completed"""
+        day = func.date(Order.created_at)
+        query = (
+            select(day, Order.product_id, Product.category_id, func.sum(Order.quantity))
+            .join(Product, Product.id == Order.product_id)
+            .where(Order.status == SOLD_STATUS, Order.created_at >= since)
+            .group_by(day, Order.product_id, Product.category_id)
+        )
+        return self.db.execute(query).all()
+
+    def get_daily_wishes(self, since: datetime) -> list:
+        """(day, product_id, category_id, adds) of the wishlist rows added since `since`"""
+        day = func.date(Wishlist.created_at)
+        query = (
+            select(day, Wishlist.product_id, Product.category_id, func.count(Wishlist.id))
+            .join(Product, Product.id == Wishlist.product_id)
+            .where(Wishlist.created_at >= since)
+            .group_by(day, Wishlist.product_id, Product.category_id)
+        )
+        return self.db.execute(query).all()
+
+    def get_category_ids(self) -> list[int]:
+        return list(self.db.execute(select(Category.id)).scalars().all())
+
+    def set_popularity(self, scores: dict[int, Decimal]) -> int:
+        """Write products.popularity: `scores` for the given products, 0 for every other one
+
+        Only changed rows are written, and update_date is assigned its own value
+        so neither the ORM onupdate nor MySQL ON UPDATE bumps it: popularity is
+        not a change of the product (ETags, incremental exports).
+        """
+        rows = self.db.execute(
+            select(Product.id, Product.popularity, Product.update_date)
+            .where(or_(Product.popularity != 0, Product.id.in_(list(scores))) if scores else Product.popularity != 0)
+        ).all()
+        changes = [
+            {'id': product_id, 'popularity': scores.get(product_id, Decimal(0)), 'update_date': update_date}
+            for product_id, popularity, update_date in rows
+            if popularity != scores.get(product_id, Decimal(0))
+        ]
+        return self.update_many(changes)
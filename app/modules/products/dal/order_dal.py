@@ -0,0 +1,90 @@
+import logging
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.base_dal import AsyncBaseDAL
+from app.modules.products.cache.leaderboard import ORDERS_COMPLETED, order_day
+from app.modules.products.cache.product_cache import PRODUCT_STOCK_CHANGED, PRODUCT_UPDATED
+from app.modules.products.models.orders import Order
+from app.modules.products.models.products import Product
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_STATUS = 'completed'
+
+
+class OrderDAL(AsyncBaseDAL[Order]):
+    """Data Access Layer for Order model"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Order)
+
+    async def reserve_stock(self, product_id: int, quantity: int) -> bool:
+        """Take `quantity` units of a product's stock, False when it has fewer
+
+        One conditional UPDATE: the check and the decrement are atomic and only
+        the product row is locked (until the end of the transaction), so
+        concurrent orders queue on the row instead of reading stale stock.
+        Run it inside transaction() with the rest of the order. Taking the
+        last unit changes which products searches match (in_stock), so the
+        cached searches of the product's category are invalidated too.
+        """
+        result = await self.db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+        self.trigger_after_commit(PRODUCT_STOCK_CHANGED, product_ids=[product_id])
+        # The row is locked by this transaction: a primary key read of the stock just written
+        stock, category_id = (await self.db.execute(
+            select(Product.stock, Product.category_id).where(Product.id == product_id)
+        )).one()
+        if stock == 0:
+            self.trigger_after_commit(PRODUCT_UPDATED, product_ids=[], category_ids=[category_id])
+        return True
+
+    async def get_prices(self, product_ids: list[int]) -> dict:
+        """Current price by product id (read after reserve_stock: the rows are locked by this transaction)"""
+        result = await self.db.execute(select(Product.id, Product.price).where(Product.id.in_(product_ids)))
+        return dict(result.all())
+
+    async def create_orders(self, user_id: int, lines: list[tuple[int, int]], prices: dict) -> list[Order]:
+        """Insert one pending Order per (product_id, quantity) line, without committing"""
+        orders = [
+            Order(user_id=user_id, product_id=product_id, quantity=quantity, total_price=prices[product_id] * quantity, status='pending')
+            for product_id, quantity in lines
+        ]
+        self.db.add_all(orders)
+        await self.db.flush()
+        return orders
+
+    async def complete_orders(self, order_ids: list[int]) -> list[int]:
+        """Mark the orders completed, returns the ids that were not completed yet
+
+        The rows are locked first, so an order completed twice concurrently is
+        counted once. Its lines reach the leaderboards after commit
+        (ORDERS_COMPLETED).
+        """
+        result = await self.db.execute(
+            select(Order.id, Order.product_id, Product.category_id, Order.quantity, Order.created_at)
+            .outerjoin(Product, Product.id == Order.product_id)
+            .where(Order.id.in_(order_ids), Order.status != COMPLETED_STATUS)
+            .order_by(Order.id)
+            .with_for_update(of=Order)
+        )
+        rows = result.all()
+        if not rows:
+            return []
+        completed_ids = [row.id for row in rows]
+        await self.db.execute(
+            update(Order)
+            .where(Order.id.in_(completed_ids))
+            .values(status=COMPLETED_STATUS)
+            .execution_options(synchronize_session=False)
+        )
+        self.trigger_after_commit(ORDERS_COMPLETED, lines=[
+            (row.product_id, row.category_id, row.quantity, order_day(row.created_at)) for row in rows
+        ])
+        return completed_ids
@@ -1,80 +1,157 @@
 import logging
-from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc
-from app.core.base_dal import BaseDAL
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, delete, distinct, exists, false, func, insert, literal, select, union_all, update
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import load_only
+from app.core.base_dal import AsyncBaseDAL
 from app.core.base_model import Pagination
+from app.core.config import get_settings
+from app.core.loader import DataLoader, get_loaders
+from app.modules.products.cache.dimension_cache import DimensionCache
+from app.modules.products.cache.product_cache import PRODUCT_SIZES_CHANGED, PRODUCT_UPDATED
 from app.enums.base_enums import Constants
-from app.modules.products.models.products import Product
+from app.utils.text_utils import fold_text
+from app.modules.products.models.orders import Order
+from app.modules.products.models.products import Product, build_search_text
 from app.modules.products.models.size_product import SizeProduct
-from app.modules.products.models.sizes import Size
+from app.modules.products.models.sizes import SIZE_SEPARATOR
+from app.modules.products.models.wishlists import Wishlist
 
 logger = logging.getLogger(__name__)
 
-class ProductDAL(BaseDAL[Product]):
+# Sortable product columns: NOT NULL only, keyset cursors cannot compare NULLs
+# popularity is the leaderboard score copied by LeaderboardRefresher
+SORTABLE_FIELDS = ('name', 'price', 'stock', 'category_id', 'brand_id', 'collab_status', 'popularity')
+# Facets of get_facets
+FACETS = ('category', 'size', 'price')
+# Columns of the catalog export, in output order (sizes is the size_product projection)
+EXPORT_COLUMNS = (
+    'id', 'sku', 'name', 'description', 'brand_id', 'category_id', 'price', 'stock',
+    'main_image_url', 'collab_status', 'sizes', 'create_date', 'update_date',
+)
+
+
+def _as_list(value) -> list:
+    """Multi-value filter as a list (a single value is accepted too)"""
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class ProductDAL(AsyncBaseDAL[Product]):
     """Data Access Layer for Product model"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         super().__init__(db, Product)
+        self.dimension_cache = DimensionCache()
 
-    def get_product_by_id(self, product_id: int) -> Product:
+    async def get_product_by_id(self, product_id: int) -> Product:
         """Get a product by its ID"""
-        return self.db.query(Product).filter(Product.id == product_id).first()
+        return await self.get_by_id(product_id)
 
-    def get_product_sizes(self, product_id: int) -> list[str]:
-        """Get all size names for a given product ID, sorted by XS, S, M, L, XL, XXL"""
-        try:
-            logger.info(f"Fetching sizes for product_id: {product_id}")
-            size_names = (
-                self.db.query(Size.size_name)
-                .join(SizeProduct, Size.id == SizeProduct.size_id)
-                .filter(SizeProduct.product_id == product_id)
-                .all()
-            )
-            size_names = [size_name for (size_name,) in size_names]
-
-            # Define custom sort order
-            size_order = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
-            # Sort sizes according to the predefined order
-            sorted_sizes = sorted(
-                size_names,
-                key=lambda x: size_order.index(
-                    x) if x in size_order else len(size_order)
-            )
+    async def get_update_date(self, product_id: int) -> datetime | None:
+        """Row version of a product (its update_date), None when it does not exist"""
+        result = await self.db.execute(select(Product.update_date).where(Product.id == product_id))
+        return result.scalar_one_or_none()
 
-            logger.info(
-                f"Found {len(sorted_sizes)} sizes for product_id {product_id}: {sorted_sizes}")
-            return sorted_sizes
-        except Exception as ex:
-            logger.exception(
-                f"Error fetching sizes for product_id {product_id}: {ex}")
-            raise
+    async def create(self, obj_data: dict):
+        """Create a product, searches of its category are invalidated after commit"""
+        self.trigger_after_commit(PRODUCT_UPDATED, product_ids=[], category_ids=[obj_data.get('category_id')])
+        return await super().create(obj_data)
+
+    async def create_many(self, rows, chunk_size: int | None = None, return_ids: bool = False):
+        """Bulk create products, searches of their categories are invalidated after commit"""
+        self.trigger_after_commit(PRODUCT_UPDATED, product_ids=[], category_ids=[row.get('category_id') for row in rows])
+        return await super().create_many(await self._with_search_text(rows), chunk_size, return_ids)
+
+    async def update(self, item_id: int, update_data: dict):
+        """Update a product, cached copies are dropped after commit"""
+        category_ids = await self._category_ids([item_id], [update_data])
+        self.trigger_after_commit(PRODUCT_UPDATED, product_ids=[item_id], category_ids=category_ids)
+        return await super().update(item_id, update_data)
+
+    async def delete(self, item_id: int):
+        """Delete a product, cached copies are dropped after commit"""
+        category_ids = await self._category_ids([item_id])
+        self.trigger_after_commit(PRODUCT_UPDATED, product_ids=[item_id], category_ids=category_ids)
+        return await super().delete(item_id)
+
+    async def update_many(self, rows, chunk_size: int | None = None) -> int:
+        """Bulk update products by id, cached copies are dropped after commit"""
+        product_ids = [row['id'] for row in rows]
+        category_ids = await self._category_ids(product_ids, rows)
+        self.trigger_after_commit(PRODUCT_UPDATED, product_ids=product_ids, category_ids=category_ids)
+        return await super().update_many(await self._with_search_text(rows), chunk_size)
+
+    async def upsert_many(self, rows, update_columns=None, conflict_columns=('id',), chunk_size: int | None = None) -> int:
+        """Bulk upsert products; rows without an id invalidate the whole cache"""
+        product_ids = [row.get('id') for row in rows]
+        if None in product_ids:
+            self.trigger_after_commit(PRODUCT_UPDATED, product_ids=None, category_ids=None)
+        else:
+            category_ids = await self._category_ids(product_ids, rows)
+            self.trigger_after_commit(PRODUCT_UPDATED, product_ids=product_ids, category_ids=category_ids)
+        return await super().upsert_many(await self._with_search_text(rows), update_columns, conflict_columns, chunk_size)
+
+    async def _with_search_text(self, rows):
+        """Rows with search_text filled in where name or description is written
 
-    def get_product_sizes_batch(self, product_ids: list[int]) -> dict[int, list[str]]:
-        """Get size names for multiple product IDs, sorted by XS, S, M, L, XL, XXL"""
+        Bulk statements skip the ORM flush hooks of Product. When a row sets only
+        one of the two columns the other one is read from the database.
+        """
+        partial_ids = [row['id'] for row in rows if row.get('id') is not None and ('name' in row) != ('description' in row)]
+        stored = {}
+        if partial_ids:
+            result = await self.db.execute(select(Product.id, Product.name, Product.description).where(Product.id.in_(partial_ids)))
+            stored = {row.id: row for row in result.all()}
+
+        filled = []
+        for row in rows:
+            if 'name' in row or 'description' in row:
+                current = stored.get(row.get('id'))
+                name = row['name'] if 'name' in row else getattr(current, 'name', None)
+                description = row['description'] if 'description' in row else getattr(current, 'description', None)
+                row = {**row, 'search_text': build_search_text(name, description)}
+            filled.append(row)
+        return filled
+
+    async def _category_ids(self, product_ids: list[int], rows=()) -> list[int]:
+        """Categories touched by a write: the current ones of product_ids plus the new ones in rows"""
+        result = await self.db.execute(select(Product.category_id).where(Product.id.in_(product_ids)).distinct())
+        category_ids = set(result.scalars().all())
+        category_ids.update(row['category_id'] for row in rows if row.get('category_id') is not None)
+        return list(category_ids)
+
+    def sizes_loader(self) -> DataLoader[int, list[str]]:
+        """Request-scoped loader of product sizes, batched through get_product_sizes_batch"""
+        return get_loaders(self.db).named('product_sizes', self.get_product_sizes_batch)
+
+    async def get_product_sizes(self, product_id: int) -> list[str]:
+        """Get all size names for a given product ID, ordered by sizes.sort_order"""
+        return (await self.get_product_sizes_batch([product_id])).get(product_id, [])
+
+    async def get_product_sizes_batch(self, product_ids: list[int]) -> dict[int, list[str]]:
+        """Get size names for multiple product IDs, ordered by sizes.sort_order
+
+        Reads size ids from size_product only, names and order come from
+        DimensionCache. Products without sizes are absent from the result.
+        """
         try:
             logger.info(f"Fetching sizes for product_ids: {product_ids}")
-            size_data = (
-                self.db.query(Product.id, Size.size_name)
-                .join(SizeProduct, SizeProduct.product_id == Product.id)
-                .join(Size, Size.id == SizeProduct.size_id)
-                .filter(Product.id.in_(product_ids))
-                .all()
+            result = await self.db.execute(
+                select(SizeProduct.product_id, SizeProduct.size_id).where(SizeProduct.product_id.in_(product_ids))
             )
+            size_ids = {}
+            for product_id, size_id in result.all():
+                size_ids.setdefault(product_id, []).append(size_id)
 
-            # Group sizes by product_id
-            size_map = {}
-            for product_id, size_name in size_data:
-                if product_id not in size_map:
-                    size_map[product_id] = []
-                size_map[product_id].append(size_name)
-
-            # Sort sizes according to the predefined order
-            size_order = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
-            for product_id in size_map:
-                size_map[product_id] = sorted(
-                    size_map[product_id],
-                    key=lambda x: size_order.index(x) if x in size_order else len(size_order)
-                )
+            dimensions = await self.dimension_cache.get()
+            if any(size_id not in dimensions.sizes for ids in size_ids.values() for size_id in ids):
+                # Sizes created after the snapshot (catalog import)
+                dimensions = await self.dimension_cache.reload()
+            size_map = {product_id: dimensions.size_names_of(ids) for product_id, ids in size_ids.items()}
 
             logger.info(f"Found sizes for {len(size_map)} products")
             return size_map
@@ -82,55 +159,288 @@ class ProductDAL(BaseDAL[Product]):
             logger.exception(f"Error fetching sizes for product_ids {product_ids}: {ex}")
             raise
 
-    def search_products(self, params: dict) -> Pagination[Product]:
-        """Search products with pagination, filtering, and sorting"""
+    async def build_size_projection(self, product_ids: list[int]) -> dict[int, str]:
+        """Expected products.sizes value of each product, computed from size_product"""
+        size_map = await self.get_product_sizes_batch(product_ids)
+        return {product_id: SIZE_SEPARATOR.join(size_map.get(product_id, [])) for product_id in product_ids}
+
+    async def refresh_size_projection(self, product_ids: list[int]) -> int:
+        """Rewrite products.sizes of the given products from size_product
+
+        Call after every change of size_product rows, sizes.size_name or
+        sizes.sort_order (scripts/rebuild_size_projection.py rebuilds everything).
+        """
+        if not product_ids:
+            return 0
+        projection = await self.build_size_projection(product_ids)
+        category_ids = await self._category_ids(product_ids)
+        self.trigger_after_commit(PRODUCT_SIZES_CHANGED, product_ids=product_ids, category_ids=category_ids)
+        autocommit = not self._in_managed_transaction()
+        try:
+            await self.db.execute(update(Product), [{'id': product_id, 'sizes': sizes} for product_id, sizes in projection.items()])
+            if autocommit:
+                await self.db.commit()
+        except Exception:
+            if autocommit:
+                await self.db.rollback()
+            raise
+        return len(projection)
+
+    async def set_product_sizes(self, product_id: int, size_ids: list[int]) -> list[str]:
+        """Replace the sizes of a product and refresh its projection in the same transaction"""
+        async with self.transaction():
+            await self.db.execute(delete(SizeProduct).where(SizeProduct.product_id == product_id))
+            if size_ids:
+                await self.db.execute(insert(SizeProduct), [{'product_id': product_id, 'size_id': size_id} for size_id in dict.fromkeys(size_ids)])
+            await self.refresh_size_projection([product_id])
+        return await self.get_product_sizes(product_id)
+
+    async def search_products(self, params: dict) -> Pagination[Product]:
+        """Search products with pagination, filtering, and sorting
+
+        params['columns']: names of the Product columns to load; the products come
+        back with every other column unloaded and raising on access.
+        """
         logger.info(f'Searching products with parameters: {params}')
         page = int(params.get('page', 1))
-        page_size = int(params.get('page_size', Constants.PAGE_SIZE))
-        item_type = params.get('item_type')
-        size_type = params.get('size_type')
+        # Capped here too for callers that skip the route validation (whole catalog: stream_products)
+        page_size = min(int(params.get('page_size', Constants.PAGE_SIZE)), get_settings().MAX_PAGE_SIZE)
         sort_by = params.get('sort_by')
-        sort_order = params.get('sort_order', 'asc')
-
-        # Start with basic query
-        query = self.db.query(Product)
-
-        # Apply filters
-        if item_type is not None:
-            logger.info(f"Filtering products by item_type: {item_type}")
-            query = query.filter(Product.category_id == item_type)
-
-        if size_type is not None:
-            logger.info(f"Filtering products by size_type: {size_type}")
-            query = (
-                query.join(SizeProduct, Product.id == SizeProduct.product_id)
-                     .join(Size, Size.id == SizeProduct.size_id)
-                     .filter(Size.size_name == size_type)
+        sort_order = params.get('sort_order') or 'asc'
+        cursor = params.get('cursor')
+        count_strategy = params.get('count_strategy')
+        keywords = fold_text(params.get('q'))
+
+        # Apply filters (shared with get_facets)
+        params = await self._resolve_filters(params)
+        query = select(Product).where(*self._filter_conditions(params))
+        relevance = self._keyword_search(keywords)[1] if keywords else None
+        if relevance is not None:
+            query = query.add_columns(relevance)
+
+        # Apply sorting, id is the tie-breaker so keyset cursors are stable
+        is_desc = sort_order.lower() == 'desc'
+        sort_keys = [(Product.id, is_desc)]
+        if sort_by in SORTABLE_FIELDS:
+            sort_keys.insert(0, (getattr(Product, sort_by), is_desc))
+        elif relevance is not None and not sort_by:
+            # Keyword search without explicit sorting: best matches first
+            sort_keys = [(relevance, True), (Product.id, False)]
+        elif sort_by and sort_by != 'id':
+            logger.warning(f"Invalid sort_by field: {sort_by}")
+
+        # Sparse fieldset: load only the requested columns (plus id and the sort keys the cursor reads)
+        columns = params.get('columns')
+        if columns:
+            loaded = {'id', *columns, *(column.key for column, _desc in sort_keys if column is not relevance)}
+            query = query.options(load_only(*[getattr(Product, name) for name in sorted(loaded)], raiseload=True))
+
+        # Count total records and apply pagination (offset, or keyset when a cursor is given)
+        result = await self.paginate(query, page, page_size, sort_keys=sort_keys, cursor=cursor, count_strategy=count_strategy)
+        if relevance is not None:
+            # Rows are (Product, relevance), callers get products in relevance order
+            result.items = [row[0] for row in result.items]
+
+        logger.info(
+            f'Found {result.total_count} products, returning page {page} with {len(result.items)} items')
+
+        return result
+
+    async def stream_products(self, updated_since: datetime | None = None, batch_size: int | None = None) -> AsyncIterator[list]:
+        """Every product (changed since `updated_since`) in (update_date, id) order, as batches of rows
+
+        Rows come from a server-side cursor `batch_size` at a time, so memory
+        stays constant whatever the size of the catalog. The session's
+        connection is busy until the iteration ends: run other queries
+        (e.g. get_product_sizes_batch) on another session meanwhile.
+        """
+        query = select(*[getattr(Product, name) for name in EXPORT_COLUMNS]).order_by(Product.update_date, Product.id)
+        if updated_since is not None:
+            query = query.where(Product.update_date >= updated_since)
+        result = await self.db.stream(query.execution_options(yield_per=batch_size or get_settings().EXPORT_BATCH_SIZE))
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    async def get_facets(self, params: dict, facets: Iterable[str]) -> dict[str, list[dict]]:
+        """Product counts by category, size and/or price bucket for the filters of `params`
+
+        Every requested facet is one GROUP BY, sent together as a single UNION ALL
+        query. A facet ignores its own filter (category counts are computed
+        without item_type), so every chip shows what choosing it would return.
+        """
+        parts = []
+        if 'category' in facets:
+            parts.append(
+                select(literal('category').label('facet'), Product.category_id.label('value'), literal(0).label('rank'), func.count().label('count'))
+                .where(*self._filter_conditions(params, exclude='category'))
+                .group_by(Product.category_id)
             )
+        if 'size' in facets:
+            # By size id, names and ranks come from DimensionCache below
+            parts.append(
+                select(
+                    literal('size').label('facet'),
+                    SizeProduct.size_id.label('value'),
+                    literal(0).label('rank'),
+                    func.count(distinct(SizeProduct.product_id)).label('count'),
+                )
+                .select_from(SizeProduct)
+                .join(Product, Product.id == SizeProduct.product_id)
+                .where(*self._filter_conditions(params, exclude='size'))
+                .group_by(SizeProduct.size_id)
+            )
+        if 'price' in facets:
+            bucket = self._price_bucket()
+            # Bucket index as value and rank, the bounds are added below
+            parts.append(
+                select(literal('price').label('facet'), bucket.label('value'), bucket.label('rank'), func.count().label('count'))
+                .where(*self._filter_conditions(params, exclude='price'))
+                .group_by(bucket)
+            )
+        if not parts:
+            return {}
 
-        # Apply sorting
-        if sort_by and hasattr(Product, sort_by):
-            sort_column = getattr(Product, sort_by)
-            if sort_order.lower() == 'desc':
-                query = query.order_by(desc(sort_column))
+        rows = (await self.db.execute(parts[0] if len(parts) == 1 else union_all(*parts))).all()
+        if 'size' in facets:
+            rows = await self._size_facet_rows(rows)
+        # Sizes and price buckets in their own order, categories by count
+        result = {facet: [] for facet in facets}
+        for facet, value, rank, count in sorted(rows, key=lambda row: (int(row[2]), -row[3], str(row[1]))):
+            if facet == 'price':
+                result[facet].append(self._price_bucket_value(int(rank), count))
             else:
-                query = query.order_by(asc(sort_column))
-        else:
-            if sort_by:
-                logger.warning(f"Invalid sort_by field: {sort_by}")
+                result[facet].append({'value': str(value), 'count': count})
+        return result
 
-        # Count total records
-        total_count = query.count()
+    async def _size_facet_rows(self, rows: list) -> list:
+        """Facet rows with the size ids replaced by their names and sort_order ranks"""
+        dimensions = await self.dimension_cache.get()
+        if any(facet == 'size' and int(value) not in dimensions.sizes for facet, value, _rank, _count in rows):
+            dimensions = await self.dimension_cache.reload()
+        result = []
+        for facet, value, rank, count in rows:
+            if facet == 'size':
+                size = dimensions.sizes.get(int(value))
+                if size is None:
+                    continue
+                value, rank = size.name, size.sort_order
+            result.append((facet, value, rank, count))
+        return result
 
-        # Apply pagination
-        products = query.offset((page - 1) * page_size).limit(page_size).all()
+    async def _resolve_filters(self, params: dict) -> dict:
+        """params with size names resolved to size ids (DimensionCache, no query)"""
+        size_names = _as_list(params.get('size_type'))
+        if not size_names:
+            return params
+        return {**params, 'size_ids': (await self.dimension_cache.get()).size_ids_of(size_names)}
 
-        logger.info(
-            f'Found {total_count} products, returning page {page} with {len(products)} items')
-
-        return Pagination(
-            items=products,
-            total_count=total_count,
-            page=page,
-            page_size=page_size
-        )
\ No newline at end of file
+    def _filter_conditions(self, params: dict, exclude: str | None = None) -> list:
+        """WHERE conditions of the search filters in `params`, without the filter of facet `exclude`
+
+        Multi-value filters never join: categories are an IN list and sizes an
+        EXISTS semi-join on size_product (served by its (product_id, size_id)
+        unique index), so every product appears once and counts stay exact.
+        Expects params from _resolve_filters.
+        """
+        conditions = []
+        keywords = fold_text(params.get('q'))
+        if keywords:
+            logger.info(f"Searching products by keywords: {keywords}")
+            conditions.append(self._keyword_search(keywords)[0])
+
+        category_ids = _as_list(params.get('item_type'))
+        if category_ids and exclude != 'category':
+            logger.info(f"Filtering products by item_type: {category_ids}")
+            conditions.append(Product.category_id.in_(category_ids) if len(category_ids) > 1 else Product.category_id == category_ids[0])
+
+        if _as_list(params.get('size_type')) and exclude != 'size':
+            size_ids = params['size_ids']
+            logger.info(f"Filtering products by size_type: {params.get('size_type')} (size ids {size_ids})")
+            if not size_ids:
+                # None of the requested sizes exists
+                conditions.append(false())
+            else:
+                conditions.append(
+                    exists().where(
+                        SizeProduct.product_id == Product.id,
+                        SizeProduct.size_id.in_(size_ids) if len(size_ids) > 1 else SizeProduct.size_id == size_ids[0],
+                    )
+                )
+
+        if exclude != 'price':
+            if params.get('price_min') is not None:
+                conditions.append(Product.price >= params['price_min'])
+            if params.get('price_max') is not None:
+                conditions.append(Product.price <= params['price_max'])
+
+        if params.get('in_stock'):
+            conditions.append(Product.stock > 0)
+        return conditions
+
+    @staticmethod
+    def _price_bucket():
+        """Index of the PRICE_FACET_BUCKETS range of Product.price"""
+        edges = get_settings().PRICE_FACET_BUCKETS
+        return case(*[(Product.price < edge, index) for index, edge in enumerate(edges)], else_=len(edges))
+
+    @staticmethod
+    def _price_bucket_value(index: int, count: int) -> dict:
+        edges = get_settings().PRICE_FACET_BUCKETS
+        low = edges[index - 1] if index > 0 else 0.0
+        high = edges[index] if index < len(edges) else None
+        value = f'{low:g}-{high:g}' if high is not None else f'{low:g}+'
+        return {'value': value, 'count': count, 'min': low, 'max': high}
+
+    def _keyword_search(self, keywords: str):
+        """(WHERE condition, relevance column or None) of a diacritic-folded keyword search
+
+        MySQL uses the FULLTEXT (ngram) index on search_text in natural language
+        mode and ranks by its relevance score. Other databases (local SQLite)
+        fall back to matching every word with LIKE, unranked.
+        """
+        if self.db.get_bind().dialect.name == 'mysql':
+            score = match(Product.search_text, against=keywords).in_natural_language_mode()
+            return score > 0, score.label('relevance')
+        return and_(*[Product.search_text.contains(word, autoescape=True) for word in keywords.split()]), None
+
+    async def get_shopping_history(
+        self, user_id: int, page: int = 1, page_size: int = 10, cursor: str | None = None, count_strategy: str | None = None
+    ) -> Pagination:
+        """Get completed orders of a user joined with product info, newest first"""
+        query = select(
+            Product.name,
+            Product.price,
+            Product.main_image_url,
+            Order.quantity,
+            Order.total_price,
+            Order.created_at,
+            Order.id
+        ).join(
+            Order, Product.id == Order.product_id
+        ).where(
+            and_(
+                Order.user_id == user_id,
+                Order.status == "completed"
+            )
+        )
+        sort_keys = [(Order.created_at, True), (Order.id, True)]
+        return await self.paginate(query, page, page_size, sort_keys=sort_keys, cursor=cursor, count_strategy=count_strategy)
+
+    async def get_wishlist(
+        self, user_id: int, page: int = 1, page_size: int = 10, cursor: str | None = None, count_strategy: str | None = None
+    ) -> Pagination:
+        """Get wishlist products of a user, most recently added first"""
+        query = select(
+            Product.name,
+            Product.price,
+            Product.main_image_url,
+            Wishlist.id
+        ).join(
+            Wishlist, Product.id == Wishlist.product_id
+        ).where(
+            Wishlist.user_id == user_id
+        )
+        return await self.paginate(query, page, page_size, sort_keys=[(Wishlist.id, True)], cursor=cursor, count_strategy=count_strategy)
@@ -0,0 +1,32 @@
+import logging
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.base_dal import AsyncBaseDAL
+from app.modules.products.cache.leaderboard import WISHLIST_ITEM_ADDED
+from app.modules.products.models.wishlists import Wishlist
+
+logger = logging.getLogger(__name__)
+
+class WishlistDAL(AsyncBaseDAL[Wishlist]):
+    """Data Access Layer for Wishlist model"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Wishlist)
+
+    async def get_wishlist_item(self, user_id: int, product_id: int) -> Wishlist | None:
+        """Get the wishlist row of a user for a product"""
+        result = await self.db.execute(
+            select(Wishlist).where(
+                Wishlist.user_id == user_id,
+                Wishlist.product_id == product_id
+            )
+        )
+        return result.scalars().first()
+
+    async def add_item(self, user_id: int, product_id: int, category_id: int | None) -> Wishlist:
+        """Create the wishlist row, counted by the leaderboards after commit (WISHLIST_ITEM_ADDED)"""
+        self.trigger_after_commit(WISHLIST_ITEM_ADDED, product_id=product_id, category_id=category_id)
+        return await self.create({
+            'user_id': user_id,
+            'product_id': product_id
+        })
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from app.core.base_model import BaseEntity
+from app.enums.catalog_enums import CatalogImportStatusEnum
+
+
+class CatalogImportJob(BaseEntity):
+    """Catalog import job: one uploaded CSV/NDJSON file, imported by a Celery task"""
+
+    __tablename__ = 'catalog_import_jobs'
+
+    object_name = Column(String(255), nullable=False)  # file in MinIO
+    file_name = Column(String(255), nullable=True)  # name of the upload
+    file_format = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False, default=CatalogImportStatusEnum.PENDING.value)
+    task_id = Column(String(64), nullable=True)
+    # Data rows of the committed chunks: a rerun skips them (resume point)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    # JSON list of {"row": n, "sku": ..., "error": ...}, the first CATALOG_IMPORT_MAX_ERRORS error rows
+    errors = Column(Text, nullable=True)
+    message = Column(Text, nullable=True)  # why the job failed
+    create_date = Column(DateTime, nullable=False, server_default=func.now())
+    update_date = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Enum, DateTime, Numeric, String
+from sqlalchemy import Column, Index, Integer, Enum, DateTime, Numeric, String, text
 from sqlalchemy.orm import validates, relationship
 
 from app.core.base_model import BaseEntity
@@ -7,6 +7,12 @@ class Order(BaseEntity):
     """Order model"""
 
     __tablename__ = 'orders'
+    __table_args__ = (
+        # shopping history: user_id + status, newest first
+        Index('ix_orders_user_id_status_created_at', 'user_id', 'status', 'created_at'),
+        # leaderboard reconciliation: completed orders of the last days
+        Index('ix_orders_status_created_at', 'status', 'created_at'),
+    )
 
     product_id = Column(Integer, nullable=False)
     user_id = Column(Integer, nullable=False)
@@ -15,7 +21,7 @@ class Order(BaseEntity):
     # Assuming status is a string enum
     status = Column(String(50), nullable=False, default="pending")
     created_at = Column(DateTime, nullable=False,
-                        server_default="CURRENT_TIMESTAMP")
+                        server_default=text("CURRENT_TIMESTAMP"))
 
     @validates('quantity')
     def validate_quantity(self, key, quantity):
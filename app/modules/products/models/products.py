@@ -1,15 +1,37 @@
 
-from sqlalchemy import Column, Integer, String, Text, Numeric, SmallInteger
-from sqlalchemy.orm import validates
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, Numeric, SmallInteger, UniqueConstraint, event, func, inspect
+from sqlalchemy.orm import deferred, validates
 
-from app.core.base_model import BaseEntity
+from app.core.base_model import BaseEntity, PreciseDateTime, now_precise
+from app.modules.products.models.sizes import SIZE_SEPARATOR
+from app.utils.text_utils import fold_text
+
+
+def build_search_text(name: str | None, description: str | None) -> str:
+    """Value of products.search_text: name and description, diacritic-folded"""
+    return f'{fold_text(name)} {fold_text(description)}'.strip()
 
 
 class Product(BaseEntity):
     """Product model"""
 
     __tablename__ = 'products'
+    __table_args__ = (
+        # item_type filter ordered by id (InnoDB appends the primary key to secondary indexes)
+        Index('ix_products_category_id', 'category_id'),
+        # item_type filter sorted by price
+        Index('ix_products_category_id_price', 'category_id', 'price'),
+        # keyword search (q), ngram so two-letter Vietnamese syllables ("ao") are indexed
+        Index('ix_products_search_text', 'search_text', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        # catalog export: updated_since filter, streamed in (update_date, id) order
+        Index('ix_products_update_date', 'update_date'),
+        # sort_by=popularity (InnoDB appends the primary key, the tie-breaker)
+        Index('ix_products_popularity', 'popularity'),
+        # supplier SKU, the key of catalog imports (NULL for products created in the admin)
+        UniqueConstraint('sku', name='uq_products_sku'),
+    )
 
+    sku = Column(String(64), nullable=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     brand_id = Column(Integer, nullable=False)
@@ -18,6 +40,19 @@ class Product(BaseEntity):
     stock = Column(Integer, nullable=False, default=0)
     category_id = Column(Integer, nullable=False)
     collab_status = Column(SmallInteger, nullable=False, default=0)
+    # Projection of size_product: size names ordered by sizes.sort_order, comma separated
+    # ('' = no sizes, NULL = not built yet). Maintained by ProductDAL.refresh_size_projection
+    sizes = Column(String(255), nullable=True)
+    # build_search_text(name, description), kept current by the flush hooks below and ProductDAL bulk writes
+    # Deferred: only the database reads it
+    search_text = deferred(Column(Text, nullable=True))
+    # Units sold + LEADERBOARD_WISH_WEIGHT x wishlist adds over LEADERBOARD_POPULARITY_WINDOW, copied from
+    # the Redis leaderboard by the rollup job (LeaderboardRefresher) without bumping update_date
+    popularity = Column(Numeric(12, 2), nullable=False, default=0, server_default='0')
+    create_date = Column(DateTime, nullable=False, server_default=func.now())
+    # Row version (ETags of GET /products/{id}), microsecond precision. Also ON UPDATE CURRENT_TIMESTAMP(6)
+    # on MySQL (migrations 0005, 0007), so bulk, upsert and raw SQL writes (stock reservations) bump it too
+    update_date = Column(PreciseDateTime, nullable=False, server_default=now_precise(), onupdate=now_precise())
 
     @validates('name')
     def validate_name(self, key, name):
@@ -37,7 +72,26 @@ class Product(BaseEntity):
             raise ValueError('Stock cannot be negative')
         return stock
 
+    @property
+    def size_names(self) -> list[str] | None:
+        """Sizes from the projection column, None when it is not built"""
+        if self.sizes is None:
+            return None
+        return self.sizes.split(SIZE_SEPARATOR) if self.sizes else []
+
     def to_dict(self):
         """Convert model to dictionary"""
         result = super().to_dict()
-        return result
\ No newline at end of file
+        return result
+
+
+@event.listens_for(Product, 'before_insert')
+def set_search_text(mapper, connection, product):
+    product.search_text = build_search_text(product.name, product.description)
+
+
+@event.listens_for(Product, 'before_update')
+def update_search_text(mapper, connection, product):
+    state = inspect(product)
+    if state.attrs.name.history.has_changes() or state.attrs.description.history.has_changes():
+        product.search_text = build_search_text(product.name, product.description)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Enum, DateTime, Numeric, String
+from sqlalchemy import Column, Index, Integer, Enum, DateTime, Numeric, String, UniqueConstraint
 from sqlalchemy.orm import validates
 
 from app.core.base_model import BaseEntity
@@ -8,6 +8,12 @@ class SizeProduct(BaseEntity):
     """SizeProduct model represents the association between products and sizes."""
 
     __tablename__ = 'size_product'
+    __table_args__ = (
+        # sizes of a product (product pages, batch size lookup)
+        UniqueConstraint('product_id', 'size_id', name='uq_size_product_product_id_size_id'),
+        # products of a size (size_type filter)
+        Index('ix_size_product_size_id_product_id', 'size_id', 'product_id'),
+    )
 
     product_id = Column(Integer, nullable=False)
     size_id = Column(Integer, nullable=False)
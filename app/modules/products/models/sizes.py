@@ -3,16 +3,25 @@ from sqlalchemy.orm import validates
 
 from app.core.base_model import BaseEntity
 
+# Sizes without an explicit rank are listed after the standard ones
+DEFAULT_SIZE_SORT_ORDER = 1000
+# Separator of the size names in products.sizes
+SIZE_SEPARATOR = ','
+
 class Size(BaseEntity):
     
     __tablename__ = 'sizes'
     
     size_name = Column(String(50), nullable=False, unique=True)
+    # Display rank (XS=10 ... XXL=60), sizes of a product are listed by sort_order, id
+    sort_order = Column(Integer, nullable=False, default=DEFAULT_SIZE_SORT_ORDER, server_default=str(DEFAULT_SIZE_SORT_ORDER))
     
     @validates('size_name')
     def validate_size_name(self, key, size_name):
         if not size_name or len(size_name) < 1:
             raise ValueError('Size name must be at least 1 character long')
+        if SIZE_SEPARATOR in size_name:
+            raise ValueError(f'Size name cannot contain "{SIZE_SEPARATOR}"')
         return size_name
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, SmallInteger
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, Numeric, SmallInteger, UniqueConstraint, text
 from sqlalchemy.orm import validates
 
 from app.core.base_model import BaseEntity
@@ -6,9 +6,17 @@ from app.core.base_model import BaseEntity
 class Wishlist(BaseEntity):
     
     __tablename__ = 'wishlist'
+    __table_args__ = (
+        # one row per (user, product)
+        UniqueConstraint('user_id', 'product_id', name='uq_wishlist_user_id_product_id'),
+        # wishlist listing ordered by id (InnoDB appends the primary key)
+        Index('ix_wishlist_user_id', 'user_id'),
+    )
     
     product_id = Column(Integer, nullable=False)
     user_id = Column(Integer, nullable=False)
+    # Day of the wishlist add in the leaderboards (rows older than migration 0008 have its date)
+    created_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
     
     def to_dict(self):
         """Convert model to dictionary with status properly serialized"""
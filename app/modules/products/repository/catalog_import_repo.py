@@ -0,0 +1,271 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from fastapi import Depends, UploadFile
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.base_repo import BaseRepo
+from app.core.config import get_settings
+from app.core.database import get_async_db
+from app.enums.catalog_enums import CatalogImportStatusEnum
+from app.exceptions.exception import NotFoundException, ValidationException
+from app.middleware.translation_manager import _
+from app.modules.products.cache.dimension_cache import invalidate_dimensions_sync
+from app.modules.products.cache.search_cache import invalidate_all_searches_sync
+from app.modules.products.dal.catalog_import_dal import CatalogImportDAL, CatalogImportJobDAL
+from app.modules.products.models.catalog_import_jobs import CatalogImportJob
+from app.modules.products.models.products import build_search_text
+from app.modules.products.models.sizes import SIZE_SEPARATOR
+from app.modules.products.schemas.catalog_import import CatalogImportJobResponse, CatalogImportRow
+from app.modules.products.schemas.product_request import ExportFormat
+
+logger = logging.getLogger(__name__)
+
+# Folder of the uploaded files in MinIO
+IMPORT_FOLDER = 'catalog-imports'
+
+
+class CatalogImportRepo(BaseRepo):
+    """Catalog imports, API side: upload the file, queue the Celery task, report progress"""
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        self.db = db
+        self.job_dal = CatalogImportJobDAL(db)
+
+    async def start_import(self, file: UploadFile) -> CatalogImportJobResponse:
+        """Store `file` in MinIO and queue its import (see CatalogImporter)"""
+        file_name = file.filename or ''
+        extension = os.path.splitext(file_name)[1].lower().lstrip('.')
+        if extension not in {export_format.value for export_format in ExportFormat}:
+            raise ValidationException(_('invalid_import_file'))
+
+        # Imported here: the MinIO client and the Celery app connect on import
+        from app.jobs.tasks import import_catalog
+        from app.utils.minio import minio_handler
+
+        # Streamed in parts, the file is never held in memory; blocking client, so off the event loop
+        object_name = await asyncio.to_thread(
+            minio_handler.upload_stream, file.file, file_name, IMPORT_FOLDER, file.content_type or 'application/octet-stream'
+        )
+        job = await self.job_dal.create({'object_name': object_name, 'file_name': file_name, 'file_format': extension})
+        task = import_catalog.delay(job.id)
+        job = await self.job_dal.update(job.id, {'task_id': task.id})
+        logger.info(f"Queued catalog import job {job.id} ({file_name}) as task {task.id}")
+        return CatalogImportJobResponse.model_validate(job)
+
+    async def get_job(self, job_id: int) -> CatalogImportJobResponse:
+        """Progress of a catalog import job"""
+        job = await self.job_dal.get_by_id(job_id)
+        if not job:
+            raise NotFoundException(_('catalog_import_not_found'))
+        return CatalogImportJobResponse.model_validate(job)
+
+
+class CatalogImporter:
+    """Imports one catalog file into products and size_product (Celery task, sync session)
+
+    The file is read as a stream, CATALOG_IMPORT_CHUNK_SIZE rows at a time.
+    Each chunk is validated, its category and size names are resolved through
+    in-memory maps (missing ones are created), then its products are upserted
+    by SKU and their size_product rows replaced, all in one transaction that
+    also saves the job progress. Running the job again (task retry, redelivery
+    after a worker crash) skips the rows of the chunks already committed.
+
+    Invalid rows are counted and the first CATALOG_IMPORT_MAX_ERRORS are kept
+    on the job; they never stop the import.
+    """
+
+    def __init__(self, db: Session, job_id: int, on_progress: Callable[[dict], None] | None = None):
+        self.db = db
+        self.dal = CatalogImportDAL(db)
+        self.settings = get_settings()
+        self.job_id = job_id
+        self.on_progress = on_progress
+        self._category_ids: dict[str, int] | None = None
+        self._sizes: dict[str, tuple[int, int, str]] | None = None
+        # Categories or sizes created by the current chunk (API workers reload their DimensionCache)
+        self._dimensions_changed = False
+
+    @property
+    def job(self) -> CatalogImportJob:
+        job = self.dal.get_by_id(self.job_id)
+        if not job:
+            raise NotFoundException(_('catalog_import_not_found'))
+        return job
+
+    def run(self, lines: Iterable[str]) -> dict:
+        """Import the text lines of the job's file, from the first row not committed yet"""
+        job = self.job
+        if job.status == CatalogImportStatusEnum.COMPLETED.value:
+            logger.info(f"Catalog import job {job.id} already completed")
+            return self._progress(job)
+
+        file_format, skipped = job.file_format, job.processed_rows
+        errors = json.loads(job.errors) if job.errors else []
+        with self.dal.transaction():
+            job.status = CatalogImportStatusEnum.RUNNING.value
+            job.message = None
+        if skipped:
+            logger.info(f"Resuming catalog import job {self.job_id} after row {skipped}")
+
+        try:
+            records = islice(self._records(lines, file_format), skipped, None)
+            while chunk := list(islice(records, self.settings.CATALOG_IMPORT_CHUNK_SIZE)):
+                self._import_chunk(chunk, errors)
+        except Exception as ex:
+            self.db.rollback()
+            logger.exception(f"Catalog import job {self.job_id} failed: {ex}")
+            with self.dal.transaction():
+                job = self.job
+                job.status = CatalogImportStatusEnum.FAILED.value
+                job.message = str(ex)[:1000]
+            raise
+
+        with self.dal.transaction():
+            job = self.job
+            job.status = CatalogImportStatusEnum.COMPLETED.value
+            job.finished_at = datetime.now()
+        logger.info(f"Catalog import job {self.job_id} completed: {self._progress(job)}")
+        return self._progress(job)
+
+    @staticmethod
+    def _records(lines: Iterable[str], file_format: str) -> Iterator[tuple[int, dict | None, str | None]]:
+        """(row number, values, parse error) of every data row, numbered from 1"""
+        if file_format == ExportFormat.CSV.value:
+            for row_number, values in enumerate(csv.DictReader(lines), start=1):
+                yield row_number, values, None
+            return
+        row_number = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                values = json.loads(line)
+            except ValueError as ex:
+                yield row_number, None, f'Invalid JSON: {ex}'
+                continue
+            if isinstance(values, dict):
+                yield row_number, values, None
+            else:
+                yield row_number, None, 'Expected a JSON object'
+
+    def _import_chunk(self, chunk: list[tuple[int, dict | None, str | None]], errors: list[dict]) -> None:
+        rows: dict[str, CatalogImportRow] = {}
+        row_numbers: dict[str, int] = {}
+        chunk_errors = []
+        for row_number, values, parse_error in chunk:
+            if parse_error is not None:
+                chunk_errors.append({'row': row_number, 'sku': None, 'error': parse_error})
+                continue
+            try:
+                row = CatalogImportRow.model_validate(values)
+            except ValidationError as ex:
+                chunk_errors.append({'row': row_number, 'sku': values.get('sku'), 'error': self._error_text(ex)})
+                continue
+            # A SKU listed twice in the chunk: the last row wins, as in a sequential import
+            rows.pop(row.sku, None)
+            rows[row.sku] = row
+            row_numbers[row.sku] = row_number
+
+        with self.dal.transaction():
+            category_ids = self._resolve_categories(rows.values())
+            sizes = self._resolve_sizes(rows.values())
+            known_ids = set(category_ids.values())
+            unknown = [sku for sku, row in rows.items() if row.category is None and row.category_id not in known_ids]
+            for sku in unknown:
+                chunk_errors.append({'row': row_numbers[sku], 'sku': sku, 'error': f'category_id: Unknown category {rows.pop(sku).category_id}'})
+
+            # Rows with and without sizes update different columns, one upsert each
+            with_sizes = [row for row in rows.values() if row.sizes is not None]
+            without_sizes = [row for row in rows.values() if row.sizes is None]
+            for group in (with_sizes, without_sizes):
+                if group:
+                    self.dal.upsert_products([self._product_values(row, category_ids, sizes) for row in group])
+            if with_sizes:
+                product_ids = self.dal.get_product_ids(row.sku for row in with_sizes)
+                self.dal.replace_product_sizes(
+                    {product_ids[row.sku]: [sizes[name.casefold()][0] for name in row.sizes] for row in with_sizes}
+                )
+
+            job = self.job
+            job.processed_rows += len(chunk)
+            job.imported_rows += len(rows)
+            job.error_count += len(chunk_errors)
+            if chunk_errors and len(errors) < self.settings.CATALOG_IMPORT_MAX_ERRORS:
+                errors.extend(chunk_errors[: self.settings.CATALOG_IMPORT_MAX_ERRORS - len(errors)])
+                job.errors = json.dumps(errors, ensure_ascii=False)
+            progress = self._progress(job)
+
+        # Committed: searches cached by the API must not serve the old catalog
+        invalidate_all_searches_sync()
+        if self._dimensions_changed:
+            invalidate_dimensions_sync()
+            self._dimensions_changed = False
+        logger.info(f"Catalog import job {self.job_id}: {progress}")
+        if self.on_progress:
+            self.on_progress(progress)
+
+    def _resolve_categories(self, rows: Iterable[CatalogImportRow]) -> dict[str, int]:
+        """Category ids by case-folded name, creating the categories named in `rows` that do not exist"""
+        if self._category_ids is None:
+            self._category_ids = self.dal.get_category_ids()
+        missing = {row.category.casefold(): row.category for row in rows if row.category is not None}
+        missing = {key: name for key, name in missing.items() if key not in self._category_ids}
+        if missing:
+            self.dal.create_categories(missing.values())
+            self._dimensions_changed = True
+            self._category_ids = self.dal.get_category_ids()
+        return self._category_ids
+
+    def _resolve_sizes(self, rows: Iterable[CatalogImportRow]) -> dict[str, tuple[int, int, str]]:
+        """(id, sort_order, name) by case-folded size name, creating the sizes named in `rows` that do not exist"""
+        if self._sizes is None:
+            self._sizes = self.dal.get_sizes()
+        missing = {name.casefold(): name for row in rows for name in row.sizes or ()}
+        missing = {key: name for key, name in missing.items() if key not in self._sizes}
+        if missing:
+            self.dal.create_sizes(missing.values())
+            self._dimensions_changed = True
+            self._sizes = self.dal.get_sizes()
+        return self._sizes
+
+    @staticmethod
+    def _product_values(row: CatalogImportRow, category_ids: dict[str, int], sizes: dict[str, tuple[int, int, str]]) -> dict:
+        """products row of `row`, with the columns the ORM hooks would fill (search_text, sizes projection)"""
+        values = {
+            'sku': row.sku,
+            'name': row.name,
+            'description': row.description,
+            'brand_id': row.brand_id,
+            'price': row.price,
+            'stock': row.stock,
+            'category_id': category_ids[row.category.casefold()] if row.category is not None else row.category_id,
+            'main_image_url': row.main_image_url,
+            'collab_status': row.collab_status,
+            'search_text': build_search_text(row.name, row.description),
+        }
+        if row.sizes is not None:
+            ordered = sorted((sizes[name.casefold()] for name in row.sizes), key=lambda size: (size[1], size[0]))
+            values['sizes'] = SIZE_SEPARATOR.join(size_name for _id, _sort_order, size_name in ordered)
+        return values
+
+    @staticmethod
+    def _error_text(ex: ValidationError) -> str:
+        return '; '.join(f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in ex.errors())
+
+    @staticmethod
+    def _progress(job: CatalogImportJob) -> dict:
+        return {
+            'job_id': job.id,
+            'status': job.status,
+            'processed_rows': job.processed_rows,
+            'imported_rows': job.imported_rows,
+            'error_count': job.error_count,
+        }
@@ -0,0 +1,105 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.modules.products.cache.leaderboard import DAY_BUCKET_TTL, day_key, metric_amounts, scope_name, window_key
+from app.modules.products.cache.search_cache import invalidate_all_searches_sync
+from app.modules.products.dal.leaderboard_dal import LeaderboardDAL
+from app.modules.products.schemas.product_request import LeaderboardMetric, LeaderboardWindow
+from app.utils.redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# Redis commands per pipeline round trip
+PIPELINE_BATCH_SIZE = 1000
+
+
+class LeaderboardRefresher:
+    """Maintenance of the Redis leaderboards (Celery beat task, sync session), see LeaderboardCache
+
+    Every run rebuilds each window from its day buckets, which drops the
+    days that left the window, and copies the popularity window to
+    products.popularity for sort_by=popularity. With `reconcile` it first
+    rewrites the day buckets of the longest window from MySQL (completed
+    orders by order day, wishlist rows by add day), correcting increments
+    lost while Redis was down or made outside the API. Increments made while
+    it runs may be overwritten; the next reconciliation counts them.
+    """
+
+    def __init__(self, db: Session):
+        self.dal = LeaderboardDAL(db)
+        self.settings = get_settings()
+        self.redis = get_sync_redis()
+
+    def run(self, reconcile: bool = False) -> dict:
+        today = date.today()
+        scopes = [scope_name(None)] + [scope_name(category_id) for category_id in self.dal.get_category_ids()]
+        result = {'day_buckets': self._reconcile(scopes, today) if reconcile else None}
+        result['windows'] = self._roll_windows(scopes, today)
+
+        with self.dal.transaction():
+            result['popularity_changed'] = self.dal.set_popularity(self._popularity_scores())
+        if result['popularity_changed']:
+            # Cached searches sorted by popularity must not keep the old order
+            invalidate_all_searches_sync()
+        logger.info(f"Leaderboards refreshed: {result}")
+        return result
+
+    def _reconcile(self, scopes: list[str], today: date) -> int:
+        days = max(window.days for window in LeaderboardWindow)
+        first_day = today - timedelta(days=days - 1)
+        since = datetime.combine(first_day, time.min)
+
+        buckets: dict[str, dict[str, float]] = defaultdict(dict)
+        for rows, amounts in (
+            (self.dal.get_daily_sales(since), lambda count: metric_amounts(sold=float(count))),
+            (self.dal.get_daily_wishes(since), lambda count: metric_amounts(wished=float(count))),
+        ):
+            for day, product_id, category_id, count in rows:
+                # DATE() is a date on MySQL, an ISO string on SQLite
+                day = date.fromisoformat(str(day))
+                for scope in {scope_name(None), scope_name(category_id)}:
+                    for metric, amount in amounts(count).items():
+                        members = buckets[day_key(metric, scope, day)]
+                        members[str(product_id)] = members.get(str(product_id), 0) + amount
+
+        keys = {day_key(metric, scope, first_day + timedelta(days=offset))
+                for scope in scopes for metric in LeaderboardMetric for offset in range(days)}
+        keys.update(buckets)
+        commands = []
+        for key in sorted(keys):
+            members = buckets.get(key)
+            if members:
+                # Built aside and renamed over the bucket: readers never see it half written
+                commands.append(lambda pipe, key=key, members=members: (
+                    pipe.delete(f'{key}:tmp'), pipe.zadd(f'{key}:tmp', members),
+                    pipe.expire(f'{key}:tmp', DAY_BUCKET_TTL), pipe.rename(f'{key}:tmp', key),
+                ))
+            else:
+                commands.append(lambda pipe, key=key: pipe.delete(key))
+        self._execute(commands)
+        return len(buckets)
+
+    def _roll_windows(self, scopes: list[str], today: date) -> int:
+        commands = [
+            lambda pipe, metric=metric, scope=scope, window=window: pipe.zunionstore(
+                window_key(metric, scope, window), [day_key(metric, scope, today - timedelta(days=offset)) for offset in range(window.days)]
+            )
+            for scope in scopes for metric in LeaderboardMetric for window in LeaderboardWindow
+        ]
+        self._execute(commands)
+        return len(commands)
+
+    def _popularity_scores(self) -> dict[int, Decimal]:
+        window = LeaderboardWindow(self.settings.LEADERBOARD_POPULARITY_WINDOW)
+        members = self.redis.zrange(window_key(LeaderboardMetric.POPULARITY, scope_name(None), window), 0, -1, withscores=True)
+        return {int(member): Decimal(str(round(score, 2))) for member, score in members}
+
+    def _execute(self, commands: list) -> None:
+        for start in range(0, len(commands), PIPELINE_BATCH_SIZE):
+            with self.redis.pipeline(transaction=False) as pipe:
+                for command in commands[start:start + PIPELINE_BATCH_SIZE]:
+                    command(pipe)
+                pipe.execute()
@@ -0,0 +1,73 @@
+import logging
+from fastapi import Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.base_repo import BaseRepo
+from app.core.database import get_async_db
+from app.core.db_routing import use_primary
+from app.exceptions.exception import CustomHTTPException
+from app.middleware.translation_manager import _
+from app.modules.products.cache.leaderboard import LeaderboardCache
+from app.modules.products.cache.search_cache import ProductSearchCache
+from app.modules.products.dal.order_dal import OrderDAL
+from app.modules.products.schemas.order_request import CompleteOrdersRequest, PlaceOrderRequest
+from app.modules.products.schemas.order_response import CompleteOrdersResponse, OrderLineResponse, PlaceOrderResponse
+
+logger = logging.getLogger(__name__)
+
+
+class OrderRepo(BaseRepo):
+    """Repository for order placement and completion"""
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        self.db = db
+        self.order_dal = OrderDAL(db)
+        # Registers the leaderboard hooks of completed orders and the search cache hook of sold-out products
+        LeaderboardCache()
+        ProductSearchCache()
+
+    async def place_order(self, user_id: int, request: PlaceOrderRequest) -> PlaceOrderResponse:
+        """Reserve the stock of every line and create the orders, all or nothing
+
+        Lines are merged per product and processed by ascending product id: all
+        orders lock product rows in the same order, so two multi-line orders
+        never wait on each other in a cycle (no deadlocks).
+        """
+        quantities = {}
+        for item in request.items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        lines = sorted(quantities.items())
+
+        # Stock and prices must come from the primary, never from a lagging replica
+        use_primary(self.db)
+        async with self.order_dal.transaction():
+            for product_id, quantity in lines:
+                if not await self.order_dal.reserve_stock(product_id, quantity):
+                    await self._raise_unavailable(product_id)
+            prices = await self.order_dal.get_prices([product_id for product_id, _quantity in lines])
+            orders = await self.order_dal.create_orders(user_id, lines, prices)
+
+        logger.info(f"User {user_id} placed orders {[order.id for order in orders]} for {dict(lines)}")
+        return PlaceOrderResponse(
+            items=[OrderLineResponse.model_validate(order) for order in orders],
+            total_price=float(sum(order.total_price for order in orders)),
+        )
+
+    async def complete_orders(self, request: CompleteOrdersRequest) -> CompleteOrdersResponse:
+        """Mark orders completed (sold), already completed or unknown ids are skipped"""
+        order_ids = sorted(set(request.order_ids))
+        use_primary(self.db)
+        async with self.order_dal.transaction():
+            completed_ids = await self.order_dal.complete_orders(order_ids)
+
+        logger.info(f"Completed orders {completed_ids}")
+        completed = set(completed_ids)
+        return CompleteOrdersResponse(
+            completed_ids=completed_ids,
+            skipped_ids=[order_id for order_id in order_ids if order_id not in completed],
+        )
+
+    async def _raise_unavailable(self, product_id: int) -> None:
+        # Failure path only: tell a missing product from a short stock
+        if not await self.order_dal.get_prices([product_id]):
+            raise CustomHTTPException(message=_('product_not_found'), status_code=status.HTTP_404_NOT_FOUND)
+        raise CustomHTTPException(message=_('insufficient_stock'), status_code=status.HTTP_409_CONFLICT)
@@ -1,98 +1,308 @@
+import csv
+import io
 import logging
+from datetime import datetime
+from typing import AsyncIterator
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.core.base_model import Pagination
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.base_model import Pagination, ResponseSchema
 from app.core.base_repo import BaseRepo
-from app.core.database import get_db
-from app.exceptions.exception import NotFoundException
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.loader import get_loaders
+from app.exceptions.exception import NotFoundException, ValidationException
 from app.middleware.translation_manager import _
-from app.modules.products.dal.product_dal import ProductDAL
-from app.modules.products.schemas.product_request import SearchProductRequest
+from app.modules.products.cache.leaderboard import LeaderboardCache
+from app.modules.products.cache.product_cache import ProductCache
+from app.modules.products.cache.search_cache import ProductSearchCache
+from app.modules.products.dal.product_dal import FACETS, ProductDAL
 from app.modules.products.models.products import Product
-from app.modules.products.models.orders import Order
-from app.modules.products.models.wishlists import Wishlist
-from app.modules.products.schemas.product_response import ProductResponse
-from sqlalchemy import and_
+from app.modules.products.models.sizes import SIZE_SEPARATOR
+from app.modules.products.schemas.product_request import ExportFormat, LeaderboardMetric, LeaderboardWindow, SearchProductRequest
+from app.modules.products.schemas.product_response import (
+    ProductBatchResponse, ProductFacets, ProductResponse, TopProductItem, TopProductsResponse, sparse_product_response,
+)
 
 logger = logging.getLogger(__name__)
 
+# Fields selectable with `fields=`: the ProductResponse fields stored on products, plus the size list
+SPARSE_FIELDS = frozenset(name for name in ProductResponse.model_fields if name in Product.__table__.columns) | {'size'}
+SPARSE_INCLUDES = frozenset({'sizes'})
+
 class ProductRepo(BaseRepo):
     """Repository for product-related operations"""
 
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
         self.db = db
         self.product_dal = ProductDAL(db)
+        self.loaders = get_loaders(db)
+        self.product_cache = ProductCache()
+        self.search_cache = ProductSearchCache()
+        self.leaderboard = LeaderboardCache()
 
-    # File: product_repo.py
-
-    def get_product_by_id(self, product_id: int):  # Change return type to ProductResponse
+    async def get_product_by_id(self, product_id: int) -> ProductResponse:
         """Retrieve a product by its ID"""
-        product = self.product_dal.get_product_by_id(product_id)
-        if not product:
+        product_response = (await self.get_products_by_ids([product_id])).get(product_id)
+        if not product_response:
             raise NotFoundException(_('product_not_found'))
-        
-        # Fetch sizes for the product
-        sizes = self.product_dal.get_product_sizes(product_id)
-        
-        # Convert product to ProductResponse and include sizes
-        product_response = ProductResponse.model_validate(product)
-        product_response.size = sizes  # Assign sizes to the response
         return product_response
 
+    async def get_product_version(self, product_id: int) -> datetime | None:
+        """update_date of the product, read from the database, without building it
+
+        ProductCache is per worker and only invalidated by writes made in that
+        worker, so it cannot vouch for the version. A cached response older than
+        the row is dropped here: the next get_product_by_id rebuilds it, and its
+        ETag matches the version. Unconditional requests can still get a stale
+        cached product for up to PRODUCT_CACHE_TTL seconds.
+        """
+        version = await self.product_dal.get_update_date(product_id)
+        product_response = self.product_cache.get(product_id)
+        if product_response is not None and product_response.update_date != version:
+            self.product_cache.invalidate([product_id])
+        return version
+
+    async def get_products_by_ids(self, product_ids: list[int]) -> dict[int, ProductResponse]:
+        """Built ProductResponse objects by id, served from ProductCache
+
+        Misses are loaded together: one query for the products and one for their
+        sizes. Unknown ids are absent from the result.
+        """
+        cached, missing = self.product_cache.get_many(product_ids)
+        if not missing:
+            return cached
+
+        # Loaders memoize per request, repeated lookups of the same product are free
+        products = [product for product in await self.loaders.load_many(Product, missing) if product]
+        size_map = await self._sizes_of(products)
+
+        built = []
+        for product in products:
+            product_response = ProductResponse.model_validate(product)
+            product_response.size = size_map[product.id]
+            built.append(product_response)
+        self.product_cache.set_many(built)
+
+        cached.update({product_response.id: product_response for product_response in built})
+        return cached
+
+    async def get_products_batch(self, product_ids: list[int]) -> ProductBatchResponse:
+        """Products of `product_ids` in that order (duplicates once), plus the ids that do not exist
+
+        Served like get_products_by_ids: cached products cost nothing, the rest
+        take one IN query and one sizes query in total.
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        if len(product_ids) > get_settings().MAX_PAGE_SIZE:
+            raise ValidationException(_('too_many_product_ids'))
+        products = await self.get_products_by_ids(product_ids)
+        return ProductBatchResponse(
+            items=[products[product_id] for product_id in product_ids if product_id in products],
+            missing_ids=[product_id for product_id in product_ids if product_id not in products],
+        )
+
+    async def get_top_products(self, metric: LeaderboardMetric, window: LeaderboardWindow,
+                               category_id: int | None = None, limit: int = 10) -> TopProductsResponse:
+        """Leaders of `metric` over `window`, from the Redis leaderboards
+
+        Empty while Redis is unavailable; deleted products are left out.
+        """
+        leaders = await self.leaderboard.top(metric, window, category_id, limit)
+        if leaders is None:
+            logger.warning(f"Leaderboard {metric.value}/{window.value} unavailable, returning no products")
+            leaders = []
+        products = await self.get_products_by_ids([product_id for product_id, score in leaders])
+        leaders = [(product_id, score) for product_id, score in leaders if product_id in products]
+        items = [
+            TopProductItem(rank=rank, score=score, product=products[product_id])
+            for rank, (product_id, score) in enumerate(leaders, start=1)
+        ]
+        return TopProductsResponse(metric=metric, window=window, category_id=category_id, items=items)
+
+    async def get_search_facets(self, request: SearchProductRequest) -> ProductFacets:
+        """Facet counts of the filters of `request`, served from ProductSearchCache"""
+        facets = self._facet_names(request)
+        return await self.search_cache.get_or_load_facets(
+            request,
+            load=lambda: self._get_search_facets(request, facets),
+            refresh=lambda: self._refresh_search_facets(request, facets),
+        )
+
+    @staticmethod
+    def _facet_names(request: SearchProductRequest) -> list[str]:
+        facets = [name.strip() for name in (request.facets or '').split(',') if name.strip()]
+        if any(name not in FACETS for name in facets):
+            raise ValidationException(_('invalid_facet'))
+        return facets
+
+    async def _get_search_facets(self, request: SearchProductRequest, facets: list[str]) -> ProductFacets:
+        return ProductFacets(**await self.product_dal.get_facets(request.model_dump(), facets))
+
+    @staticmethod
+    async def _refresh_search_facets(request: SearchProductRequest, facets: list[str]) -> ProductFacets:
+        async with AsyncSessionLocal() as db:
+            return await ProductRepo(db)._get_search_facets(request, facets)
+
+    async def _sizes_of(self, products: list[Product]) -> dict[int, list[str]]:
+        """Ordered size names by product id: the projection column, size_product for rows without one"""
+        size_map = {product.id: product.size_names for product in products}
+        unbuilt = [product_id for product_id, sizes in size_map.items() if sizes is None]
+        if unbuilt:
+            logger.debug(f"Size projection not built for products {unbuilt}, reading size_product")
+            for product_id, sizes in zip(unbuilt, await self.product_dal.sizes_loader().load_many(unbuilt)):
+                size_map[product_id] = sizes or []
+        return size_map
+
     # File: product_repo.py
 
-    def search_products(self, request: SearchProductRequest) -> Pagination[ProductResponse]:
-        """Search products with pagination, filtering, and sorting"""
+    async def search_products(self, request: SearchProductRequest, lang: str | None = None) -> Pagination:
+        """Search products with pagination, filtering, and sorting, served from ProductSearchCache
+
+        Items are ProductResponse objects, or sparse_product_response models when
+        request.fields is set (see response_model).
+        """
+        # Rejected before the search runs, not after its page was computed and cached
+        self._facet_names(request)
+        return await self.search_cache.get_or_load(
+            request,
+            lang,
+            load=lambda: self._search_products(request),
+            refresh=lambda: self._refresh_search(request),
+            item_model=self.response_model(request),
+        )
+
+    def response_model(self, request: SearchProductRequest) -> type[ResponseSchema]:
+        """Item model of search_products for `request`"""
+        fields = self._sparse_fields(request)
+        return ProductResponse if fields is None else sparse_product_response(fields)
+
+    @staticmethod
+    def _sparse_fields(request: SearchProductRequest) -> tuple[str, ...] | None:
+        """Sorted response fields of request.fields / request.include, None for the full response"""
+        if not request.fields:
+            return None
+        fields = {name.strip() for name in request.fields.split(',') if name.strip()}
+        includes = {name.strip() for name in (request.include or '').split(',') if name.strip()}
+        if fields - SPARSE_FIELDS or includes - SPARSE_INCLUDES:
+            raise ValidationException(_('invalid_field'))
+        fields.add('id')
+        if 'sizes' in includes:
+            fields.add('size')
+        return tuple(sorted(fields))
+
+    @staticmethod
+    async def _refresh_search(request: SearchProductRequest) -> Pagination:
+        """Search with a session of its own, for background cache refreshes outliving the request"""
+        async with AsyncSessionLocal() as db:
+            return await ProductRepo(db)._search_products(request)
+
+    async def _search_products(self, request: SearchProductRequest) -> Pagination:
+        """Search products in the DB"""
         try:
+            fields = self._sparse_fields(request)
+            params = request.model_dump()
+            if fields is not None:
+                # Only the requested columns; sizes come from the products.sizes projection column
+                params['columns'] = [name for name in fields if name != 'size'] + (['sizes'] if 'size' in fields else [])
+
             # Get the paginated products from ProductDAL
-            result = self.product_dal.search_products(request.model_dump())
-            
-            # Fetch sizes for all products in one query
-            product_ids = [product.id for product in result.items]
-            size_map = self.product_dal.get_product_sizes_batch(product_ids)
-            
-            # Create ProductResponse objects
-            product_responses = []
-            for product in result.items:
-                product_response = ProductResponse.model_validate(product)
-                product_response.size = size_map.get(product.id, [])
-                product_responses.append(product_response)
-            
+            result = await self.product_dal.search_products(params)
+
+            if fields is None:
+                product_responses = await self._full_responses(result.items)
+            else:
+                product_responses = await self._sparse_responses(result.items, fields)
+
             # Return updated Pagination
             return Pagination(
                 items=product_responses,
                 total_count=result.total_count,
                 page=result.page,
-                page_size=result.page_size
+                page_size=result.page_size,
+                next_cursor=result.next_cursor,
+                has_more=result.has_more,
+                count_strategy=result.count_strategy
             )
         except Exception as ex:
             logger.exception(f"Error searching products: {ex}")
             raise
 
-    def get_shopping_history(self, user_id: int, page: int = 1, page_size: int = 10) -> Pagination:
-        """Retrieve shopping history for a user with completed orders"""
-        try:
-            query = self.db.query(
-                Product.name,
-                Product.price,
-                Product.main_image_url,
-                Order.quantity,
-                Order.total_price,
-                Order.created_at
-            ).join(
-                Order, Product.id == Order.product_id
-            ).filter(
-                and_(
-                    Order.user_id == user_id,
-                    Order.status == "completed"
-                )
-            )
+    async def _full_responses(self, products: list[Product]) -> list[ProductResponse]:
+        # Sizes come from the products.sizes projection, no join unless it is not built yet
+        size_map = await self._sizes_of(products)
+
+        # Later lookups of these products in the same request are served from memory
+        product_loader = self.loaders.entity(Product)
+        sizes_loader = self.product_dal.sizes_loader()
+        for product in products:
+            product_loader.prime(product.id, product)
+            sizes_loader.prime(product.id, size_map[product.id])
+
+        # Create ProductResponse objects
+        product_responses = []
+        for product in products:
+            product_response = ProductResponse.model_validate(product)
+            product_response.size = size_map[product.id]
+            product_responses.append(product_response)
+        self.product_cache.set_many(product_responses)
+        return product_responses
+
+    async def _sparse_responses(self, products: list[Product], fields: tuple[str, ...]) -> list[ResponseSchema]:
+        # Partially loaded products are neither primed into the loaders nor cached as full responses
+        model = sparse_product_response(fields)
+        size_map = await self._sizes_of(products) if 'size' in fields else {}
+        product_responses = []
+        for product in products:
+            product_response = model.model_validate(product)
+            if 'size' in fields:
+                product_response.size = size_map[product.id]
+            product_responses.append(product_response)
+        return product_responses
 
-            # Count total records
-            total_count = query.count()
+    async def export_products(self, export_format: ExportFormat, updated_since: datetime | None = None) -> AsyncIterator[str]:
+        """The catalog (products changed since `updated_since`) as NDJSON or CSV text, one chunk per batch
 
-            # Apply pagination
-            items = query.offset((page - 1) * page_size).limit(page_size).all()
+        Meant as the body of a StreamingResponse, which is sent after the request
+        session is closed, so it runs on sessions of its own: one holds the
+        server-side cursor (a single snapshot of the catalog), the other reads
+        size_product for the rows whose size projection is not built yet.
+        """
+        async with AsyncSessionLocal() as stream_db, AsyncSessionLocal() as sizes_db:
+            sizes_dal = ProductDAL(sizes_db)
+            if export_format == ExportFormat.CSV:
+                yield self._csv_chunk([list(ProductResponse.model_fields)])
+            async for rows in ProductDAL(stream_db).stream_products(updated_since):
+                unbuilt = [row.id for row in rows if row.sizes is None]
+                size_map = await sizes_dal.get_product_sizes_batch(unbuilt) if unbuilt else {}
+                products = []
+                for row in rows:
+                    product_response = ProductResponse.model_validate(row._mapping)
+                    if row.sizes is None:
+                        product_response.size = size_map.get(row.id, [])
+                    else:
+                        product_response.size = row.sizes.split(SIZE_SEPARATOR) if row.sizes else []
+                    products.append(product_response)
+
+                if export_format == ExportFormat.CSV:
+                    yield self._csv_chunk(
+                        [[SIZE_SEPARATOR.join(value) if name == 'size' else value for name, value in product.model_dump(mode='json').items()]
+                         for product in products]
+                    )
+                else:
+                    yield ''.join(f'{product.model_dump_json()}\n' for product in products)
+
+    @staticmethod
+    def _csv_chunk(rows: list[list]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    async def get_shopping_history(
+        self, user_id: int, page: int = 1, page_size: int = 10, cursor: str | None = None, count_strategy: str | None = None
+    ) -> Pagination:
+        """Retrieve shopping history for a user with completed orders"""
+        try:
+            result = await self.product_dal.get_shopping_history(user_id, page, page_size, cursor, count_strategy)
 
             # Convert query results to dict for response
             history_items = [
@@ -103,39 +313,30 @@ class ProductRepo(BaseRepo):
                     "quantity": item[3],
                     "total_price": float(item[4]),
                     "created_at": item[5]
-                } for item in items
+                } for item in result.items
             ]
 
-            logger.info(f"Found {total_count} completed orders for user {user_id}, returning page {page} with {len(history_items)} items")
+            logger.info(f"Found {result.total_count} completed orders for user {user_id}, returning page {page} with {len(history_items)} items")
 
             return Pagination(
                 items=history_items,
-                total_count=total_count,
+                total_count=result.total_count,
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=result.next_cursor,
+                has_more=result.has_more,
+                count_strategy=result.count_strategy
             )
         except Exception as ex:
             logger.exception(f"Error retrieving shopping history: {ex}")
             raise
 
-    def get_wishlist(self, user_id: int, page: int = 1, page_size: int = 10) -> Pagination:
+    async def get_wishlist(
+        self, user_id: int, page: int = 1, page_size: int = 10, cursor: str | None = None, count_strategy: str | None = None
+    ) -> Pagination:
         """Retrieve wishlist for a user"""
         try:
-            query = self.db.query(
-                Product.name,
-                Product.price,
-                Product.main_image_url
-            ).join(
-                Wishlist, Product.id == Wishlist.product_id
-            ).filter(
-                Wishlist.user_id == user_id
-            )
-
-            # Count total records
-            total_count = query.count()
-
-            # Apply pagination
-            items = query.offset((page - 1) * page_size).limit(page_size).all()
+            result = await self.product_dal.get_wishlist(user_id, page, page_size, cursor, count_strategy)
 
             # Convert query results to dict for response
             wishlist_items = [
@@ -143,16 +344,19 @@ class ProductRepo(BaseRepo):
                     "name": item[0],
                     "price": float(item[1]),
                     "main_image_url": item[2]
-                } for item in items
+                } for item in result.items
             ]
 
-            logger.info(f"Found {total_count} wishlist items for user {user_id}, returning page {page} with {len(wishlist_items)} items")
+            logger.info(f"Found {result.total_count} wishlist items for user {user_id}, returning page {page} with {len(wishlist_items)} items")
 
             return Pagination(
                 items=wishlist_items,
-                total_count=total_count,
+                total_count=result.total_count,
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=result.next_cursor,
+                has_more=result.has_more,
+                count_strategy=result.count_strategy
             )
         except Exception as ex:
             logger.exception(f"Error retrieving wishlist: {ex}")
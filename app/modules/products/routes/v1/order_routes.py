@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from app.core.base_model import APIResponse
+from app.enums.base_enums import BaseErrorCode
+from app.exceptions.handlers import handle_exceptions
+from app.http.oauth2 import get_current_user
+from app.middleware.auth_middleware import verify_token
+from app.middleware.translation_manager import _
+from app.modules.products.repository.order_repo import OrderRepo
+from app.modules.products.schemas.order_request import PlaceOrderRequest
+
+route = APIRouter(prefix='/orders',
+                  tags=['Orders'], dependencies=[Depends(verify_token)])
+
+
+@route.post('/', response_model=APIResponse)
+@handle_exceptions
+async def place_order(
+    request: PlaceOrderRequest,
+    current_user_payload: dict = Depends(get_current_user),
+    repo: OrderRepo = Depends(),
+):
+    """Place an order of one or more products
+
+    Stock is taken atomically for every line; when one product has too little
+    stock nothing is ordered (insufficient_stock).
+    Example body:
+    {"items": [{"product_id": 1, "quantity": 2}, {"product_id": 7, "quantity": 1}]}
+    """
+    user_id = int(current_user_payload.get('user_id'))
+    result = await repo.place_order(user_id, request)
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=result,
+    )
@@ -1,30 +1,57 @@
 import json
-from fastapi import APIRouter, Depends, Query
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.config import get_settings
 from app.core.base_model import APIResponse, PagingInfo
-from app.enums.base_enums import BaseErrorCode
+from app.enums.base_enums import BaseErrorCode, CountStrategy
 from app.exceptions.handlers import handle_exceptions
 from app.middleware.translation_manager import _
 from app.modules.products.repository.product_repo import ProductRepo
-from app.modules.products.schemas.product_request import SearchProductRequest, SortOrder
-from app.modules.products.schemas.product_response import ProductResponse, ShoppingHistoryResponse, ShoppingHistoryItem, WishlistResponse, WishlistItem
+from app.modules.products.schemas.product_request import ExportFormat, LeaderboardMetric, LeaderboardWindow, SearchProductRequest, SortOrder
+from app.utils.http_cache import CacheValidators
+from app.modules.products.schemas.product_response import ProductResponse, ProductSearchResponse, ShoppingHistoryResponse, ShoppingHistoryItem, WishlistResponse, WishlistItem
 from app.core.base_model import APIResponse, PaginatedResponse
 
 route = APIRouter(prefix='/products',
                   tags=['Products'])
 
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv; charset=utf-8',
+}
+
 
 @route.get('/', response_model=APIResponse)
 @handle_exceptions
 async def search_products(
+    http_request: Request,
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1),
-    item_type: int | None = Query(None, description='Filter by type'),
+    page_size: int = Query(10, ge=1, le=get_settings().MAX_PAGE_SIZE,
+                           description='Items per page, whole-catalog reads use GET /products/export'),
+    q: str | None = Query(
+        None, max_length=200, description='Keywords in name or description, accents optional ("ao thun" matches "áo thun")'),
+    item_type: str | None = Query(
+        None, pattern=r'^\d+(,\d+)*$', description='Filter by type, comma separated for any of several (e.g., 1,4)'),
     size_type: str | None = Query(
-        None, description='Filter by size (e.g., S, M, L)'),
+        None, description='Filter by size, comma separated for any of several (e.g., S,M,L)'),
+    price_min: float | None = Query(None, ge=0, description='Minimum price (inclusive)'),
+    price_max: float | None = Query(None, ge=0, description='Maximum price (inclusive)'),
+    in_stock: bool | None = Query(None, description='true: only products in stock'),
     sort_by: str | None = Query(
-        None, description='Field to sort by (e.g., price, name)'),
+        None, description='Field to sort by (e.g., price, name, popularity: best sellers and most wished first with sort_order=desc)'),
     sort_order: SortOrder = Query(
         SortOrder.ASC, description='Sort order: asc or desc'),
+    cursor: str | None = Query(
+        None, description='paging.next_cursor of the previous page (keyset pagination, page is ignored)'),
+    count_strategy: CountStrategy | None = Query(
+        None, description='Total count: exact, cached (approximate) or none (only has_more)'),
+    facets: str | None = Query(
+        None, description='Comma separated facet counts to return with the page: category, size, price'),
+    fields: str | None = Query(
+        None, description='Sparse fieldset: comma separated product fields to return (e.g., name,price,main_image_url), id is always included'),
+    include: str | None = Query(
+        None, description='With fields: sizes adds the size list'),
     repo: ProductRepo = Depends(),
 ):
     """Get all products with pagination, filtering, and sorting
@@ -32,41 +59,165 @@ async def search_products(
     Supports filtering by item_type and size_type via query parameters.
     Example:
     GET /products/?page=1&page_size=10&item_type=10&sort_by=price&sort_order=desc&size_type=S
+    GET /products/?item_type=1,4&size_type=S,M,L&price_min=10&price_max=50&in_stock=true
+
+    `q` searches name and description; without sort_by the best matches come first.
+
+    `facets=category,size,price` adds data.facets: how many products match the
+    current filters per category, size and price range (each facet ignores its
+    own filter), so filter chips need no extra requests.
+
+    `fields=name,price,main_image_url&include=sizes` returns only those fields
+    (plus id); only the matching columns are read from the database.
+
+    For deep pages pass the returned paging.next_cursor as `cursor` with the same
+    filters and sorting instead of increasing `page`.
     """
     request = SearchProductRequest(
         page=page,
         page_size=page_size,
+        q=q,
         item_type=item_type,
         size_type=size_type,
+        price_min=price_min,
+        price_max=price_max,
+        in_stock=in_stock,
         sort_by=sort_by,
-        sort_order=sort_order
+        sort_order=sort_order,
+        cursor=cursor,
+        facets=facets,
+        fields=fields,
+        include=include,
+        count_strategy=count_strategy
     )
-    result = repo.search_products(request)
+    # Responses are cached per language (set from the `lang` header by LocalizationMiddleware)
+    result = await repo.search_products(request, lang=getattr(http_request.state, 'lang', None))
+    facet_counts = await repo.get_search_facets(request) if facets else None
     return APIResponse(
         error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
         message=_('operation_successful'),
-        data=PaginatedResponse[ProductResponse](
+        data=ProductSearchResponse[repo.response_model(request)](
             items=result.items,
+            facets=facet_counts,
             paging=PagingInfo(
                 total=result.total_count,
                 total_pages=result.total_pages,
                 page=result.page,
                 page_size=result.page_size,
+                next_cursor=result.next_cursor,
+                has_more=result.has_more,
+                count_strategy=result.count_strategy,
             ),
         ),
     )
 
 
+@route.get('/export')
+@handle_exceptions
+async def export_products(
+    export_format: ExportFormat = Query(
+        ExportFormat.NDJSON, alias='format', description='ndjson (one product JSON object per line) or csv'),
+    updated_since: datetime | None = Query(
+        None, description='Only products created or changed at or after this time (server time, e.g. 2024-09-01T15:00:00)'),
+    repo: ProductRepo = Depends(),
+):
+    """Stream the whole catalog for partner feeds
+
+    Products come in (update_date, id) order with the same fields as
+    GET /products/{product_id}, read through a server-side cursor so memory use
+    does not grow with the catalog. For incremental pulls pass the largest
+    update_date of the previous export as `updated_since`.
+    Example:
+    GET /products/export?format=csv&updated_since=2024-09-01T00:00:00
+    """
+    return StreamingResponse(
+        repo.export_products(export_format, updated_since),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="products.{export_format.value}"'},
+    )
+
+
+@route.get('/batch', response_model=APIResponse)
+@handle_exceptions
+async def get_products_batch(
+    ids: str = Query(
+        ..., pattern=r'^\d+(,\d+)*$',
+        description=f'Comma separated product ids, at most {get_settings().MAX_PAGE_SIZE} (e.g., 3,1,7)'),
+    repo: ProductRepo = Depends(),
+):
+    """Get several products by id in one request (cart, wishlist, recently viewed)
+
+    Products come in the requested order with the same fields as
+    GET /products/{product_id}; ids without a product are listed in
+    data.missing_ids instead of failing the request.
+    Example:
+    GET /products/batch?ids=3,1,7
+    """
+    result = await repo.get_products_batch([int(product_id) for product_id in ids.split(',')])
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=result,
+    )
+
+
+@route.get('/top', response_model=APIResponse)
+@handle_exceptions
+async def get_top_products(
+    metric: LeaderboardMetric = Query(
+        LeaderboardMetric.POPULARITY, description='sales (units sold), wishes (wishlist adds) or popularity (both combined)'),
+    window: LeaderboardWindow = Query(LeaderboardWindow.WEEK, description='Rolling window: 1d, 7d or 30d'),
+    category_id: int | None = Query(None, ge=1, description='Leaderboard of one category instead of the whole catalog'),
+    limit: int = Query(10, ge=1, le=get_settings().MAX_PAGE_SIZE),
+    repo: ProductRepo = Depends(),
+):
+    """Best sellers / most wishlisted products over a rolling window
+
+    Served from Redis leaderboards kept up to date as orders complete and
+    products are wishlisted, without querying the orders.
+    Example:
+    GET /products/top?metric=sales&window=30d&category_id=3&limit=20
+    """
+    result = await repo.get_top_products(metric, window, category_id, limit)
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=result,
+    )
+
+
 @route.get('/{product_id}', response_model=APIResponse)
 @handle_exceptions
 async def get_product_by_id(
     product_id: int,
+    http_request: Request,
+    response: Response,
     repo: ProductRepo = Depends(),
 ):
-    """Get a product by its ID"""
-    product_response = repo.get_product_by_id(product_id)
+    """Get a product by its ID
+
+    Conditional: answers 304 Not Modified, without building the product, when
+    If-None-Match holds its ETag (or If-Modified-Since is not older than it).
+    Only conditional requests read the version from the database; the ETag of
+    a full response comes from the product served.
+    """
+    if CacheValidators.is_conditional(http_request):
+        version = await repo.get_product_version(product_id)
+        if version is not None:
+            validators = _product_validators(http_request, product_id, version)
+            if validators.is_fresh(http_request):
+                return validators.not_modified()
+    product_response = await repo.get_product_by_id(product_id)
+    if product_response.update_date is not None:
+        _product_validators(http_request, product_id, product_response.update_date).apply(response)
     return APIResponse(
         error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
         message=_('operation_successful'),
         data=product_response,
     )
+
+
+def _product_validators(http_request: Request, product_id: int, version: datetime) -> CacheValidators:
+    # The language is part of the version: the message of the envelope is translated
+    lang = getattr(http_request.state, 'lang', None)
+    return CacheValidators.for_version('product', product_id, version.isoformat(), lang, last_modified=version)
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator, model_validator
+from app.core.base_model import ResponseSchema
+from app.modules.products.models.sizes import SIZE_SEPARATOR
+
+
+class CatalogImportRow(BaseModel):
+    """One product of a catalog import file (CSV columns / NDJSON keys)
+
+    The column names of GET /products/export are accepted, so an export can be
+    edited and imported back. Unknown columns (id, dates) are ignored.
+    """
+    model_config = ConfigDict(str_strip_whitespace=True, extra='ignore')
+
+    sku: str = Field(..., min_length=1, max_length=64)
+    name: str = Field(..., min_length=3, max_length=100)
+    description: Optional[str] = None
+    brand_id: int = Field(..., ge=1)
+    price: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2)
+    stock: int = Field(default=0, ge=0)
+    category: Optional[str] = Field(default=None, max_length=100)  # category name, created when missing
+    category_id: Optional[int] = Field(default=None, ge=1)  # instead of category
+    main_image_url: Optional[str] = Field(default=None, max_length=255)
+    collab_status: int = 0
+    # Size names ("S,M,L" in CSV), created when missing; absent or empty: sizes are left unchanged
+    sizes: Optional[list[str]] = Field(default=None, validation_alias=AliasChoices('sizes', 'size'))
+
+    @model_validator(mode='before')
+    @classmethod
+    def empty_to_none(cls, data):
+        """CSV has no NULL: empty cells are missing values"""
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value != '' and value is not None}
+        return data
+
+    @field_validator('sizes', mode='before')
+    @classmethod
+    def split_sizes(cls, value):
+        if isinstance(value, str):
+            value = value.split(SIZE_SEPARATOR)
+        if not isinstance(value, (list, tuple)):
+            return value
+        # Listed once each, in file order; sizes are matched case-insensitively, so "S,s" is one size
+        # (first spelling kept). The size projection is ordered by sizes.sort_order anyway
+        names = {}
+        for item in value:
+            name = str(item).strip()
+            if name:
+                names.setdefault(name.casefold(), name)
+        return list(names.values())
+
+    @field_validator('sizes')
+    @classmethod
+    def validate_sizes(cls, value):
+        if value and any(len(size_name) > 50 for size_name in value):
+            raise ValueError('Size name must be at most 50 characters long')
+        if value and any(SIZE_SEPARATOR in size_name for size_name in value):
+            raise ValueError(f'Size name cannot contain "{SIZE_SEPARATOR}"')
+        return value
+
+    @model_validator(mode='after')
+    def require_category(self):
+        if self.category is None and self.category_id is None:
+            raise ValueError('category or category_id is required')
+        return self
+
+
+class CatalogImportJobResponse(ResponseSchema):
+    """Progress of a catalog import job"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description='Job ID', examples=[1])
+    file_name: str | None = Field(default=None, description='Uploaded file name', examples=['supplier-week-36.csv'])
+    file_format: str = Field(..., description='csv or ndjson', examples=['csv'])
+    status: str = Field(..., description='pending, running, completed or failed', examples=['running'])
+    task_id: str | None = Field(default=None, description='Celery task ID')
+    processed_rows: int = Field(default=0, description='Rows read so far (committed chunks)', examples=[40000])
+    imported_rows: int = Field(default=0, description='Products created or updated', examples=[39990])
+    error_count: int = Field(default=0, description='Rows rejected', examples=[10])
+    errors: list[dict] = Field(
+        default=[], description='First rejected rows: row number (1 = first data row), sku and reason',
+        examples=[[{'row': 12, 'sku': 'TS-RED-001', 'error': 'price: Input should be greater than 0'}]])
+    message: str | None = Field(default=None, description='Why the job failed')
+    create_date: datetime | None = Field(default=None, description='Upload time')
+    update_date: datetime | None = Field(default=None, description='Last progress update')
+    finished_at: datetime | None = Field(default=None, description='Completion time')
+
+    @field_validator('errors', mode='before')
+    @classmethod
+    def parse_errors(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value or []
@@ -0,0 +1,21 @@
+from pydantic import Field
+from app.core.base_model import RequestSchema
+
+
+class OrderLineRequest(RequestSchema):
+    """One product of an order"""
+
+    product_id: int = Field(..., ge=1, description='Product ID', examples=[1])
+    quantity: int = Field(..., ge=1, le=1000, description='Quantity to order', examples=[2])
+
+
+class PlaceOrderRequest(RequestSchema):
+    """Request schema for placing an order of one or more products"""
+
+    items: list[OrderLineRequest] = Field(..., min_length=1, max_length=50, description='Order lines')
+
+
+class CompleteOrdersRequest(RequestSchema):
+    """Request schema for marking orders completed"""
+
+    order_ids: list[int] = Field(..., min_length=1, max_length=500, description='Order IDs', examples=[[12, 13]])
@@ -0,0 +1,27 @@
+from pydantic import ConfigDict, Field
+from app.core.base_model import ResponseSchema
+
+
+class OrderLineResponse(ResponseSchema):
+    """Response schema for one order line (an orders row)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description='Order ID', examples=[1])
+    product_id: int = Field(..., description='Product ID', examples=[1])
+    quantity: int = Field(..., description='Ordered quantity', examples=[2])
+    total_price: float = Field(..., description='Price of the line at order time', examples=[59.98])
+    status: str = Field(..., description='Order status', examples=['pending'])
+
+
+class PlaceOrderResponse(ResponseSchema):
+    """Response schema for a placed order"""
+
+    items: list[OrderLineResponse] = Field(default=[], description='Created orders, one per product')
+    total_price: float = Field(..., description='Sum of the line prices', examples=[59.98])
+
+
+class CompleteOrdersResponse(ResponseSchema):
+    """Response schema for completed orders"""
+
+    completed_ids: list[int] = Field(default=[], description='Orders marked completed by this request', examples=[[12]])
+    skipped_ids: list[int] = Field(default=[], description='Orders already completed or unknown', examples=[[13]])
@@ -1,19 +1,60 @@
 from typing import Optional
-from pydantic import ConfigDict
+from pydantic import ConfigDict, field_validator
 from app.core.base_model import RequestSchema
+from app.enums.base_enums import CountStrategy
 from enum import Enum
 
 class SortOrder(str, Enum):
     ASC = "asc"
     DESC = "desc"
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class LeaderboardMetric(str, Enum):
+    SALES = "sales"  # units of completed orders
+    WISHES = "wishes"  # wishlist adds
+    POPULARITY = "popularity"  # units + LEADERBOARD_WISH_WEIGHT x wishlist adds
+
+class LeaderboardWindow(str, Enum):
+    DAY = "1d"
+    WEEK = "7d"
+    MONTH = "30d"
+
+    @property
+    def days(self) -> int:
+        return int(self.value[:-1])
+
 class SearchProductRequest(RequestSchema):
     """Request schema for searching products with pagination, filters, and sorting"""
     model_config = ConfigDict(from_attributes=True)
 
     page: int = 1
     page_size: int = 10
-    item_type: Optional[int] = None
-    size_type: Optional[str] = None  # New field for size filter
+    item_type: Optional[list[int]] = None  # category ids, any of them ("1,4" is accepted)
+    size_type: Optional[list[str]] = None  # size names, products having any of them ("S,M,L" is accepted)
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    in_stock: Optional[bool] = None  # true: stock > 0 only
+    q: Optional[str] = None  # keywords matched against name and description, accents optional
     sort_by: Optional[str] = None
-    sort_order: Optional[SortOrder] = SortOrder.ASC
\ No newline at end of file
+    sort_order: Optional[SortOrder] = SortOrder.ASC
+    cursor: Optional[str] = None  # paging.next_cursor of the previous page, replaces page
+    facets: Optional[str] = None  # comma separated: category, size, price
+    fields: Optional[str] = None  # comma separated ProductResponse fields (sparse fieldset), id is always included
+    include: Optional[str] = None  # with fields: "sizes" adds the size list
+    count_strategy: Optional[CountStrategy] = None  # exact | cached | none, default DB_COUNT_STRATEGY
+
+    @field_validator('item_type', 'size_type', mode='before')
+    @classmethod
+    def split_values(cls, value):
+        """Accept a single value or a comma separated string, empty means no filter"""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = [item.strip() for item in value.split(',') if item.strip()]
+        elif not isinstance(value, (list, tuple, set)):
+            value = [value]
+        # Sorted and deduplicated so equivalent filters share cache keys
+        return sorted(set(value), key=str) or None
@@ -1,6 +1,8 @@
-from typing import List
-from pydantic import ConfigDict
+from functools import lru_cache
+from typing import Generic, List, TypeVar
+from pydantic import ConfigDict, create_model
 from app.core.base_model import ResponseSchema, APIResponse, PaginatedResponse
+from app.modules.products.schemas.product_request import LeaderboardMetric, LeaderboardWindow
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field, field_validator
@@ -15,6 +17,11 @@ class ProductResponse(ResponseSchema):
         description='Product ID',
         examples=[1, 123, 4567],
     )
+    sku: str | None = Field(
+        default=None,
+        description='Supplier SKU (key of catalog imports)',
+        examples=['TS-RED-001', None],
+    )
     name: str = Field(
         ...,
         description='Product name',
@@ -66,6 +73,16 @@ class ProductResponse(ResponseSchema):
         default=None, description='Update date', examples=['2024-09-01 15:00:00'])
 
 
+@lru_cache(maxsize=256)
+def sparse_product_response(fields: tuple[str, ...]) -> type[ResponseSchema]:
+    """ProductResponse trimmed to `fields` (sorted names of ProductResponse fields)
+
+    Serializes only those keys, which is how `fields=` shrinks list payloads.
+    """
+    definitions = {name: (ProductResponse.model_fields[name].annotation, ProductResponse.model_fields[name]) for name in fields}
+    return create_model(f'ProductResponse[{",".join(fields)}]', __base__=ResponseSchema, **definitions)
+
+
 class ShoppingHistoryItem(ResponseSchema):
     """Response schema for a single shopping history item"""
     model_config = ConfigDict(from_attributes=True)
@@ -123,6 +140,60 @@ class WishlistItem(ResponseSchema):
     )
 
 
+class FacetValue(BaseModel):
+    """Number of products matching the other filters plus this value"""
+
+    value: str = Field(..., description='Category id, size name or price range', examples=['3', 'M', '50-100'])
+    count: int = Field(..., description='Matching products', examples=[42])
+    min: float | None = Field(default=None, description='Price range start (inclusive), price facet only', examples=[50.0])
+    max: float | None = Field(default=None, description='Price range end (exclusive), price facet only', examples=[100.0, None])
+
+
+class ProductFacets(BaseModel):
+    """Facet counts of a product search, only the requested facets are set
+
+    Each facet ignores its own filter: category counts are computed without
+    item_type, size counts without size_type.
+    """
+
+    category: List[FacetValue] | None = Field(default=None, description='By category, most products first')
+    size: List[FacetValue] | None = Field(default=None, description='By size, in size order')
+    price: List[FacetValue] | None = Field(default=None, description='By price range, cheapest first')
+
+
+ItemT = TypeVar('ItemT')
+
+
+class ProductSearchResponse(PaginatedResponse[ItemT], Generic[ItemT]):
+    """Page of products (full or sparse, see sparse_product_response) with the requested facet counts"""
+
+    facets: ProductFacets | None = None
+
+
+class ProductBatchResponse(ResponseSchema):
+    """Products looked up by id in one request"""
+
+    items: list[ProductResponse] = Field(default=[], description='Found products, in the requested order')
+    missing_ids: list[int] = Field(default=[], description='Requested ids with no product', examples=[[42]])
+
+
+class TopProductItem(ResponseSchema):
+    """A product of a leaderboard"""
+
+    rank: int = Field(..., description='Position, 1 is the leader', examples=[1, 2])
+    score: float = Field(..., description='Units sold, wishlist adds or popularity in the window', examples=[42.0, 12.5])
+    product: ProductResponse = Field(..., description='The product')
+
+
+class TopProductsResponse(ResponseSchema):
+    """Leaderboard of a metric over a rolling window, globally or in one category"""
+
+    metric: LeaderboardMetric = Field(..., description='sales, wishes or popularity', examples=['sales'])
+    window: LeaderboardWindow = Field(..., description='Rolling window', examples=['7d'])
+    category_id: int | None = Field(default=None, description='Category, none for the whole catalog', examples=[1, None])
+    items: list[TopProductItem] = Field(default=[], description='Highest score first')
+
+
 class ShoppingHistoryResponse(APIResponse):
     """Response schema for shopping history"""
     data: PaginatedResponse[ShoppingHistoryItem]
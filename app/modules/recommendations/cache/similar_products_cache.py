@@ -0,0 +1,68 @@
+import logging
+from app.core.config import get_settings
+from app.utils.redis_client import redis_client
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'recommendations:similar'
+# Build id of the neighbor lists being served; every build writes a new hash and then moves this pointer
+CURRENT_BUILD_KEY = f'{KEY_PREFIX}:current'
+# Fingerprint of the interactions of the current build, a scheduled rebuild is skipped when unchanged
+SOURCE_KEY = f'{KEY_PREFIX}:source'
+
+
+def build_key(build_id: str) -> str:
+    """Hash of one build: field product id, value its encoded neighbor list"""
+    return f'{KEY_PREFIX}:{build_id}'
+
+
+def encode_neighbors(product_ids, scores) -> str:
+    """'12:0.8123,55:0.5002' - most similar first"""
+    return ','.join(f'{product_id}:{score:.4f}' for product_id, score in zip(product_ids, scores))
+
+
+def decode_neighbors(value: str | None) -> list[tuple[int, float]]:
+    if not value:
+        return []
+    neighbors = []
+    for item in value.split(','):
+        product_id, score = item.split(':')
+        neighbors.append((int(product_id), float(score)))
+    return neighbors
+
+
+class SimilarProductsCache:
+    """Neighbor lists of products (customers also bought/wished), read from Redis
+
+    The Celery job recommendations.build_similar_products stores them; every
+    worker keeps the lists it served in an LRU + TTL cache, so a popular
+    product costs no Redis round trip for RECOMMENDATIONS_CACHE_TTL seconds
+    (the lag after a rebuild). Products without neighbors are cached too.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            settings = get_settings()
+            cls._instance = super(SimilarProductsCache, cls).__new__(cls)
+            cls._instance._cache = TTLCache(maxsize=settings.RECOMMENDATIONS_CACHE_SIZE, ttl=settings.RECOMMENDATIONS_CACHE_TTL)
+        return cls._instance
+
+    async def get(self, product_id: int) -> list[tuple[int, float]]:
+        """(product id, cosine similarity) of the neighbors of a product, most similar first"""
+        neighbors = self._cache.get(product_id)
+        if neighbors is not None:
+            return neighbors
+        build_id = (await redis_client.get_raw_many([CURRENT_BUILD_KEY]) or [None])[0]
+        if build_id is None:
+            # Never built, or Redis is down: nothing to recommend, not cached
+            return []
+        neighbors = decode_neighbors(await redis_client.hget_raw(build_key(build_id), str(product_id)))
+        self._cache.set(product_id, neighbors)
+        return neighbors
+
+    def stats(self) -> dict:
+        """Hit/miss counters and size"""
+        return self._cache.stats()
@@ -0,0 +1,41 @@
+import logging
+from typing import Iterator
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.base_dal import BaseDAL
+from app.modules.products.models.orders import Order
+from app.modules.products.models.wishlists import Wishlist
+
+logger = logging.getLogger(__name__)
+
+# Orders that count as a purchase (as in the shopping history)
+PURCHASED_STATUS = 'completed'
+
+
+class InteractionDAL(BaseDAL[Order]):
+    """User x product interactions of the recommendation job (sync session, Celery)
+
+    Read as streams of (user_id, product_id) partitions, the tables are never
+    loaded as ORM objects.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(db, Order)
+
+    def stream_purchases(self, batch_size: int) -> Iterator[list]:
+        """(user_id, product_id) of completed orders, each pair once"""
+        query = select(Order.user_id, Order.product_id).where(Order.status == PURCHASED_STATUS).distinct()
+        yield from self.db.execute(query.execution_options(yield_per=batch_size)).partitions()
+
+    def stream_wishes(self, batch_size: int) -> Iterator[list]:
+        """(user_id, product_id) of wishlist rows (unique per pair)"""
+        query = select(Wishlist.user_id, Wishlist.product_id)
+        yield from self.db.execute(query.execution_options(yield_per=batch_size)).partitions()
+
+    def get_fingerprint(self) -> str:
+        """Changes with every completed order, status change and wishlist row added or removed"""
+        purchases = self.db.execute(
+            select(func.count(Order.id), func.max(Order.id)).where(Order.status == PURCHASED_STATUS)
+        ).one()
+        wishes = self.db.execute(select(func.count(Wishlist.id), func.max(Wishlist.id))).one()
+        return f'{purchases[0]}:{purchases[1]}:{wishes[0]}:{wishes[1]}'
@@ -0,0 +1,39 @@
+import logging
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.base_repo import BaseRepo
+from app.core.database import get_async_db
+from app.exceptions.exception import NotFoundException
+from app.middleware.translation_manager import _
+from app.modules.products.repository.product_repo import ProductRepo
+from app.modules.recommendations.cache.similar_products_cache import SimilarProductsCache
+from app.modules.recommendations.schemas.recommendation_response import SimilarProductItem, SimilarProductsResponse
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationRepo(BaseRepo):
+    """Product recommendations, API side (lists built by SimilarProductsBuilder)"""
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        self.db = db
+        self.product_repo = ProductRepo(db)
+        self.similar_cache = SimilarProductsCache()
+
+    async def get_similar_products(self, product_id: int, limit: int) -> SimilarProductsResponse:
+        """Products customers also bought/wished, most similar first
+
+        Neighbor lists come from SimilarProductsCache and the products from
+        ProductCache, one batched query for the misses. Products deleted since
+        the last build are skipped.
+        """
+        neighbors = (await self.similar_cache.get(product_id))[:limit]
+        products = await self.product_repo.get_products_by_ids([product_id] + [neighbor_id for neighbor_id, _score in neighbors])
+        if product_id not in products:
+            raise NotFoundException(_('product_not_found'))
+        items = [
+            SimilarProductItem(score=score, product=products[neighbor_id])
+            for neighbor_id, score in neighbors if neighbor_id in products
+        ]
+        logger.info(f"Returning {len(items)} similar products of product {product_id}")
+        return SimilarProductsResponse(product_id=product_id, items=items)
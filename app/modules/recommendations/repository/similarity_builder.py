@@ -0,0 +1,171 @@
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Iterable, Iterator
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.modules.recommendations.cache.similar_products_cache import (
+    CURRENT_BUILD_KEY, SOURCE_KEY, build_key, encode_neighbors,
+)
+from app.modules.recommendations.dal.interaction_dal import InteractionDAL
+from app.utils.redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# Weight of a completed order; a user who also wished the product counts as having bought it
+PURCHASE_WEIGHT = 1.0
+# Rows read per round trip, fields written per HSET
+READ_BATCH_SIZE = 50000
+WRITE_BATCH_SIZE = 1000
+
+
+def build_interaction_matrix(user_ids: np.ndarray, product_ids: np.ndarray, weights: np.ndarray,
+                             max_items_per_user: int | None = None) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """(users x products matrix, product id of every column)
+
+    Weights of the same (user, product) add up, capped at PURCHASE_WEIGHT.
+    Users with more than max_items_per_user products are dropped: each user
+    adds n^2 product pairs, a few bots would cost more than every customer.
+    """
+    users, user_index = np.unique(user_ids, return_inverse=True)
+    item_ids, item_index = np.unique(product_ids, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (weights.astype(np.float32), (user_index, item_index)), shape=(len(users), len(item_ids)), dtype=np.float32
+    )
+    matrix.sum_duplicates()
+    np.minimum(matrix.data, PURCHASE_WEIGHT, out=matrix.data)
+    if max_items_per_user:
+        keep = np.diff(matrix.indptr) <= max_items_per_user
+        if not keep.all():
+            logger.info(f"Leaving out {int((~keep).sum())} users with more than {max_items_per_user} products")
+            matrix = matrix[keep]
+    return matrix, item_ids
+
+
+def top_k_neighbors(matrix: sparse.csr_matrix, top_k: int, block_size: int) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """(column, neighbor columns, cosine similarities) of every column with neighbors, most similar first
+
+    Item-item cosine similarity is X^T X of the column-normalized matrix. It is
+    computed block_size columns at a time, so memory holds one items x block
+    slice of the similarity matrix instead of the whole items x items one.
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0).astype(np.float32)
+    normalized = matrix @ sparse.diags(inverse_norms)
+    item_rows = normalized.T.tocsr()
+    columns = normalized.tocsc()
+
+    for start in range(0, matrix.shape[1], block_size):
+        block = (item_rows @ columns[:, start:start + block_size]).tocsc()
+        for offset in range(block.shape[1]):
+            column = start + offset
+            begin, end = block.indptr[offset], block.indptr[offset + 1]
+            neighbors, scores = block.indices[begin:end], block.data[begin:end]
+            others = neighbors != column
+            neighbors, scores = neighbors[others], scores[others]
+            if not len(neighbors):
+                continue
+            if len(neighbors) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+                neighbors, scores = neighbors[best], scores[best]
+            # Ties by column (product id order), so rebuilds of the same data are identical
+            order = np.lexsort((neighbors, -scores))
+            yield column, neighbors[order], scores[order]
+
+
+class SimilarProductsBuilder:
+    """Builds the "customers also bought/wished" neighbor lists (Celery task, sync session)
+
+    Completed orders and wishlist rows become one sparse users x products
+    matrix (NumPy/SciPy), its item-item cosine similarities give the
+    RECOMMENDATIONS_TOP_K nearest products of each product. They are written
+    to a new Redis hash and the CURRENT_BUILD_KEY pointer is moved to it, so
+    readers switch from one complete build to the next. A scheduled run is
+    skipped when the interactions did not change since the current build.
+    """
+
+    def __init__(self, db: Session):
+        self.dal = InteractionDAL(db)
+        self.settings = get_settings()
+        self.redis = get_sync_redis()
+
+    def run(self, force: bool = False) -> dict:
+        fingerprint = self.dal.get_fingerprint()
+        current_build = self.redis.get(CURRENT_BUILD_KEY)
+        if not force and current_build and self.redis.get(SOURCE_KEY) == fingerprint:
+            logger.info(f"Similar products unchanged since build {current_build}, skipping")
+            return {'build_id': current_build, 'skipped': True}
+
+        started = time.perf_counter()
+        user_ids, product_ids, weights = self._load_interactions()
+        matrix, item_ids = build_interaction_matrix(user_ids, product_ids, weights, self.settings.RECOMMENDATIONS_MAX_ITEMS_PER_USER)
+        loaded = time.perf_counter()
+        logger.info(f"Loaded {len(weights)} interactions: {matrix.shape[0]} users x {matrix.shape[1]} products, {matrix.nnz} cells")
+
+        build_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        neighbors = (
+            (int(item_ids[column]), encode_neighbors(item_ids[columns].tolist(), scores.tolist()))
+            for column, columns, scores in top_k_neighbors(matrix, self.settings.RECOMMENDATIONS_TOP_K, self.settings.RECOMMENDATIONS_BLOCK_SIZE)
+        )
+        product_count = self._write(build_key(build_id), neighbors)
+
+        with self.redis.pipeline() as pipe:
+            pipe.persist(build_key(build_id))
+            pipe.set(CURRENT_BUILD_KEY, build_id)
+            pipe.set(SOURCE_KEY, fingerprint)
+            if current_build:
+                # Workers may still read it until their cached lists expire
+                pipe.expire(build_key(current_build), self.settings.RECOMMENDATIONS_CACHE_TTL * 2)
+            pipe.execute()
+
+        result = {
+            'build_id': build_id,
+            'skipped': False,
+            'interactions': int(len(weights)),
+            'users': int(matrix.shape[0]),
+            'products': product_count,
+            'load_seconds': round(loaded - started, 2),
+            'similarity_seconds': round(time.perf_counter() - loaded, 2),
+        }
+        logger.info(f"Similar products built: {result}")
+        return result
+
+    def _load_interactions(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(user ids, product ids, weights) of completed orders and wishlist rows"""
+        purchases = self._pairs(self.dal.stream_purchases(READ_BATCH_SIZE))
+        wishes = self._pairs(self.dal.stream_wishes(READ_BATCH_SIZE))
+        weights = np.concatenate([
+            np.full(len(purchases), PURCHASE_WEIGHT, dtype=np.float32),
+            np.full(len(wishes), self.settings.RECOMMENDATIONS_WISHLIST_WEIGHT, dtype=np.float32),
+        ])
+        pairs = np.concatenate([purchases, wishes])
+        return pairs[:, 0], pairs[:, 1], weights
+
+    @staticmethod
+    def _pairs(partitions: Iterable[list]) -> np.ndarray:
+        arrays = [np.array(partition, dtype=np.int64).reshape(-1, 2) for partition in partitions]
+        return np.concatenate(arrays) if arrays else np.empty((0, 2), dtype=np.int64)
+
+    def _write(self, key: str, neighbors: Iterable[tuple[int, str]]) -> int:
+        """HSET the encoded lists in batches, returns the number of products"""
+        count = 0
+        batch = {}
+        for product_id, value in neighbors:
+            batch[product_id] = value
+            if len(batch) >= WRITE_BATCH_SIZE:
+                count += self._write_batch(key, batch)
+                batch = {}
+        if batch:
+            count += self._write_batch(key, batch)
+        return count
+
+    def _write_batch(self, key: str, batch: dict) -> int:
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=batch)
+            # An unfinished build (worker killed) is never pointed at, let it expire
+            pipe.expire(key, self.settings.RECOMMENDATIONS_REBUILD_SECONDS * 2)
+            pipe.execute()
+        return len(batch)
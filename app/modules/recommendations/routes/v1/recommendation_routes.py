@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from app.core.base_model import APIResponse
+from app.core.config import get_settings
+from app.enums.base_enums import BaseErrorCode
+from app.exceptions.handlers import handle_exceptions
+from app.middleware.translation_manager import _
+from app.modules.recommendations.repository.recommendation_repo import RecommendationRepo
+
+route = APIRouter(prefix='/products', tags=['Recommendations'])
+
+
+@route.get('/{product_id}/similar', response_model=APIResponse)
+@handle_exceptions
+async def get_similar_products(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=get_settings().RECOMMENDATIONS_TOP_K, description='Number of products'),
+    repo: RecommendationRepo = Depends(),
+):
+    """Customers who bought or wished this product also bought/wished
+
+    Item-item collaborative filtering over completed orders and wishlists,
+    rebuilt periodically by the recommendations.build_similar_products task.
+    """
+    similar_products = await repo.get_similar_products(product_id, limit)
+    return APIResponse(
+        error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
+        message=_('operation_successful'),
+        data=similar_products,
+    )
@@ -0,0 +1,17 @@
+from pydantic import Field
+from app.core.base_model import ResponseSchema
+from app.modules.products.schemas.product_response import ProductResponse
+
+
+class SimilarProductItem(ResponseSchema):
+    """A product bought or wished by the customers of another one"""
+
+    score: float = Field(..., description='Cosine similarity of the two products, 0-1', examples=[0.4213])
+    product: ProductResponse = Field(..., description='The similar product')
+
+
+class SimilarProductsResponse(ResponseSchema):
+    """Products most often bought or wished together with a product"""
+
+    product_id: int = Field(..., description='Product ID', examples=[1])
+    items: list[SimilarProductItem] = Field(default=[], description='Most similar first, empty until customers interacted with the product')
@@ -46,11 +46,11 @@ class OAuthService:
 			is_new_user = False
 
 			# Look for existing user by Google ID
-			user = self.user_dal.get_user_by_google_id(user_info.sub)
+			user = await self.user_dal.get_user_by_google_id(user_info.sub)
 
 			# If no user found by Google ID, try email
 			if not user:
-				user = self.user_dal.get_user_by_email(user_info.email)
+				user = await self.user_dal.get_user_by_email(user_info.email)
 				if user:
 					# Link existing account to Google
 					update_data = {
@@ -62,7 +62,7 @@ class OAuthService:
 						'locale': user_info.locale,
 						'update_date': datetime.now(timezone('Asia/Ho_Chi_Minh')),
 					}
-					user = self.user_dal.update(user.id, update_data)
+					user = await self.user_dal.update(user.id, update_data)
 				else:
 					# Create a new user
 					username = user_info.email.split('@')[0]
@@ -84,9 +84,9 @@ class OAuthService:
 					}
 
 					# Create new user in the database
-					with self.user_dal.transaction():
-						user = self.user_dal.create(new_user)
-						self.db.flush()  # Ensure the user ID is generated
+					async with self.user_dal.transaction():
+						user = await self.user_dal.create(new_user)
+						await self.db.flush()  # Ensure the user ID is generated
 
 					is_new_user = True
 			else:
@@ -95,11 +95,11 @@ class OAuthService:
 					'profile_picture': user_info.picture,
 					'update_date': datetime.now(timezone('Asia/Ho_Chi_Minh')),
 				}
-				user = self.user_dal.update(user.id, update_data)
+				user = await self.user_dal.update(user.id, update_data)
 
 			# Update last login timestamp
 			user.last_login_at = datetime.now(timezone('Asia/Ho_Chi_Minh'))
-			self.db.commit()
+			await self.db.commit()
 
 			# Generate tokens
 			tokens = generate_auth_tokens(user)
@@ -153,7 +153,7 @@ class OAuthService:
 			claims = verify_refresh_token(request.refresh_token)
 
 			# Get user from claims
-			user: User = self.user_dal.get_by_id(claims['user_id'])
+			user: User = await self.user_dal.get_by_id(claims['user_id'])
 			if not user:
 				raise CustomHTTPException(message=_('user_not_found'))
 
@@ -1,28 +1,32 @@
 """User data access layer"""
 
 import logging
-from contextlib import contextmanager
 
-from sqlalchemy import and_
+from sqlalchemy import bindparam, select
 
-from app.core.base_dal import BaseDAL
+from app.core.base_dal import AsyncBaseDAL
 from app.core.base_model import Pagination
 from app.enums.base_enums import Constants
 from app.modules.users.models.users import User
 from app.utils.filter_utils import apply_dynamic_filters
 
+# Login / signup lookups: built once, each call only binds the value
+USER_BY_EMAIL = select(User).where(User.email == bindparam('email'))
+USER_BY_USERNAME = select(User).where(User.username == bindparam('username'))
 
-class UserDAL(BaseDAL[User]):
+
+class UserDAL(AsyncBaseDAL[User]):
 	"""UserDAL"""
 
 	def __init__(self, db):
 		super().__init__(db, User)
 
-	def get_user_by_email(self, email: str) -> User:
+	async def get_user_by_email(self, email: str) -> User:
 		"""Tìm user theo email"""
-		return self.db.query(User).filter(User.email == email).first()
+		result = await self.db.execute(USER_BY_EMAIL, {'email': email})
+		return result.scalars().first()
 
-	def get_user_by_google_id(self, google_id: str):
+	async def get_user_by_google_id(self, google_id: str):
 		"""Get user by Google ID
 
 		Args:
@@ -32,12 +36,13 @@ class UserDAL(BaseDAL[User]):
 		    User: User object if found, None otherwise
 		"""
 		try:
-			return self.db.query(User).filter(User.google_id == google_id).first()
+			result = await self.db.execute(select(User).where(User.google_id == google_id))
+			return result.scalars().first()
 		except Exception as e:
 			print(f'[ERROR] Failed to get user by Google ID: {e}')
 			return None
 
-	def get_user_by_id(self, user_id: int) -> User:
+	async def get_user_by_id(self, user_id: int) -> User:
 		"""Get user by ID
 
 		Args:
@@ -46,9 +51,9 @@ class UserDAL(BaseDAL[User]):
 		Returns:
 		    User: User object if found, None otherwise
 		"""
-		return self.db.query(User).filter(and_(User.id == user_id)).first()
+		return await self.get_by_id(user_id)
 
-	def get_user_by_username(self, username: str) -> User:
+	async def get_user_by_username(self, username: str) -> User:
 		"""Get user by username
 
 		Args:
@@ -57,9 +62,10 @@ class UserDAL(BaseDAL[User]):
 		Returns:
 		    User: User object if found, None otherwise
 		"""
-		return self.db.query(User).filter(and_(User.username == username)).first()
+		result = await self.db.execute(USER_BY_USERNAME, {'username': username})
+		return result.scalars().first()
 
-	def search_users(self, params: dict) -> Pagination[User]:
+	async def search_users(self, params: dict) -> Pagination[User]:
 		"""Search users with dynamic filters based on any User model field"""
 		logger = logging.getLogger(__name__)
 
@@ -68,39 +74,14 @@ class UserDAL(BaseDAL[User]):
 		page_size = int(params.get('page_size', Constants.PAGE_SIZE))
 
 		# Start with basic query
-		query = self.db.query(User)
+		query = select(User)
 
 		# Apply dynamic filters using the common utility function
 		query = apply_dynamic_filters(query, User, params)
 
-		# Sort by creation date descending
-		query = query.order_by(User.create_date.desc())
-
-		# Count total records
-		total_count = query.count()
-
-		# Apply pagination
-		users = query.offset((page - 1) * page_size).limit(page_size).all()
-
-		logger.info(f'Found {total_count} users, returning page {page} with {len(users)} items')
-
-		return Pagination(items=users, total_count=total_count, page=page, page_size=page_size)
+		# Newest users first; id is unique so the order is stable across pages
+		result = await self.paginate(query, page, page_size, sort_keys=[(User.id, True)], cursor=params.get('cursor'), count_strategy=params.get('count_strategy'))
 
-	@contextmanager
-	def transaction(self):
-		"""Create a transaction context
+		logger.info(f'Found {result.total_count} users, returning page {page} with {len(result.items)} items')
 
-		This ensures that all database operations in the block are committed together,
-		or rolled back if an exception occurs.
-
-		Example:
-		    with user_dal.transaction():
-		        user = user_dal.create(user_data)
-		        # Other operations that should be committed together
-		"""
-		try:
-			yield
-			self.db.commit()
-		except Exception as e:
-			self.db.rollback()
-			raise e
+		return result
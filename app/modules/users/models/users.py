@@ -1,6 +1,6 @@
 """User model"""
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, String
+from sqlalchemy import Boolean, Column, DateTime, Enum, Index, String
 from sqlalchemy.orm import validates
 
 from app.core.base_model import BaseEntity
@@ -11,6 +11,11 @@ class User(BaseEntity):
 	"""User model"""
 
 	__tablename__ = 'users'
+	__table_args__ = (
+		# login / signup lookups
+		Index('ix_users_email', 'email'),
+		Index('ix_users_username', 'username'),
+	)
 	
 	username = Column(String(255), nullable=True)
 	password = Column(String(255), nullable=True)
@@ -2,12 +2,13 @@
 
 import logging
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from pytz import timezone
 
 from app.core.base_repo import BaseRepo
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.db_routing import use_primary
 from app.modules.users.dal.user_dal import UserDAL
 from app.middleware.translation_manager import _
 from app.exceptions.exception import CustomHTTPException
@@ -26,11 +27,11 @@ class AuthenRepo(BaseRepo):
     This is the main entry point for Google OAuth authentication operations.
     """
 
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
         """Initialize the authentication repository
 
         Args:
-            db (Session): Database session
+            db (AsyncSession): Database session
         """
         self.db = db
         self.user_dal = UserDAL(db)
@@ -48,7 +49,7 @@ class AuthenRepo(BaseRepo):
             self._oauth_service = OAuthService(self.user_dal, self.db)
         return self._oauth_service
 
-    def login(self, request: LoginRequest):
+    async def login(self, request: LoginRequest):
         """Handle user login with username and password
 
         Args:
@@ -62,7 +63,7 @@ class AuthenRepo(BaseRepo):
             UnauthorizedException: If credentials are invalid
         """
         try:
-            user = self.user_dal.get_user_by_username(request.username)
+            user = await self.user_dal.get_user_by_username(request.username)
             if not user:
                 raise CustomHTTPException(message=_('user_not_found'))
 
@@ -73,7 +74,7 @@ class AuthenRepo(BaseRepo):
 
             # Update last login timestamp
             user.last_login_at = datetime.now(timezone('Asia/Ho_Chi_Minh'))
-            self.db.commit()
+            await self.db.commit()
 
             # Generate authentication tokens
             tokens = generate_auth_tokens(user)
@@ -100,10 +101,12 @@ class AuthenRepo(BaseRepo):
                 CustomHTTPException: If registration fails
         """
         try:
+            use_primary(self.db)
+
             # Check if user exists and is confirmed
-            existing_user = self.user_dal.get_user_by_email(user.email)
+            existing_user = await self.user_dal.get_user_by_email(user.email)
 
-            with self.user_dal.transaction():
+            async with self.user_dal.transaction():
                 password_utils = PasswordUtils()
                 hashed_password = password_utils.hash_password(user.password)
 
@@ -115,9 +118,9 @@ class AuthenRepo(BaseRepo):
                     'role': UserRoleEnum.CUSTOMER.value,  # Use enum value, not enum object
                 }
 
-                created_user = self.user_dal.create(new_user)
-                self.db.commit()
-                self.db.refresh(created_user)
+                created_user = await self.user_dal.create(new_user)
+                await self.db.flush()
+                await self.db.refresh(created_user)
 
                 # Defensive: check if user was created
                 if not created_user:
@@ -126,7 +129,7 @@ class AuthenRepo(BaseRepo):
                     raise CustomHTTPException(message=_('signup_failed'))
 
                 # Defensive: check if user is now in DB
-                check_user = self.user_dal.get_user_by_email(user.email)
+                check_user = await self.user_dal.get_user_by_email(user.email)
                 if not check_user:
                     logger.error(
                         f"Signup failed: user not found after creation for email: {user.email}")
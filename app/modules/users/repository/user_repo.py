@@ -1,21 +1,25 @@
 """User repo"""
 
+import asyncio
 import logging
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.base_model import Pagination
 from app.core.base_repo import BaseRepo
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.db_routing import use_primary
+from app.core.loader import get_loaders
 from app.exceptions.exception import CustomHTTPException, NotFoundException
 from app.middleware.translation_manager import _
 from app.modules.users.dal.user_dal import UserDAL
 from app.modules.users.models.users import User
-from app.modules.products.models.wishlists import Wishlist
+from app.modules.products.cache.leaderboard import LeaderboardCache
+from app.modules.products.dal.wishlist_dal import WishlistDAL
 from app.modules.users.schemas.users import SearchUserRequest
 from app.utils.password_utils import PasswordUtils
-from app.modules.products.repository.product_repo import ProductRepo
+from app.modules.products.models.products import Product
 from app.modules.products.schemas.product_response import WishlistItem
 from fastapi import status
 
@@ -24,19 +28,23 @@ logger = logging.getLogger(__name__)
 class UserRepo(BaseRepo):
     """UserRepo"""
 
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
         """__init__"""
         self.db = db
         self.user_dal = UserDAL(db)
+        self.wishlist_dal = WishlistDAL(db)
+        self.loaders = get_loaders(db)
+        # Registers the leaderboard hook of wishlist adds
+        LeaderboardCache()
 
-    def search_users(self, request: SearchUserRequest) -> Pagination[User]:
+    async def search_users(self, request: SearchUserRequest) -> Pagination[User]:
         try:
-            result = self.user_dal.search_users(request.model_dump())
+            result = await self.user_dal.search_users(request.model_dump())
             return result
         except Exception as ex:
             raise ex
 
-    def get_user_by_id(self, user_id: int) -> User:
+    async def get_user_by_id(self, user_id: int) -> User:
         """
         Retrieve a user by their ID
 
@@ -47,11 +55,11 @@ class UserRepo(BaseRepo):
             The user model if found, otherwise None
         """
         try:
-            return self.user_dal.get_user_by_id(user_id)
+            return await self.loaders.load(User, user_id)
         except Exception as ex:
             raise ex
 
-    def update_user(self, user_id: int, data: dict) -> User:
+    async def update_user(self, user_id: int, data: dict) -> User:
         """
         Update a user's information
 
@@ -63,7 +71,9 @@ class UserRepo(BaseRepo):
             The updated user model
         """
         try:
-            user = self.user_dal.get_user_by_id(user_id)
+            # Username uniqueness check must see the latest writes
+            use_primary(self.db)
+            user = await self.loaders.load(User, user_id)
             if not user:
                 raise CustomHTTPException(message=_('user_not_found'))
 
@@ -71,7 +81,7 @@ class UserRepo(BaseRepo):
             if 'password' in data:
                 data['password'] = PasswordUtils.hash_password(data['password'])
             if 'username' in data:
-                existing_user = self.user_dal.get_user_by_username(data['username'])
+                existing_user = await self.user_dal.get_user_by_username(data['username'])
                 if existing_user and existing_user.id != user_id:
                     raise CustomHTTPException(
                         message=_('username_already_exists'),
@@ -81,12 +91,12 @@ class UserRepo(BaseRepo):
             for key, value in data.items():
                 setattr(user, key, value)
 
-            self.db.commit()
+            await self.db.commit()
             return user
         except Exception as ex:
             raise ex
 
-    def update_password(self, user: User, param) -> bool:
+    async def update_password(self, user: User, param) -> bool:
         password_utils = PasswordUtils()
         current_password = user.password
 
@@ -98,10 +108,10 @@ class UserRepo(BaseRepo):
 
         user.password = password_utils.hash_password(param['new_password'])
 
-        self.db.commit()
+        await self.db.commit()
         return True
 
-    def add_to_wishlist(self, user_id: int, product_id: int) -> WishlistItem:
+    async def add_to_wishlist(self, user_id: int, product_id: int) -> WishlistItem:
         """
         Add a product to the user's wishlist
 
@@ -116,17 +126,19 @@ class UserRepo(BaseRepo):
             CustomHTTPException: If user or product is not found, or if product is already in wishlist
         """
         try:
-            # Verify user exists
-            user = self.user_dal.get_user_by_id(user_id)
+            # The duplicate check below must not read from a lagging replica
+            use_primary(self.db)
+
+            # Verify user and product exist (one round trip each, memoized for the request)
+            user, product = await asyncio.gather(
+                self.loaders.load(User, user_id),
+                self.loaders.load(Product, product_id),
+            )
             if not user:
                 raise CustomHTTPException(
                     message=_('user_not_found'),
                     status_code=status.HTTP_404_NOT_FOUND
                 )
-
-            # Verify product exists
-            product_repo = ProductRepo(self.db)
-            product = product_repo.get_product_by_id(product_id)
             if not product:
                 raise CustomHTTPException(
                     message=_('product_not_found'),
@@ -134,10 +146,7 @@ class UserRepo(BaseRepo):
                 )
 
             # Check if product is already in wishlist
-            existing_wishlist_item = self.db.query(Wishlist).filter(
-                Wishlist.user_id == user_id,
-                Wishlist.product_id == product_id
-            ).first()
+            existing_wishlist_item = await self.wishlist_dal.get_wishlist_item(user_id, product_id)
             if existing_wishlist_item:
                 raise CustomHTTPException(
                     message=_('product_already_in_wishlist'),
@@ -145,13 +154,7 @@ class UserRepo(BaseRepo):
                 )
 
             # Create new wishlist item
-            wishlist_item = Wishlist(
-                user_id=user_id,
-                product_id=product_id
-            )
-            self.db.add(wishlist_item)
-            self.db.commit()
-            self.db.refresh(wishlist_item)
+            wishlist_item = await self.wishlist_dal.add_item(user_id, product_id, product.category_id)
 
             # Construct WishlistItem based on get_wishlist response structure
             return WishlistItem(
@@ -163,6 +166,6 @@ class UserRepo(BaseRepo):
                 main_image_url=product.main_image_url,
             )
         except Exception as ex:
-            self.db.rollback()
+            await self.db.rollback()
             logger.exception(f"Error adding product {product_id} to wishlist for user {user_id}: {ex}")
             raise ex
\ No newline at end of file
@@ -32,7 +32,7 @@ logger = logging.getLogger(__name__)
 @handle_exceptions
 async def login(credentials: LoginRequest, repo: AuthenRepo = Depends()) -> APIResponse:
     """Login endpoint: Validate credentials and return tokens"""
-    result = repo.login(credentials)
+    result = await repo.login(credentials)
     print('Login result:', result)
     response = UserResponse.model_validate(result)
     return APIResponse(
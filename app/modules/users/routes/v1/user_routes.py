@@ -6,7 +6,7 @@ from app.modules.products.schemas.product_request import SearchProductRequest, S
 from app.modules.products.schemas.product_response import ProductResponse, ShoppingHistoryResponse, ShoppingHistoryItem, WishlistResponse, WishlistItem
 
 from app.core.base_model import APIResponse, PagingInfo
-from app.enums.base_enums import BaseErrorCode
+from app.enums.base_enums import BaseErrorCode, CountStrategy
 from app.exceptions.exception import CustomHTTPException, NotFoundException
 from app.exceptions.handlers import handle_exceptions
 from app.http.oauth2 import get_current_user
@@ -33,8 +33,8 @@ async def get_current_user_profile(current_user_payload: dict = Depends(get_curr
     This endpoint returns the full profile information of the authenticated user
     based on their access token.
     """
-    user_id = current_user_payload.get('user_id')
-    user = repo.get_user_by_id(user_id)
+    user_id = int(current_user_payload.get('user_id'))
+    user = await repo.get_user_by_id(user_id)
 
     if not user:
         raise CustomHTTPException(message=_('user_not_found'))
@@ -51,13 +51,15 @@ async def get_current_user_profile(current_user_payload: dict = Depends(get_curr
 async def get_shopping_history(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str | None = Query(None, description='paging.next_cursor of the previous page'),
+    count_strategy: CountStrategy | None = Query(None, description='Total count: exact, cached or none'),
     current_user_payload: dict = Depends(get_current_user),
     repo: ProductRepo = Depends(),
 ):
     """Get shopping history for a user with completed orders"""
 
-    user_id = current_user_payload.get('user_id')
-    result = repo.get_shopping_history(user_id, page, page_size)
+    user_id = int(current_user_payload.get('user_id'))
+    result = await repo.get_shopping_history(user_id, page, page_size, cursor, count_strategy)
     return APIResponse(
         error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
         message=_('operation_successful'),
@@ -69,6 +71,9 @@ async def get_shopping_history(
                 total_pages=result.total_pages,
                 page=result.page,
                 page_size=result.page_size,
+                next_cursor=result.next_cursor,
+                has_more=result.has_more,
+                count_strategy=result.count_strategy,
             ),
         ),
     )
@@ -79,13 +84,15 @@ async def get_shopping_history(
 async def get_wishlist(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
+    cursor: str | None = Query(None, description='paging.next_cursor of the previous page'),
+    count_strategy: CountStrategy | None = Query(None, description='Total count: exact, cached or none'),
     current_user_payload: dict = Depends(get_current_user),
     repo: ProductRepo = Depends(),
 ):
     """Get wishlist for a user"""
 
-    user_id = current_user_payload.get('user_id')
-    result = repo.get_wishlist(user_id, page, page_size)
+    user_id = int(current_user_payload.get('user_id'))
+    result = await repo.get_wishlist(user_id, page, page_size, cursor, count_strategy)
     return APIResponse(
         error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
         message=_('operation_successful'),
@@ -96,6 +103,9 @@ async def get_wishlist(
                 total_pages=result.total_pages,
                 page=result.page,
                 page_size=result.page_size,
+                next_cursor=result.next_cursor,
+                has_more=result.has_more,
+                count_strategy=result.count_strategy,
             ),
         ),
     )
@@ -111,8 +121,8 @@ async def add_to_wishlist(
 ):
     """Add a product to the user's wishlist"""
 
-    user_id = current_user_payload.get('user_id')
-    result = repo.add_to_wishlist(user_id, product_id)
+    user_id = int(current_user_payload.get('user_id'))
+    result = await repo.add_to_wishlist(user_id, product_id)
 
     return APIResponse(
         error_code=BaseErrorCode.ERROR_CODE_SUCCESS,
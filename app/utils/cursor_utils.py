@@ -0,0 +1,96 @@
+"""Opaque cursors for keyset (seek) pagination
+
+A cursor holds the sort-key values of the last row of a page plus a signature
+of the sort keys, so a cursor built for `price desc` is rejected when the client
+switches to `name asc`.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Sequence
+
+from sqlalchemy import and_, or_
+
+from app.exceptions.exception import ValidationException
+from app.middleware.translation_manager import _
+
+
+def sort_signature(sort_keys: Sequence[tuple[Any, bool]]) -> str:
+	"""Signature of (column, is_desc) sort keys, e.g. `price:d,id:d`"""
+	return ','.join(f'{getattr(column, "key", str(column))}:{"d" if is_desc else "a"}' for column, is_desc in sort_keys)
+
+
+def _encode_value(value: Any) -> Any:
+	if isinstance(value, Decimal):
+		return {'d': str(value)}
+	if isinstance(value, datetime):
+		return {'t': value.isoformat()}
+	if isinstance(value, date):
+		return {'D': value.isoformat()}
+	return value
+
+
+def _decode_value(value: Any) -> Any:
+	if isinstance(value, dict):
+		if 'd' in value:
+			return Decimal(value['d'])
+		if 't' in value:
+			return datetime.fromisoformat(value['t'])
+		if 'D' in value:
+			return date.fromisoformat(value['D'])
+	return value
+
+
+def encode_cursor(signature: str, values: Sequence[Any]) -> str:
+	"""Encode the last row's sort-key values into an URL-safe cursor"""
+	payload = json.dumps({'k': signature, 'v': [_encode_value(value) for value in values]}, separators=(',', ':'))
+	return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, signature: str) -> list[Any]:
+	"""Decode a cursor built by `encode_cursor` for the same sort keys
+
+	Raises:
+	    ValidationException: If the cursor is malformed or was built for other sort keys
+	"""
+	try:
+		padded = cursor + '=' * (-len(cursor) % 4)
+		payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+		if payload['k'] != signature:
+			raise ValueError('sort keys changed')
+		return [_decode_value(value) for value in payload['v']]
+	except (ValueError, KeyError, TypeError, binascii.Error) as ex:
+		raise ValidationException(_('invalid_cursor')) from ex
+
+
+def keyset_condition(sort_keys: Sequence[tuple[Any, bool]], values: Sequence[Any]):
+	"""WHERE clause selecting rows strictly after `values` in `sort_keys` order
+
+	(a, b, id) > (va, vb, vid) is expanded to
+	a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND id > vid),
+	with `<` for descending keys, so mixed directions work and MySQL can still
+	use a range scan on the leading index column.
+	"""
+	if len(values) != len(sort_keys):
+		raise ValidationException(_('invalid_cursor'))
+
+	clauses = []
+	for index, (column, is_desc) in enumerate(sort_keys):
+		equal_prefix = [sort_keys[i][0] == values[i] for i in range(index)]
+		after = column < values[index] if is_desc else column > values[index]
+		clauses.append(and_(*equal_prefix, after))
+	return or_(*clauses)
+
+
+def row_value(row: Any, column: Any) -> Any:
+	"""Read the value of `column` from an ORM entity or a Row"""
+	mapping = getattr(row, '_mapping', None)
+	if mapping is not None:
+		if column in mapping:
+			return mapping[column]
+		# select(Model, extra columns): model attributes are read from the entity
+		row = row[0]
+	return getattr(row, column.key)
@@ -106,7 +106,7 @@ def apply_dynamic_filters(query: Query, model: Any, params: dict) -> Query:
 	# Process legacy direct filters (for backward compatibility)
 	for key, value in params.items():
 		# Skip pagination parameters and filters list
-		if key in ['page', 'page_size', 'filters']:
+		if key in ['page', 'page_size', 'cursor', 'count_strategy', 'filters']:
 			continue
 
 		# Check if the key exists as a column in model
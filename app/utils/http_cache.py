@@ -0,0 +1,78 @@
+"""HTTP conditional requests: ETag / Last-Modified validators and 304 responses
+
+Routes compute the version of what they are about to return (a row's
+update_date, COUNT + MAX(update_date) of a list) before building it. When the
+client already holds that version (If-None-Match, or If-Modified-Since without
+If-None-Match) they answer 304 Not Modified without a body; otherwise the
+validators go on the full response:
+
+    validators = CacheValidators.for_version('product', product_id, version, lang, last_modified=version)
+    if validators.is_fresh(request):
+        return validators.not_modified()
+    ...
+    validators.apply(response)
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Clients may keep the response but must revalidate it on every use (cheap with a 304)
+CACHE_CONTROL = 'no-cache'
+
+
+@dataclass
+class CacheValidators:
+	etag: str
+	last_modified: datetime | None = None
+
+	@classmethod
+	def for_version(cls, *parts, last_modified: datetime | None = None) -> 'CacheValidators':
+		"""Strong ETag of a version: everything the response depends on (row version, language, ...)"""
+		digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+		return cls(f'"{digest}"', last_modified)
+
+	@staticmethod
+	def is_conditional(request: Request) -> bool:
+		"""True when the client sent a validator (only then is reading the version worth a query)"""
+		return 'if-none-match' in request.headers or 'if-modified-since' in request.headers
+
+	def is_fresh(self, request: Request) -> bool:
+		"""True when the client's copy is current (answer 304)"""
+		if_none_match = request.headers.get('if-none-match')
+		if if_none_match is not None:
+			# If-None-Match uses the weak comparison: W/"x" matches "x"
+			tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+			return '*' in tags or self.etag in tags
+		if_modified_since = request.headers.get('if-modified-since')
+		if if_modified_since and self.last_modified is not None:
+			try:
+				since = parsedate_to_datetime(if_modified_since)
+			except (TypeError, ValueError):
+				return False
+			if since.tzinfo is None:
+				since = since.replace(tzinfo=timezone.utc)
+			# HTTP dates have whole seconds
+			return _as_utc(self.last_modified).replace(microsecond=0) <= since
+		return False
+
+	def headers(self) -> dict[str, str]:
+		headers = {'ETag': self.etag, 'Cache-Control': CACHE_CONTROL, 'Vary': 'lang'}
+		if self.last_modified is not None:
+			headers['Last-Modified'] = format_datetime(_as_utc(self.last_modified), usegmt=True)
+		return headers
+
+	def apply(self, response: Response) -> None:
+		"""Add the validators to the full response"""
+		response.headers.update(self.headers())
+
+	def not_modified(self) -> Response:
+		return Response(status_code=304, headers=self.headers())
+
+
+def _as_utc(value: datetime) -> datetime:
+	# Naive DB timestamps are in the server's local time zone (TZ of the containers)
+	return value.astimezone(timezone.utc)
@@ -7,7 +7,7 @@ import io
 import logging
 import os
 import uuid
-from typing import Tuple
+from typing import BinaryIO, Tuple
 
 from fastapi import UploadFile
 
@@ -19,6 +19,9 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 settings = get_settings()
 
+# Part size of streamed uploads of unknown length (MinIO minimum is 5 MiB)
+STREAM_PART_SIZE = 10 * 1024 * 1024
+
 # Ensure the secure parameter is a boolean, not a string
 secure_value = settings.MINIO_SECURE
 if isinstance(secure_value, str):
@@ -220,6 +223,60 @@ class MinioHandler:
 			logger.error(f'Unexpected error uploading bytes to MinIO: {str(e)}')
 			raise
 
+	def upload_stream(
+		self,
+		data: BinaryIO,
+		file_name: str,
+		folder: str,
+		content_type: str = 'application/octet-stream',
+	) -> str:
+		"""
+		Upload a file-like object to MinIO in parts, without reading it into memory.
+
+		Args:
+		    data: Readable binary file object (e.g. UploadFile.file)
+		    file_name: Original file name (its extension is kept)
+		    folder: Folder of the object (e.g. catalog-imports)
+		    content_type: The MIME type of the content
+
+		Returns:
+		    The object name (path) in MinIO storage
+		"""
+		try:
+			_, ext = os.path.splitext(file_name)
+			object_name = f'{folder}/{uuid.uuid4()}{ext}'
+			self.minio_client.put_object(
+				bucket_name=self.bucket_name,
+				object_name=object_name,
+				data=data,
+				length=-1,
+				part_size=STREAM_PART_SIZE,
+				content_type=content_type,
+			)
+			logger.info(f"Stream '{file_name}' uploaded successfully to MinIO as '{object_name}'")
+			return object_name
+
+		except S3Error as err:
+			logger.error(f'Error uploading stream to MinIO: {err}')
+			raise
+
+	def open_stream(self, object_name: str):
+		"""
+		Open a file in MinIO for reading in chunks.
+
+		Args:
+		    object_name: The path of the object in MinIO storage
+
+		Returns:
+		    A readable binary response; call close() and release_conn() when done
+		"""
+		try:
+			return self.minio_client.get_object(bucket_name=self.bucket_name, object_name=object_name.replace('//', '/'))
+
+		except S3Error as err:
+			logger.error(f'Error opening file in MinIO: {err}')
+			raise
+
 	def download_file(self, object_name: str) -> Tuple[bytes, str]:
 		"""
 		Download a file from MinIO.
@@ -5,19 +5,43 @@ This module provides a Redis client with caching functionality
 """
 
 import json
+import logging
+import time
+import redis as sync_redis
 import redis.asyncio as redis
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 
 class RedisClient:
-	"""Redis client for caching operations"""
+	"""Redis client for caching operations
+
+	Every call fails soft: errors are swallowed and reported as a miss/False.
+	After a failure Redis is not contacted for REDIS_RETRY_SECONDS, so an
+	outage costs one timeout instead of one per call.
+	"""
 
 	def __init__(self):
 		self.settings = get_settings()
-		# Extract Redis URL from Celery broker URL for consistency
-		redis_url = self.settings.CELERY_BROKER_URL.replace('/0', '/1')  # Use DB 1 for cache
-		self.redis_client = redis.from_url(redis_url, decode_responses=True)
+		self.redis_client = redis.from_url(
+			self.settings.REDIS_CACHE_URL,
+			decode_responses=True,
+			socket_timeout=self.settings.REDIS_SOCKET_TIMEOUT,
+			socket_connect_timeout=self.settings.REDIS_SOCKET_TIMEOUT,
+		)
+		self._down_until = 0.0
+
+	@property
+	def available(self) -> bool:
+		"""False while Redis is skipped after a failure"""
+		return time.monotonic() >= self._down_until
+
+	def _mark_down(self, ex: Exception) -> None:
+		if self.available:
+			logger.warning(f'Redis unavailable, skipping it for {self.settings.REDIS_RETRY_SECONDS}s: {ex}')
+		self._down_until = time.monotonic() + self.settings.REDIS_RETRY_SECONDS
 
 	async def get(self, key: str) -> Optional[Any]:
 		"""
@@ -29,13 +53,16 @@ class RedisClient:
 		Returns:
 		    Cached value or None if not found
 		"""
+		if not self.available:
+			return None
 		try:
 			data = await self.redis_client.get(key)
 			if data:
 				return json.loads(data)
 			return None
-		except Exception:
+		except Exception as ex:
 			# If Redis is unavailable, return None to fallback to API call
+			self._mark_down(ex)
 			return None
 
 	async def set(self, key: str, value: Any, ttl: int = 86400) -> bool:
@@ -50,12 +77,15 @@ class RedisClient:
 		Returns:
 		    True if successful, False otherwise
 		"""
+		if not self.available:
+			return False
 		try:
 			data = json.dumps(value, default=str)
 			await self.redis_client.setex(key, ttl, data)
 			return True
-		except Exception:
+		except Exception as ex:
 			# If Redis is unavailable, continue without caching
+			self._mark_down(ex)
 			return False
 
 	async def delete(self, key: str) -> bool:
@@ -68,10 +98,13 @@ class RedisClient:
 		Returns:
 		    True if successful, False otherwise
 		"""
+		if not self.available:
+			return False
 		try:
 			await self.redis_client.delete(key)
 			return True
-		except Exception:
+		except Exception as ex:
+			self._mark_down(ex)
 			return False
 
 	async def exists(self, key: str) -> bool:
@@ -84,10 +117,137 @@ class RedisClient:
 		Returns:
 		    True if key exists, False otherwise
 		"""
+		if not self.available:
+			return False
 		try:
 			return bool(await self.redis_client.exists(key))
-		except Exception:
+		except Exception as ex:
+			self._mark_down(ex)
+			return False
+
+	async def set_if_absent(self, key: str, value: Any, ttl: int) -> bool:
+		"""
+		Set value only if the key does not exist (SET NX), e.g. as a short lock
+
+		Args:
+		    key: Cache key
+		    value: Value to cache
+		    ttl: Time to live in seconds
+
+		Returns:
+		    True if the key was set, False if it existed or Redis is unavailable
+		"""
+		if not self.available:
+			return False
+		try:
+			return bool(await self.redis_client.set(key, json.dumps(value, default=str), ex=ttl, nx=True))
+		except Exception as ex:
+			self._mark_down(ex)
+			return False
+
+	async def get_raw_many(self, keys: Sequence[str]) -> Optional[list[Optional[str]]]:
+		"""
+		Get several plain (not JSON encoded) values with one MGET
+
+		Args:
+		    keys: Cache keys
+
+		Returns:
+		    Values in the order of keys (None for missing keys), or None if Redis is unavailable
+		"""
+		if not self.available:
+			return None
+		try:
+			return await self.redis_client.mget(keys)
+		except Exception as ex:
+			self._mark_down(ex)
+			return None
+
+	async def hget_raw(self, key: str, field: str) -> Optional[str]:
+		"""
+		Get one plain (not JSON encoded) field of a hash
+
+		Args:
+		    key: Hash key
+		    field: Field name
+
+		Returns:
+		    Field value, or None if missing or Redis is unavailable
+		"""
+		if not self.available:
+			return None
+		try:
+			return await self.redis_client.hget(key, field)
+		except Exception as ex:
+			self._mark_down(ex)
+			return None
+
+	async def incr_many(self, keys: Sequence[str]) -> bool:
+		"""
+		Increment several counters in one round trip
+
+		Args:
+		    keys: Counter keys (created at 0 when missing)
+
+		Returns:
+		    True if successful, False otherwise
+		"""
+		if not self.available:
 			return False
+		try:
+			async with self.redis_client.pipeline(transaction=False) as pipe:
+				for key in keys:
+					pipe.incr(key)
+				await pipe.execute()
+			return True
+		except Exception as ex:
+			self._mark_down(ex)
+			return False
+
+	async def zincrby_many(self, increments: Sequence[tuple[str, str, float]], expire: Optional[dict[str, int]] = None) -> bool:
+		"""
+		Increment members of sorted sets in one round trip
+
+		Args:
+		    increments: (key, member, amount) triples
+		    expire: TTL in seconds to (re)set on some of the keys
+
+		Returns:
+		    True if successful, False otherwise
+		"""
+		if not self.available:
+			return False
+		try:
+			async with self.redis_client.pipeline(transaction=False) as pipe:
+				for key, member, amount in increments:
+					pipe.zincrby(key, amount, member)
+				for key, ttl in (expire or {}).items():
+					pipe.expire(key, ttl)
+				await pipe.execute()
+			return True
+		except Exception as ex:
+			self._mark_down(ex)
+			return False
+
+	async def zrevrange_with_scores(self, key: str, start: int, stop: int) -> Optional[list[tuple[str, float]]]:
+		"""
+		Members of a sorted set from the highest score, O(log n + count)
+
+		Args:
+		    key: Sorted set key
+		    start: First rank (0 = highest score)
+		    stop: Last rank, inclusive
+
+		Returns:
+		    (member, score) pairs, or None if Redis is unavailable
+		"""
+		if not self.available:
+			return None
+		try:
+			return await self.redis_client.zrevrange(key, start, stop, withscores=True)
+		except Exception as ex:
+			self._mark_down(ex)
+			return None
 
 	async def close(self):
 		"""Close Redis connection"""
@@ -99,3 +259,22 @@ class RedisClient:
 
 # Global Redis client instance
 redis_client = RedisClient()
+
+_sync_redis_client: sync_redis.Redis | None = None
+
+
+def get_sync_redis() -> sync_redis.Redis:
+	"""Blocking client of REDIS_CACHE_URL for sync code (Celery tasks), created on first use
+
+	Unlike RedisClient it raises on errors, callers decide how to fail soft.
+	"""
+	global _sync_redis_client
+	if _sync_redis_client is None:
+		settings = get_settings()
+		_sync_redis_client = sync_redis.Redis.from_url(
+			settings.REDIS_CACHE_URL,
+			decode_responses=True,
+			socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+			socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+		)
+	return _sync_redis_client
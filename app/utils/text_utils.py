@@ -0,0 +1,17 @@
+"""Text normalization for search"""
+
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# Letters NFD does not decompose
+_SPECIAL_FOLDS = str.maketrans({'đ': 'd', 'Đ': 'd'})
+
+
+def fold_text(value: str | None) -> str:
+	"""Lowercase, strip diacritics and collapse whitespace: 'Áo  Thun Đỏ' -> 'ao thun do'"""
+	if not value:
+		return ''
+	decomposed = unicodedata.normalize('NFD', value.translate(_SPECIAL_FOLDS))
+	stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+	return _WHITESPACE_RE.sub(' ', stripped).strip().lower()
@@ -0,0 +1,71 @@
+"""Small in-process LRU cache with per-entry expiry"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+	"""Thread-safe LRU cache whose entries expire `ttl` seconds after being set
+
+	Lives in the memory of one worker process, so every worker keeps its own copy.
+	"""
+
+	def __init__(self, maxsize: int = 1024, ttl: float = 60):
+		self.maxsize = max(1, maxsize)
+		self.ttl = ttl
+		self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, key: Hashable, default: Any = None) -> Any:
+		"""Return the cached value of `key`, or `default` if missing or expired"""
+		with self._lock:
+			entry = self._data.get(key, _MISSING)
+			if entry is _MISSING or entry[0] <= time.monotonic():
+				if entry is not _MISSING:
+					del self._data[key]
+				self.misses += 1
+				return default
+			self._data.move_to_end(key)
+			self.hits += 1
+			return entry[1]
+
+	def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+		"""Store `value` under `key`, evicting the least recently used entry if full"""
+		expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+		with self._lock:
+			self._data[key] = (expires, value)
+			self._data.move_to_end(key)
+			while len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+
+	def pop(self, key: Hashable) -> None:
+		"""Remove `key` if present"""
+		with self._lock:
+			self._data.pop(key, None)
+
+	def clear(self) -> None:
+		"""Remove every entry"""
+		with self._lock:
+			self._data.clear()
+
+	def __len__(self) -> int:
+		return len(self._data)
+
+	def stats(self) -> dict:
+		"""Hit/miss counters and size"""
+		with self._lock:
+			requests = self.hits + self.misses
+			return {
+				'size': len(self._data),
+				'maxsize': self.maxsize,
+				'ttl': self.ttl,
+				'hits': self.hits,
+				'misses': self.misses,
+				'hit_ratio': round(self.hits / requests, 4) if requests else 0.0,
+			}
@@ -0,0 +1,80 @@
+"""Microbenchmark: per-call overhead of the hot DAL lookups
+
+Compares building a new select() on every call (previous DAL code) with the
+cached statements (prebuilt select + bindparam, lambda_stmt). Runs against an
+in-memory SQLite database so the difference is Python overhead, not I/O.
+
+Usage:
+    python scripts/bench_dal_lookups.py [--calls 20000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.base_dal import by_id_statement
+from app.modules.products.models.products import Product
+from app.modules.users.dal.user_dal import USER_BY_EMAIL
+from app.modules.users.models.users import User
+
+
+def bench(name: str, calls: int, func) -> float:
+	func(0)  # warm up the compiled cache
+	started = time.perf_counter()
+	for index in range(calls):
+		func(index)
+	per_call_us = (time.perf_counter() - started) / calls * 1_000_000
+	print(f'{name:<45} {per_call_us:8.1f} us/call')
+	return per_call_us
+
+
+def main(calls: int) -> None:
+	engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+	User.__table__.create(engine)
+	Product.__table__.create(engine)
+
+	with Session(engine) as session:
+		session.add_all([User(username=f'bench{index}', email=f'bench{index}@example.com', role='customer') for index in range(100)])
+		session.add_all([Product(name=f'Bench product {index}', brand_id=1, price=10, stock=1, category_id=1) for index in range(100)])
+		session.commit()
+
+		def email(index):
+			return f'bench{index % 100}@example.com'
+
+		def product_id(index):
+			return index % 100 + 1
+
+		def build_lambda(index):
+			value = email(index)
+			return lambda_stmt(lambda: select(User).where(User.email == value))
+
+		print(f'{calls} calls each\n')
+		print('statement construction only')
+		bench('  select(User).where(User.email == value)', calls, lambda i: select(User).where(User.email == email(i)))
+		bench('  lambda_stmt(...)', calls, build_lambda)
+		bench('  prebuilt statement (no construction)', calls, lambda i: USER_BY_EMAIL)
+
+		print('\nget_user_by_email (execute + fetch)')
+		before = bench('  before: new select() per call', calls, lambda i: session.execute(select(User).where(User.email == email(i))).scalars().first())
+		bench('  lambda_stmt', calls, lambda i: session.execute(build_lambda(i)).scalars().first())
+		after = bench('  after: USER_BY_EMAIL + bindparam', calls, lambda i: session.execute(USER_BY_EMAIL, {'email': email(i)}).scalars().first())
+		print(f'  saved {before - after:.1f} us/call ({(before - after) / before:.0%})')
+
+		print('\nget_by_id (execute + fetch)')
+		before = bench('  before: new select() per call', calls, lambda i: session.execute(select(Product).where(Product.id == product_id(i))).scalars().first())
+		after = bench('  after: by_id_statement(Product)', calls, lambda i: session.execute(by_id_statement(Product), {'item_id': product_id(i)}).scalars().first())
+		print(f'  saved {before - after:.1f} us/call ({(before - after) / before:.0%})')
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Benchmark cached vs rebuilt DAL lookup statements')
+	parser.add_argument('--calls', type=int, default=20000)
+	args = parser.parse_args()
+	main(args.calls)
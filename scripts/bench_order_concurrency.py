@@ -0,0 +1,124 @@
+"""Concurrency check and benchmark of order placement (OrderRepo.place_order)
+
+Fires `--orders` parallel orders, each on its own session, at products created
+for the run with `--stock` units each, then checks that stock never went
+negative and that the stock taken equals the ordered quantity (no oversell, no
+lost update). With --multi every order takes both products, listed in random
+order, to exercise the lock ordering (a deadlock shows up as an error).
+
+Run it against MySQL (ASYNC_DATABASE_URL); SQLite serializes every write and
+only checks correctness.
+
+Usage:
+    python scripts/bench_order_concurrency.py [--orders 500] [--stock 200] [--quantity 1] [--multi] [--keep]
+Exit code 1 when an invariant is violated.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import delete, func, select
+
+from app.core.database import AsyncSessionLocal
+from app.exceptions.exception import CustomHTTPException
+from app.modules.products.models.orders import Order
+from app.modules.products.models.products import Product
+from app.modules.products.repository.order_repo import OrderRepo
+from app.modules.products.schemas.order_request import PlaceOrderRequest
+
+BENCH_USER_ID = 999999
+
+
+async def create_products(count: int, stock: int) -> list[int]:
+	async with AsyncSessionLocal() as db:
+		run_id = uuid.uuid4().hex[:8]
+		products = [
+			Product(sku=f'BENCH-ORDER-{run_id}-{index}', name=f'Bench order product {index}', brand_id=1, price=10, stock=stock, category_id=1)
+			for index in range(count)
+		]
+		db.add_all(products)
+		await db.commit()
+		return [product.id for product in products]
+
+
+async def place(product_ids: list[int], quantity: int, multi: bool) -> tuple[str, float]:
+	"""(outcome, latency in ms) of one order: ok | rejected | error"""
+	items = [{'product_id': product_id, 'quantity': quantity} for product_id in product_ids]
+	if multi:
+		random.shuffle(items)
+	else:
+		items = items[:1]
+	started = time.perf_counter()
+	async with AsyncSessionLocal() as db:
+		try:
+			await OrderRepo(db).place_order(BENCH_USER_ID, PlaceOrderRequest(items=items))
+			outcome = 'ok'
+		except CustomHTTPException as ex:
+			outcome = 'rejected' if ex.status_code == 409 else 'error'
+		except Exception as ex:
+			print(f'  order failed: {ex!r}')
+			outcome = 'error'
+	return outcome, (time.perf_counter() - started) * 1000
+
+
+async def check(product_ids: list[int], stock: int) -> bool:
+	async with AsyncSessionLocal() as db:
+		ok = True
+		for product_id in product_ids:
+			remaining = (await db.execute(select(Product.stock).where(Product.id == product_id))).scalar_one()
+			ordered = (await db.execute(select(func.coalesce(func.sum(Order.quantity), 0)).where(Order.product_id == product_id))).scalar_one()
+			valid = remaining >= 0 and stock - remaining == ordered
+			ok = ok and valid
+			print(f'product {product_id}: stock {stock} -> {remaining}, ordered {ordered} {"OK" if valid else "OVERSOLD / LOST UPDATE"}')
+		return ok
+
+
+async def cleanup(product_ids: list[int]) -> None:
+	async with AsyncSessionLocal() as db:
+		await db.execute(delete(Order).where(Order.product_id.in_(product_ids)))
+		await db.execute(delete(Product).where(Product.id.in_(product_ids)))
+		await db.commit()
+
+
+async def main(orders: int, stock: int, quantity: int, multi: bool, keep: bool) -> int:
+	product_ids = await create_products(2 if multi else 1, stock)
+	print(f'{orders} parallel orders of {quantity} unit(s) of {"both products" if multi else "one product"}, {stock} in stock\n')
+	try:
+		started = time.perf_counter()
+		results = await asyncio.gather(*[place(product_ids, quantity, multi) for _index in range(orders)])
+		elapsed = time.perf_counter() - started
+
+		outcomes = {name: sum(1 for outcome, _ms in results if outcome == name) for name in ('ok', 'rejected', 'error')}
+		latencies = sorted(ms for _outcome, ms in results)
+		print(f'placed {outcomes["ok"]}, rejected (insufficient stock) {outcomes["rejected"]}, errors {outcomes["error"]}')
+		print(f'{orders / elapsed:.0f} orders/s, {outcomes["ok"] / elapsed:.0f} placed/s over {elapsed:.2f}s')
+		print(f'latency p50 {statistics.median(latencies):.1f} ms, p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms, max {latencies[-1]:.1f} ms\n')
+
+		valid = await check(product_ids, stock)
+		expected = min(orders, stock // quantity)
+		if outcomes['ok'] != expected:
+			print(f'expected {expected} placed orders, got {outcomes["ok"]}')
+			valid = False
+		return 0 if valid and not outcomes['error'] else 1
+	finally:
+		if not keep:
+			await cleanup(product_ids)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Fire parallel orders at one SKU and check for oversell')
+	parser.add_argument('--orders', type=int, default=500)
+	parser.add_argument('--stock', type=int, default=200)
+	parser.add_argument('--quantity', type=int, default=1)
+	parser.add_argument('--multi', action='store_true', help='every order takes two products, in random order')
+	parser.add_argument('--keep', action='store_true', help='keep the bench products and orders')
+	args = parser.parse_args()
+	sys.exit(asyncio.run(main(args.orders, args.stock, args.quantity, args.multi, args.keep)))
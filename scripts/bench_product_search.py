@@ -0,0 +1,111 @@
+"""Benchmark: keyword search (q) on a synthetic catalog
+
+Seeds N products with Vietnamese names into the database of ASYNC_DATABASE_URL
+(throwaway DB only!) and times ProductDAL.search_products with `q` against the
+naive alternative, LIKE '%keyword%' on the unfolded name.
+
+Usage:
+    python scripts/bench_product_search.py --seed 1000000     # seed a 1M-product catalog, then run
+    python scripts/bench_product_search.py --runs 20          # run against the already seeded catalog
+
+On MySQL `q` uses the FULLTEXT ngram index (run the migrations first); on
+SQLite it falls back to LIKE on search_text, so only MySQL numbers are meaningful.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.modules.products.dal.product_dal import ProductDAL
+from app.modules.products.models.products import Product
+
+KINDS = ['Áo thun', 'Áo sơ mi', 'Áo khoác', 'Quần jean', 'Quần short', 'Váy liền', 'Đầm dạ hội', 'Giày thể thao', 'Túi xách', 'Mũ lưỡi trai']
+ADJECTIVES = ['đỏ', 'xanh lá', 'trắng', 'đen', 'vàng', 'hồng', 'cổ điển', 'thể thao', 'công sở', 'mùa hè', 'cao cấp', 'oversize']
+MATERIALS = ['cotton', 'lụa', 'len', 'kaki', 'da thật', 'nỉ', 'linen', 'denim']
+QUERIES = ['ao thun', 'áo sơ mi trắng', 'quan jean denim', 'dam da hoi do', 'giay the thao', 'tui xach da that']
+
+
+def synthetic_product(index: int) -> dict:
+	kind, adjective, material = random.choice(KINDS), random.choice(ADJECTIVES), random.choice(MATERIALS)
+	return {
+		'name': f'{kind} {adjective} {index}',
+		'description': f'{kind} chất liệu {material}, phong cách {random.choice(ADJECTIVES)}',
+		'brand_id': random.randint(1, 200),
+		'price': random.randint(100, 100000) / 100,
+		'stock': random.randint(0, 100),
+		'category_id': random.randint(1, 20),
+		'collab_status': 0,
+	}
+
+
+async def seed(count: int, batch_size: int = 10000) -> None:
+	started = time.perf_counter()
+	for offset in range(0, count, batch_size):
+		async with AsyncSessionLocal() as db:
+			await ProductDAL(db).create_many([synthetic_product(offset + index) for index in range(min(batch_size, count - offset))])
+		print(f'\rseeded {min(offset + batch_size, count)}/{count}', end='', flush=True)
+	print(f'\nseeded {count} products in {time.perf_counter() - started:.0f}s')
+
+
+async def timed(runs: int, func_) -> tuple[float, float, int]:
+	"""(median ms, p95 ms, rows) of `runs` calls"""
+	durations = []
+	rows = 0
+	for _ in range(runs):
+		async with AsyncSessionLocal() as db:
+			started = time.perf_counter()
+			rows = await func_(db)
+			durations.append((time.perf_counter() - started) * 1000)
+	durations.sort()
+	return statistics.median(durations), durations[int(len(durations) * 0.95) - 1 if len(durations) > 1 else 0], rows
+
+
+async def main(seed_count: int, runs: int) -> None:
+	if seed_count:
+		await seed(seed_count)
+	async with AsyncSessionLocal() as db:
+		total = (await db.execute(select(func.count()).select_from(Product))).scalar_one()
+	print(f'{total} products, dialect {async_engine.dialect.name}, {runs} runs per case\n')
+	print(f'{"case":<48} {"median ms":>10} {"p95 ms":>10} {"rows":>6}')
+
+	async def like_name(db, keyword: str, **filters) -> int:
+		query = select(Product).where(Product.name.like(f'%{keyword}%'))
+		if filters.get('item_type'):
+			query = query.where(Product.category_id == filters['item_type'])
+		return len((await db.execute(query.order_by(Product.id).limit(20))).scalars().all())
+
+	async def search(db, keyword: str, **params) -> int:
+		result = await ProductDAL(db).search_products({'q': keyword, 'page': 1, 'page_size': 20, 'count_strategy': 'none', **params})
+		return len(result.items)
+
+	try:
+		for keyword in QUERIES:
+			cases = [
+				(f"LIKE '%{keyword}%' on name", lambda db: like_name(db, keyword)),
+				(f'q={keyword}', lambda db: search(db, keyword)),
+				(f'q={keyword}, exact total', lambda db: search(db, keyword, count_strategy='exact')),
+				(f'q={keyword}, item_type=3, by price', lambda db: search(db, keyword, item_type=3, sort_by='price')),
+			]
+			for name, func_ in cases:
+				median, p95, rows = await timed(runs, func_)
+				print(f'{name:<48} {median:>10.1f} {p95:>10.1f} {rows:>6}')
+			print()
+	finally:
+		await async_engine.dispose()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Benchmark keyword search on a synthetic catalog')
+	parser.add_argument('--seed', type=int, default=0, help='insert N synthetic products first (throwaway DB only!)')
+	parser.add_argument('--runs', type=int, default=10)
+	args = parser.parse_args()
+	asyncio.run(main(args.seed, args.runs))
@@ -0,0 +1,83 @@
+"""Benchmark of the similar products computation (item-item cosine top-k)
+
+Generates synthetic interactions with a long-tail product popularity and
+times build_interaction_matrix + top_k_neighbors on one core, without the DB
+or Redis. With --build it runs the real job (SimilarProductsBuilder) against
+the configured database and Redis instead.
+
+Usage:
+    python scripts/bench_recommendations.py [--interactions 3000000] [--users 500000] [--products 50000] [--top-k 20]
+    python scripts/bench_recommendations.py --build [--force]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.modules.recommendations.repository.similarity_builder import build_interaction_matrix, top_k_neighbors
+
+
+def synthetic_interactions(interactions: int, users: int, products: int, seed: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""(user ids, product ids, weights): Zipf-like product popularity, 1 in 4 interactions a wishlist row"""
+	rng = np.random.default_rng(seed)
+	popularity = 1.0 / np.arange(1, products + 1) ** 0.8
+	product_ids = rng.choice(products, size=interactions, p=popularity / popularity.sum()) + 1
+	user_ids = rng.integers(1, users + 1, size=interactions)
+	weights = np.where(rng.random(interactions) < 0.25, get_settings().RECOMMENDATIONS_WISHLIST_WEIGHT, 1.0).astype(np.float32)
+	return user_ids, product_ids, weights
+
+
+def bench(interactions: int, users: int, products: int, top_k: int, block_size: int, seed: int) -> int:
+	settings = get_settings()
+	user_ids, product_ids, weights = synthetic_interactions(interactions, users, products, seed)
+	print(f'{interactions} interactions, {users} users, {products} products, top {top_k}, blocks of {block_size}\n')
+
+	started = time.perf_counter()
+	matrix, item_ids = build_interaction_matrix(user_ids, product_ids, weights, settings.RECOMMENDATIONS_MAX_ITEMS_PER_USER)
+	built = time.perf_counter()
+	print(f'matrix {matrix.shape[0]} x {matrix.shape[1]}, {matrix.nnz} cells in {built - started:.2f}s')
+
+	with_neighbors = neighbor_count = 0
+	sample = None
+	for column, neighbors, scores in top_k_neighbors(matrix, top_k, block_size):
+		with_neighbors += 1
+		neighbor_count += len(neighbors)
+		if sample is None:
+			sample = (item_ids[column], item_ids[neighbors[:5]].tolist(), [round(float(score), 3) for score in scores[:5]])
+	elapsed = time.perf_counter() - built
+	print(f'similarities in {elapsed:.2f}s: {with_neighbors} products with neighbors, {neighbor_count / max(with_neighbors, 1):.1f} on average')
+	if sample:
+		print(f'product {sample[0]}: {sample[1]} {sample[2]}')
+	print(f'total {time.perf_counter() - started:.2f}s')
+	return 0
+
+
+def build(force: bool) -> int:
+	from app.core.database import SessionLocal
+	from app.modules.recommendations.repository.similarity_builder import SimilarProductsBuilder
+
+	with SessionLocal() as db:
+		print(SimilarProductsBuilder(db).run(force=force))
+	return 0
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Benchmark the similar products computation')
+	parser.add_argument('--interactions', type=int, default=3_000_000)
+	parser.add_argument('--users', type=int, default=500_000)
+	parser.add_argument('--products', type=int, default=50_000)
+	parser.add_argument('--top-k', type=int, default=get_settings().RECOMMENDATIONS_TOP_K)
+	parser.add_argument('--block-size', type=int, default=get_settings().RECOMMENDATIONS_BLOCK_SIZE)
+	parser.add_argument('--seed', type=int, default=7)
+	parser.add_argument('--build', action='store_true', help='run the real job against the configured DB and Redis')
+	parser.add_argument('--force', action='store_true', help='with --build, rebuild even when nothing changed')
+	args = parser.parse_args()
+	if args.build:
+		sys.exit(build(args.force))
+	sys.exit(bench(args.interactions, args.users, args.products, args.top_k, args.block_size, args.seed))
@@ -0,0 +1,250 @@
+"""Query plan regression check for the hot DAL queries
+
+Runs each DAL method against the database of ASYNC_DATABASE_URL, captures the
+SQL it sends and runs EXPLAIN on every SELECT. Exits with status 1 when a plan
+contains a full table scan or a filesort on a table outside SMALL_TABLES.
+
+Usage:
+    python scripts/check_query_plans.py                # database must already hold realistic data
+    python scripts/check_query_plans.py --seed 20000   # insert N synthetic products first (throwaway DB only!)
+
+Lists run with count_strategy=none/cached: the COUNT(*) OVER() of the exact
+strategy always materializes the page, which is expected and not checked here.
+Supports MySQL (EXPLAIN) and SQLite (EXPLAIN QUERY PLAN).
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, select, text
+
+from app.core.base_dal import get_count_cache
+from app.core.database import AsyncSessionLocal, async_engine
+from app.modules.products.dal.product_dal import ProductDAL
+from app.modules.products.dal.wishlist_dal import WishlistDAL
+from app.modules.products.models.orders import Order
+from app.modules.products.models.products import Product
+from app.modules.products.models.size_product import SizeProduct
+from app.modules.products.models.sizes import Size
+from app.modules.products.models.wishlists import Wishlist
+from app.modules.users.dal.user_dal import UserDAL
+from app.modules.users.models.users import User
+
+# Lookup tables that are always small enough to scan
+SMALL_TABLES = {'sizes', 'categories'}
+
+
+@dataclass
+class Case:
+	name: str
+	run: Callable[[object, dict], Awaitable]
+	# Known problem kinds ('scan', 'filesort') are reported but do not fail the run
+	allowed: frozenset = frozenset()
+	statements: list = field(default_factory=list)
+
+
+def build_cases() -> list[Case]:
+	async def search(db, ids, **params):
+		return await ProductDAL(db).search_products({'page': 1, 'page_size': 20, 'count_strategy': 'none', **params})
+
+	async def search_next_page(db, ids):
+		first = await search(db, ids, item_type=ids['category_id'], sort_by='price', sort_order='desc')
+		return await search(db, ids, item_type=ids['category_id'], sort_by='price', sort_order='desc', cursor=first.next_cursor)
+
+	async def cached_count(db, ids):
+		get_count_cache().clear()
+		return await search(db, ids, item_type=ids['category_id'], count_strategy='cached')
+
+	async def history_next_page(db, ids):
+		first = await ProductDAL(db).get_shopping_history(ids['user_id'], 1, 5, count_strategy='none')
+		return await ProductDAL(db).get_shopping_history(ids['user_id'], 1, 5, first.next_cursor, 'none')
+
+	return [
+		Case('product by id', lambda db, ids: ProductDAL(db).get_product_by_id(ids['product_id'])),
+		Case('sizes of a product', lambda db, ids: ProductDAL(db).get_product_sizes(ids['product_id'])),
+		Case('sizes of a page of products', lambda db, ids: ProductDAL(db).get_product_sizes_batch(ids['product_ids'])),
+		# Unfiltered list walks the primary key in order and stops at LIMIT
+		Case('list products', lambda db, ids: search(db, ids), allowed=frozenset({'scan'})),
+		Case('list products of a category', lambda db, ids: search(db, ids, item_type=ids['category_id'])),
+		Case('category sorted by price', lambda db, ids: search(db, ids, item_type=ids['category_id'], sort_by='price', sort_order='desc')),
+		Case('category sorted by price, cursor page', search_next_page),
+		Case('category total (cached strategy)', cached_count),
+		# Either products are walked in id order and probed in size_product, or size_product drives and
+		# the result is sorted: no single index serves a filter on one table ordered by another
+		Case('list products of a size', lambda db, ids: search(db, ids, size_type=ids['size_name']), allowed=frozenset({'scan', 'filesort'})),
+		Case('list products of several sizes', lambda db, ids: search(db, ids, size_type=ids['size_names']), allowed=frozenset({'scan', 'filesort'})),
+		# No index yields several categories in id order. The planner either reads one index range per
+		# category and sorts the matches (filesort), or, when the categories are a large share of the
+		# catalog, walks the primary key in id order and stops after LIMIT matches (scan). Both are bounded.
+		Case('list products of two categories', lambda db, ids: search(db, ids, item_type=ids['category_ids']), allowed=frozenset({'scan', 'filesort'})),
+		# (category_id, price) narrows the rows to one category and price range, then only those are sorted
+		# by id. Walking ix_products_category_id in id order instead skips the sort but reads the whole
+		# category, and no index serves a range on price ordered by id.
+		Case('category, price range, in stock', lambda db, ids: search(db, ids, item_type=ids['category_id'], price_min=10, price_max=500, in_stock=True),
+			allowed=frozenset({'filesort'})),
+		Case('shopping history', lambda db, ids: ProductDAL(db).get_shopping_history(ids['user_id'], 1, 5, count_strategy='none')),
+		Case('shopping history, cursor page', history_next_page),
+		Case('wishlist', lambda db, ids: ProductDAL(db).get_wishlist(ids['user_id'], 1, 10, count_strategy='none')),
+		Case('wishlist item', lambda db, ids: WishlistDAL(db).get_wishlist_item(ids['user_id'], ids['product_id'])),
+		Case('user by email', lambda db, ids: UserDAL(db).get_user_by_email(ids['email'])),
+		Case('user by username', lambda db, ids: UserDAL(db).get_user_by_username(ids['username'])),
+	]
+
+
+async def seed(count: int) -> None:
+	"""Insert synthetic data with the bulk DAL helpers"""
+	async with AsyncSessionLocal() as db:
+		dal = ProductDAL(db)
+		size_ids = (await db.execute(select(Size.id))).scalars().all()
+		if not size_ids:
+			db.add_all([Size(size_name=name) for name in ['XS', 'S', 'M', 'L', 'XL', 'XXL']])
+			await db.commit()
+			size_ids = (await db.execute(select(Size.id))).scalars().all()
+
+		products = [
+			{
+				'name': f'Seed product {index}',
+				'brand_id': random.randint(1, 50),
+				'price': random.randint(100, 100000) / 100,
+				'stock': random.randint(0, 100),
+				'category_id': random.randint(1, 20),
+				'collab_status': 0,
+			}
+			for index in range(count)
+		]
+		product_ids = await dal.create_many(products, return_ids=True)
+		size_links = [
+			{'product_id': product_id, 'size_id': size_id}
+			for product_id in product_ids
+			for size_id in random.sample(size_ids, random.randint(1, len(size_ids)))
+		]
+		await db.execute(SizeProduct.__table__.insert(), size_links)
+
+		users = [{'username': f'seeduser{index}', 'email': f'seed{index}@example.com', 'role': 'customer', 'is_active': True} for index in range(max(1, count // 100))]
+		await db.execute(User.__table__.insert(), users)
+		user_ids = (await db.execute(select(User.id))).scalars().all()
+		orders = [
+			{
+				'product_id': random.choice(product_ids),
+				'user_id': random.choice(user_ids),
+				'quantity': 1,
+				'total_price': 10,
+				'status': random.choice(['completed', 'pending', 'cancelled']),
+			}
+			for _ in range(count)
+		]
+		await db.execute(Order.__table__.insert(), orders)
+		wishlist = {(random.choice(user_ids), random.choice(product_ids)) for _ in range(count // 2)}
+		await db.execute(Wishlist.__table__.insert(), [{'user_id': user_id, 'product_id': product_id} for user_id, product_id in wishlist])
+		await db.commit()
+
+		if db.get_bind().dialect.name == 'mysql':
+			for table in ('products', 'size_product', 'sizes', 'orders', 'wishlist', 'users'):
+				await db.execute(text(f'ANALYZE TABLE {table}'))
+		else:
+			await db.execute(text('ANALYZE'))
+		await db.commit()
+	print(f'Seeded {count} products')
+
+
+async def sample_ids() -> dict:
+	"""Real ids/values to run the DAL queries with"""
+	async with AsyncSessionLocal() as db:
+		user_id = (await db.execute(select(Order.user_id).where(Order.status == 'completed').limit(1))).scalar()
+		user = await db.get(User, user_id) if user_id else (await db.execute(select(User).limit(1))).scalar()
+		product_ids = (await db.execute(select(Product.id).limit(20))).scalars().all()
+		return {
+			'product_id': product_ids[0] if product_ids else 1,
+			'product_ids': product_ids or [1],
+			'category_id': (await db.execute(select(Product.category_id).limit(1))).scalar() or 1,
+			'size_name': (await db.execute(select(Size.size_name).limit(1))).scalar() or 'M',
+			'size_names': (await db.execute(select(Size.size_name).limit(3))).scalars().all() or ['M'],
+			'category_ids': (await db.execute(select(Product.category_id).distinct().limit(2))).scalars().all() or [1],
+			'user_id': user.id if user else 1,
+			'email': user.email if user else 'nobody@example.com',
+			'username': user.username if user else 'nobody',
+		}
+
+
+def plan_problems(dialect: str, plan: list) -> list[tuple[str, str]]:
+	"""[(kind, detail)] with kind 'scan' (full table scan) or 'filesort'"""
+	problems = []
+	for row in plan:
+		if dialect == 'mysql':
+			table = row.get('table') or ''
+			extra = row.get('Extra') or ''
+			if row.get('type') == 'ALL' and table not in SMALL_TABLES and not table.startswith('<'):
+				problems.append(('scan', f'full scan of {table}'))
+			if 'Using filesort' in extra:
+				problems.append(('filesort', f'filesort on {table}: {extra}'))
+		else:
+			detail = row.get('detail') or ''
+			words = detail.split()
+			if words[:1] == ['SCAN'] and 'INDEX' not in words and len(words) > 1 and words[1] not in SMALL_TABLES:
+				problems.append(('scan', detail))
+			if 'TEMP B-TREE FOR ORDER BY' in detail:
+				problems.append(('filesort', detail))
+	return problems
+
+
+async def explain(statement: str, parameters) -> list[dict]:
+	dialect = async_engine.dialect.name
+	prefix = 'EXPLAIN ' if dialect == 'mysql' else 'EXPLAIN QUERY PLAN '
+	async with async_engine.connect() as connection:
+		result = await connection.exec_driver_sql(prefix + statement, parameters)
+		return [dict(row) for row in result.mappings()]
+
+
+async def main(seed_count: int) -> int:
+	if seed_count:
+		await seed(seed_count)
+
+	ids = await sample_ids()
+	dialect = async_engine.dialect.name
+	captured: list = []
+
+	def capture(conn, cursor, statement, parameters, context, executemany):
+		if statement.lstrip().upper().startswith('SELECT') and not executemany:
+			captured.append((statement, parameters))
+
+	event.listen(async_engine.sync_engine, 'before_cursor_execute', capture)
+	failures = 0
+	try:
+		for case in build_cases():
+			captured.clear()
+			async with AsyncSessionLocal() as db:
+				await case.run(db, ids)
+			case.statements = list(captured)
+
+			problems = []
+			for statement, parameters in case.statements:
+				for kind, detail in plan_problems(dialect, await explain(statement, parameters)):
+					problems.append((kind, detail, statement))
+
+			blocking = [problem for problem in problems if problem[0] not in case.allowed]
+			status = 'FAIL' if blocking else ('WARN' if problems else 'ok')
+			print(f'[{status:4}] {case.name} ({len(case.statements)} statement(s))')
+			for kind, detail, statement in problems:
+				print(f'        {detail}')
+				print(f'        {" ".join(statement.split())[:300]}')
+			failures += bool(blocking)
+	finally:
+		event.remove(async_engine.sync_engine, 'before_cursor_execute', capture)
+		await async_engine.dispose()
+
+	print(f'{failures} failing case(s)')
+	return 1 if failures else 0
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='EXPLAIN the hot DAL queries and fail on full scans / filesorts')
+	parser.add_argument('--seed', type=int, default=0, help='insert N synthetic products (and related rows) first')
+	args = parser.parse_args()
+	sys.exit(asyncio.run(main(args.seed)))
@@ -0,0 +1,124 @@
+"""Apply pending schema migrations (scripts/migrations/NNNN_*.py)
+
+Usage:
+    python scripts/create_db_schema.py           # apply pending migrations
+    python scripts/create_db_schema.py --list    # show applied / pending migrations
+
+Applied versions are recorded in the `schema_migrations` table. On MySQL a named
+lock serializes concurrent runs (several containers starting at once).
+"""
+
+import argparse
+import importlib
+import importlib.util
+import logging
+import pkgutil
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+MIGRATIONS_DIR = Path(__file__).resolve().parent / 'migrations'
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(MIGRATIONS_DIR.parent))
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from app.core.database import engine
+
+logger = logging.getLogger('create_db_schema')
+
+MIGRATION_LOCK = 'bofi_schema_migrations'
+
+schema_migrations = Table(
+	'schema_migrations',
+	MetaData(),
+	Column('version', String(4), primary_key=True),
+	Column('name', String(255), nullable=False),
+	Column('applied_at', DateTime, nullable=False, server_default=func.now()),
+)
+
+
+def import_models() -> None:
+	"""Import app/modules/*/models/* so Base.metadata knows every table"""
+	modules_dir = ROOT_DIR / 'app' / 'modules'
+	for models_dir in sorted(modules_dir.glob('*/models')):
+		package = f'app.modules.{models_dir.parent.name}.models'
+		for module in pkgutil.iter_modules([str(models_dir)]):
+			importlib.import_module(f'{package}.{module.name}')
+
+
+def discover_migrations() -> list[tuple[str, str, Path]]:
+	"""(version, name, path) of every migration file, ordered by version"""
+	migrations = []
+	for path in sorted(MIGRATIONS_DIR.glob('[0-9][0-9][0-9][0-9]_*.py')):
+		version, name = path.stem.split('_', 1)
+		migrations.append((version, name, path))
+	return migrations
+
+
+def load_migration(version: str, path: Path):
+	spec = importlib.util.spec_from_file_location(f'migration_{version}', path)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return module
+
+
+@contextmanager
+def migration_lock(db_engine: Engine):
+	"""MySQL GET_LOCK around the whole run; no-op on other databases"""
+	if db_engine.dialect.name != 'mysql':
+		yield
+		return
+	with db_engine.connect() as connection:
+		if not connection.execute(text('SELECT GET_LOCK(:name, 300)'), {'name': MIGRATION_LOCK}).scalar():
+			raise RuntimeError('Timed out waiting for the schema migration lock')
+		try:
+			yield
+		finally:
+			connection.execute(text('SELECT RELEASE_LOCK(:name)'), {'name': MIGRATION_LOCK})
+
+
+def applied_versions(db_engine: Engine) -> set[str]:
+	with db_engine.begin() as connection:
+		schema_migrations.create(connection, checkfirst=True)
+		return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(db_engine: Engine = engine) -> list[str]:
+	"""Apply pending migrations in order, each in its own transaction"""
+	import_models()
+	applied_now = []
+	with migration_lock(db_engine):
+		applied = applied_versions(db_engine)
+		for version, name, path in discover_migrations():
+			if version in applied:
+				continue
+			logger.info(f'Applying migration {version}_{name}')
+			module = load_migration(version, path)
+			# MySQL commits DDL implicitly, so migrations must be safe to re-run (see migrations/__init__.py)
+			with db_engine.begin() as connection:
+				module.upgrade(connection)
+				connection.execute(insert(schema_migrations).values(version=version, name=name))
+			applied_now.append(version)
+	logger.info(f'Schema up to date ({len(applied_now)} migration(s) applied)')
+	return applied_now
+
+
+def list_migrations(db_engine: Engine = engine) -> None:
+	applied = applied_versions(db_engine)
+	for version, name, _path in discover_migrations():
+		print(f'{"applied" if version in applied else "pending"}  {version}_{name}')
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Apply database schema migrations')
+	parser.add_argument('--list', action='store_true', help='show applied and pending migrations')
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+	if args.list:
+		list_migrations()
+	else:
+		run_migrations()
@@ -0,0 +1,7 @@
+"""Create every table of the current models that does not exist yet"""
+
+from app.core.database import Base
+
+
+def upgrade(connection):
+	Base.metadata.create_all(connection, checkfirst=True)
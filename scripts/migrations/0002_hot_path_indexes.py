@@ -0,0 +1,23 @@
+"""Indexes for product listing, size filter, shopping history, wishlist and login queries"""
+
+from migrations._helpers import create_index_if_missing, delete_duplicates
+
+# (table, index name, columns, unique) - keep in sync with the models' __table_args__
+INDEXES = [
+	('products', 'ix_products_category_id', ['category_id'], False),
+	('products', 'ix_products_category_id_price', ['category_id', 'price'], False),
+	('size_product', 'uq_size_product_product_id_size_id', ['product_id', 'size_id'], True),
+	('size_product', 'ix_size_product_size_id_product_id', ['size_id', 'product_id'], False),
+	('orders', 'ix_orders_user_id_status_created_at', ['user_id', 'status', 'created_at'], False),
+	('wishlist', 'uq_wishlist_user_id_product_id', ['user_id', 'product_id'], True),
+	('wishlist', 'ix_wishlist_user_id', ['user_id'], False),
+	('users', 'ix_users_email', ['email'], False),
+	('users', 'ix_users_username', ['username'], False),
+]
+
+
+def upgrade(connection):
+	delete_duplicates(connection, 'size_product', ['product_id', 'size_id'])
+	delete_duplicates(connection, 'wishlist', ['user_id', 'product_id'])
+	for table_name, name, columns, unique in INDEXES:
+		create_index_if_missing(connection, table_name, name, columns, unique)
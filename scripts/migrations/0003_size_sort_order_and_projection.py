@@ -0,0 +1,22 @@
+"""sizes.sort_order rank and the products.sizes projection
+
+products.sizes starts out NULL (reads fall back to size_product); fill it with
+    python scripts/rebuild_size_projection.py
+"""
+
+from sqlalchemy import text
+
+from migrations._helpers import add_column_if_missing
+
+# Ranks of the standard sizes, other sizes keep the default (1000) and sort after them
+STANDARD_SIZE_ORDER = {'XS': 10, 'S': 20, 'M': 30, 'L': 40, 'XL': 50, 'XXL': 60}
+
+
+def upgrade(connection):
+	add_column_if_missing(connection, 'sizes', 'sort_order', 'INTEGER NOT NULL DEFAULT 1000')
+	add_column_if_missing(connection, 'products', 'sizes', 'VARCHAR(255) NULL')
+	for size_name, sort_order in STANDARD_SIZE_ORDER.items():
+		connection.execute(
+			text('UPDATE sizes SET sort_order = :sort_order WHERE size_name = :size_name AND sort_order = 1000'),
+			{'sort_order': sort_order, 'size_name': size_name},
+		)
@@ -0,0 +1,42 @@
+"""products.search_text (diacritic-folded name + description) with a FULLTEXT ngram index"""
+
+import logging
+
+from sqlalchemy import text
+
+from app.modules.products.models.products import build_search_text
+from migrations._helpers import add_column_if_missing, index_names
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+
+def backfill_search_text(connection) -> int:
+	"""Fill search_text of the rows written before this migration"""
+	filled = 0
+	last_id = 0
+	while True:
+		rows = connection.execute(
+			text('SELECT id, name, description FROM products WHERE id > :last_id AND search_text IS NULL ORDER BY id LIMIT :limit'),
+			{'last_id': last_id, 'limit': BATCH_SIZE},
+		).all()
+		if not rows:
+			break
+		connection.execute(
+			text('UPDATE products SET search_text = :search_text WHERE id = :id'),
+			[{'id': row.id, 'search_text': build_search_text(row.name, row.description)} for row in rows],
+		)
+		last_id = rows[-1].id
+		filled += len(rows)
+	logger.info(f'Filled products.search_text of {filled} rows')
+	return filled
+
+
+def upgrade(connection):
+	add_column_if_missing(connection, 'products', 'search_text', 'TEXT NULL')
+	backfill_search_text(connection)
+	# FULLTEXT is MySQL only, other databases search with LIKE (see ProductDAL._keyword_search)
+	if connection.dialect.name == 'mysql' and 'ix_products_search_text' not in index_names(connection, 'products'):
+		connection.execute(text('CREATE FULLTEXT INDEX ix_products_search_text ON products (search_text) WITH PARSER ngram'))
+		logger.info('Created FULLTEXT index ix_products_search_text on products(search_text)')
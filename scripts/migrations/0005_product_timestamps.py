@@ -0,0 +1,26 @@
+"""products.create_date / update_date, indexed for the catalog export (updated_since)
+
+Rows written before this migration get the migration time as both dates, so
+the first incremental export after it returns the whole catalog.
+"""
+
+from sqlalchemy import text
+
+from migrations._helpers import add_column_if_missing, create_index_if_missing
+
+
+def upgrade(connection):
+	if connection.dialect.name == 'mysql':
+		add_column_if_missing(connection, 'products', 'create_date', 'DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP')
+		add_column_if_missing(connection, 'products', 'update_date', 'DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP')
+		# Also for tables created by 0001 from the model: the server stamps every changed row,
+		# including ON DUPLICATE KEY UPDATE upserts and raw SQL that bypasses the ORM onupdate
+		connection.execute(
+			text('ALTER TABLE products MODIFY update_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP')
+		)
+	else:
+		# SQLite cannot add a column with a non-constant default, fill it instead
+		for column_name in ('create_date', 'update_date'):
+			if add_column_if_missing(connection, 'products', column_name, 'DATETIME NULL'):
+				connection.execute(text(f'UPDATE products SET {column_name} = CURRENT_TIMESTAMP WHERE {column_name} IS NULL'))
+	create_index_if_missing(connection, 'products', 'ix_products_update_date', ['update_date'])
@@ -0,0 +1,11 @@
+"""products.sku (catalog import key) and the catalog_import_jobs table"""
+
+from app.modules.products.models.catalog_import_jobs import CatalogImportJob
+from migrations._helpers import add_column_if_missing, create_index_if_missing
+
+
+def upgrade(connection):
+	add_column_if_missing(connection, 'products', 'sku', 'VARCHAR(64) NULL')
+	# Unique, NULLs allowed: products created in the admin have no SKU
+	create_index_if_missing(connection, 'products', 'uq_products_sku', ['sku'], unique=True)
+	CatalogImportJob.__table__.create(connection, checkfirst=True)
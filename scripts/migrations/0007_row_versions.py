@@ -0,0 +1,18 @@
+"""Microsecond update_date row versions on products and categories (HTTP ETags)"""
+
+from sqlalchemy import text
+
+from migrations._helpers import add_column_if_missing
+
+ROW_VERSION_DDL = 'DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)'
+
+
+def upgrade(connection):
+	if connection.dialect.name == 'mysql':
+		add_column_if_missing(connection, 'categories', 'update_date', ROW_VERSION_DDL)
+		# Also for tables created by 0001 from the model (no ON UPDATE) and products.update_date of 0005 (seconds)
+		for table_name in ('products', 'categories'):
+			connection.execute(text(f'ALTER TABLE {table_name} MODIFY update_date {ROW_VERSION_DDL}'))
+	elif add_column_if_missing(connection, 'categories', 'update_date', 'DATETIME NULL'):
+		# SQLite cannot add a column with a non-constant default, fill it instead
+		connection.execute(text('UPDATE categories SET update_date = CURRENT_TIMESTAMP WHERE update_date IS NULL'))
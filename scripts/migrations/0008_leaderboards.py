@@ -0,0 +1,16 @@
+"""products.popularity (sort_by=popularity), wishlist.created_at and the index of the leaderboard reconciliation"""
+
+from sqlalchemy import text
+
+from migrations._helpers import add_column_if_missing, create_index_if_missing
+
+
+def upgrade(connection):
+	add_column_if_missing(connection, 'products', 'popularity', 'NUMERIC(12, 2) NOT NULL DEFAULT 0')
+	if connection.dialect.name == 'mysql':
+		add_column_if_missing(connection, 'wishlist', 'created_at', 'DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP')
+	elif add_column_if_missing(connection, 'wishlist', 'created_at', 'DATETIME NULL'):
+		# SQLite cannot add a column with a non-constant default, fill it instead
+		connection.execute(text('UPDATE wishlist SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL'))
+	create_index_if_missing(connection, 'products', 'ix_products_popularity', ['popularity'])
+	create_index_if_missing(connection, 'orders', 'ix_orders_status_created_at', ['status', 'created_at'])
@@ -0,0 +1,7 @@
+"""Versioned schema migrations applied by scripts/create_db_schema.py
+
+Each NNNN_name.py module defines `upgrade(connection)`. Migrations must be
+idempotent (check before create/alter): 0001 creates missing tables from the
+current models, so on a fresh database later migrations find their indexes and
+columns already there.
+"""
@@ -0,0 +1,55 @@
+"""Idempotent DDL helpers for migrations"""
+
+import logging
+
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+def index_names(connection: Connection, table_name: str) -> set[str]:
+	"""Names of the indexes and unique constraints of a table"""
+	inspector = inspect(connection)
+	names = {index['name'] for index in inspector.get_indexes(table_name)}
+	names.update(constraint['name'] for constraint in inspector.get_unique_constraints(table_name))
+	return names
+
+
+def create_index_if_missing(connection: Connection, table_name: str, name: str, columns: list[str], unique: bool = False) -> bool:
+	"""CREATE [UNIQUE] INDEX name ON table (columns) unless an index with that name exists"""
+	if name in index_names(connection, table_name):
+		return False
+	table = Table(table_name, MetaData(), *[Column(column) for column in columns])
+	Index(name, *[table.c[column] for column in columns], unique=unique).create(connection)
+	logger.info(f'Created index {name} on {table_name}({", ".join(columns)})')
+	return True
+
+
+def column_names(connection: Connection, table_name: str) -> set[str]:
+	"""Names of the columns of a table"""
+	return {column['name'] for column in inspect(connection).get_columns(table_name)}
+
+
+def add_column_if_missing(connection: Connection, table_name: str, column_name: str, ddl: str) -> bool:
+	"""ALTER TABLE table ADD COLUMN column ddl unless the column exists"""
+	if column_name in column_names(connection, table_name):
+		return False
+	connection.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}'))
+	logger.info(f'Added column {table_name}.{column_name}')
+	return True
+
+
+def delete_duplicates(connection: Connection, table_name: str, columns: list[str]) -> int:
+	"""Keep the lowest id of every group of rows sharing `columns` (before adding a unique index)"""
+	group_by = ', '.join(columns)
+	# The extra derived table lets MySQL read the table it deletes from
+	result = connection.execute(
+		text(
+			f'DELETE FROM {table_name} WHERE id NOT IN '
+			f'(SELECT id FROM (SELECT MIN(id) AS id FROM {table_name} GROUP BY {group_by}) AS keep_rows)'
+		)
+	)
+	if result.rowcount:
+		logger.warning(f'Deleted {result.rowcount} duplicate rows from {table_name} ({group_by})')
+	return result.rowcount
@@ -0,0 +1,72 @@
+"""Rebuild or check the products.sizes projection of size_product
+
+Usage:
+    python scripts/rebuild_size_projection.py            # rewrite products.sizes of every product
+    python scripts/rebuild_size_projection.py --check    # report products whose projection is stale, exit 1 if any
+
+Run after migration 0003 and after renaming or reordering sizes (sizes.size_name /
+sizes.sort_order); size_product changes made through ProductDAL keep it current.
+A rebuild also signals the API workers to reload their DimensionCache.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.modules.products.cache.dimension_cache import invalidate_dimensions_sync
+from app.modules.products.dal.product_dal import ProductDAL
+from app.modules.products.models.products import Product
+
+
+async def product_batches(batch_size: int):
+	"""(product ids, {id: current products.sizes}) in id order, one session per batch"""
+	last_id = 0
+	while True:
+		async with AsyncSessionLocal() as db:
+			rows = (
+				await db.execute(select(Product.id, Product.sizes).where(Product.id > last_id).order_by(Product.id).limit(batch_size))
+			).all()
+			if not rows:
+				return
+			last_id = rows[-1].id
+			yield db, {row.id: row.sizes for row in rows}
+
+
+async def main(check: bool, batch_size: int, verbose: bool) -> int:
+	checked = stale = 0
+	try:
+		async for db, current in product_batches(batch_size):
+			dal = ProductDAL(db)
+			expected = await dal.build_size_projection(list(current))
+			mismatched = [product_id for product_id, sizes in expected.items() if current[product_id] != sizes]
+			checked += len(current)
+			stale += len(mismatched)
+			if check:
+				for product_id in mismatched[:20] if not verbose else mismatched:
+					print(f'product {product_id}: stored {current[product_id]!r}, expected {expected[product_id]!r}')
+			elif mismatched:
+				await dal.refresh_size_projection(mismatched)
+	finally:
+		await async_engine.dispose()
+
+	if check:
+		print(f'{stale} of {checked} product(s) have a stale size projection')
+		return 1 if stale else 0
+	invalidate_dimensions_sync()
+	print(f'Rewrote the size projection of {stale} of {checked} product(s)')
+	return 0
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Rebuild or check products.sizes')
+	parser.add_argument('--check', action='store_true', help='only report stale projections, exit 1 if any')
+	parser.add_argument('--batch-size', type=int, default=1000)
+	parser.add_argument('--verbose', action='store_true', help='with --check, list every stale product (default: 20 per batch)')
+	args = parser.parse_args()
+	sys.exit(asyncio.run(main(args.check, args.batch_size, args.verbose)))
@@ -4,6 +4,10 @@
 if [ "$SERVICE_TYPE" = "celery_worker" ]; then
     echo "Starting Celery worker..."
     cd /app && python -m celery -A app.jobs.celery_worker worker --loglevel=debug --concurrency=${CELERY_WORKER_CONCURRENCY:-4}
+elif [ "$SERVICE_TYPE" = "celery_beat" ]; then
+    # Periodic tasks (similar products rebuild), a single instance per deployment
+    echo "Starting Celery beat..."
+    cd /app && python -m celery -A app.jobs.celery_worker beat --loglevel=info --schedule=/tmp/celerybeat-schedule
 else
     # Run database schema creation script
     echo "Running database schema creation script..."